@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Job-local embedding service: one process holds the E5 query model for every Step13 of a run.
+
+run_loan_job starts it when a job runs Step13 more than once (general + income, or the
+hash-stability rerun) and stops it once the last Step13 has finished, before the Step12 LLM
+calls need the GPU. Step13 reaches it through MORTGAGEDOCAI_EMBED_SOCK /
+MORTGAGEDOCAI_EMBED_AUTHKEY and loads the model itself when they are unset or the service
+cannot answer, so standalone Step13 runs are unchanged.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import secrets
+import shutil
+import tempfile
+import threading
+from multiprocessing.connection import Client, Listener
+from typing import List, Optional, Tuple
+
+SOCK_ENV = "MORTGAGEDOCAI_EMBED_SOCK"
+AUTHKEY_ENV = "MORTGAGEDOCAI_EMBED_AUTHKEY"
+LISTEN_TIMEOUT_SEC = 30
+
+
+def _serve(address: str, authkey: bytes, model_name: str, device: Optional[str],
+           offline: bool, listening) -> None:
+    """Service process body: listen first (clients block in the handshake while the model loads)."""
+    with Listener(address, family="AF_UNIX", authkey=authkey) as listener:
+        listening.set()
+        model = None
+        load_error = None
+        try:
+            from step13_build_retrieval_pack import _load_embedding_model
+            model, device = _load_embedding_model(model_name, device, offline)
+        except Exception as exc:
+            load_error = f"{type(exc).__name__}: {exc}"
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, multiprocessing.AuthenticationError):
+                continue
+            with conn:
+                try:
+                    req_model, texts = conn.recv()
+                    if load_error is not None:
+                        conn.send(("error", load_error, None))
+                    elif req_model != model_name:
+                        conn.send(("error", f"service holds {model_name!r}, not {req_model!r}", None))
+                    else:
+                        vecs = model.encode(texts, normalize_embeddings=True, convert_to_numpy=True,
+                                            show_progress_bar=False)
+                        conn.send(("ok", vecs.tolist(), device))
+                except (OSError, EOFError):
+                    continue
+
+
+class EmbedderService:
+    """Handle returned by start(); stop() is idempotent and safe from any thread."""
+
+    def __init__(self, proc, tmp_dir: str) -> None:
+        self._proc = proc
+        self._tmp_dir = tmp_dir
+        self._stop_lock = threading.Lock()
+        self._stopped = False
+
+    def stop(self) -> None:
+        with self._stop_lock:
+            if self._stopped:
+                return
+            self._stopped = True
+        os.environ.pop(SOCK_ENV, None)
+        os.environ.pop(AUTHKEY_ENV, None)
+        self._proc.terminate()
+        self._proc.join(5)
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+
+def start(model_name: str, device: Optional[str] = None, offline: bool = False) -> Optional[EmbedderService]:
+    """Start the service and export its address into os.environ for Step13 subprocesses.
+
+    Returns None (Step13 loads its own model) if the service does not come up.
+    """
+    ctx = multiprocessing.get_context("spawn")  # fresh interpreter: HF offline env before imports
+    tmp_dir = tempfile.mkdtemp(prefix="mortgagedocai-embed-")
+    address = os.path.join(tmp_dir, "embed.sock")
+    authkey = secrets.token_bytes(16)
+    listening = ctx.Event()
+    proc = ctx.Process(target=_serve, args=(address, authkey, model_name, device, offline, listening),
+                       daemon=True)
+    proc.start()
+    service = EmbedderService(proc, tmp_dir)
+    if not listening.wait(LISTEN_TIMEOUT_SEC):
+        service.stop()
+        return None
+    os.environ[SOCK_ENV] = address
+    os.environ[AUTHKEY_ENV] = authkey.hex()
+    return service
+
+
+def embed_via_service(texts: List[str], model_name: str) -> Optional[Tuple[List[List[float]], str]]:
+    """Return (vectors, device) from the job's service, or None when there is none / it failed."""
+    address = os.environ.get(SOCK_ENV)
+    authkey = os.environ.get(AUTHKEY_ENV)
+    if not address or not authkey:
+        return None
+    try:
+        with Client(address, family="AF_UNIX", authkey=bytes.fromhex(authkey)) as conn:
+            conn.send((model_name, texts))
+            status, payload, device = conn.recv()
+    except (OSError, EOFError, ValueError, multiprocessing.AuthenticationError):
+        return None
+    if status != "ok":
+        print(f"[WARN] embedder service: {payload}; loading model locally", flush=True)
+        return None
+    return payload, device
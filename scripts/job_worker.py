@@ -24,6 +24,7 @@ from loan_service.adapters_disk import (
     load_manifest_if_present,
     result_from_manifest,
 )
+from loan_service.adapters_disk import _parse_manifest_summary_from_stdout as parse_manifest_summary_from_stdout
 from loan_service.adapters_disk import _parse_run_id_from_stdout as parse_run_id_from_stdout
 from loan_service.adapters_disk import _truncate
 from loan_service.adapters_subprocess import JOB_TIMEOUT_DEFAULT, get_job_env
@@ -103,7 +104,7 @@ def run_one_cycle(
             if is_phase or now - _last_flush[0] >= 5.0:
                 _last_flush[0] = now
                 try:
-                    store.save(job)
+                    store.save_progress(job)
                 except Exception:
                     pass
 
@@ -130,14 +131,15 @@ def run_one_cycle(
         resolved_run_id = request.get("run_id") or parse_run_id_from_stdout(stdout)
         result_summary: dict[str, Any] = {}
         if resolved_run_id:
-            manifest = load_manifest_if_present(get_base_path, tid, lid, resolved_run_id)
+            manifest = parse_manifest_summary_from_stdout(stdout, resolved_run_id)
+            if manifest is None:
+                manifest = load_manifest_if_present(get_base_path, tid, lid, resolved_run_id)
             if manifest:
-                base = get_base_path()
-                mp = base / "tenants" / tid / "loans" / lid / resolved_run_id / "job_manifest.json"
-                result_summary["manifest_path"] = str(mp)
+                run_dir = get_base_path().joinpath("tenants", tid, "loans", lid, resolved_run_id)
+                result_summary["manifest_path"] = str(run_dir / "job_manifest.json")
                 result_summary["status"] = manifest.get("status")
                 result_summary["rp_sha256"] = manifest.get("retrieval_pack_sha256")
-                result_summary["outputs_base"] = str(mp.parent) if mp.parent else None
+                result_summary["outputs_base"] = str(run_dir)
         job["finished_at_utc"] = _utc_now_z()
         job["stdout"] = stdout
         job["stderr"] = stderr
@@ -178,8 +180,12 @@ def main() -> int:
         return 0
     while True:
         _write_heartbeat(get_base_path)
-        run_one_cycle(get_base_path, store, loan_lock, runner, tenant_id=args.tenant_id, loan_id=args.loan_id)
-        time.sleep(args.poll_interval)
+        processed = run_one_cycle(
+            get_base_path, store, loan_lock, runner, tenant_id=args.tenant_id, loan_id=args.loan_id
+        )
+        # Only sleep when the queue was empty: jobs queued behind the one just run start at once.
+        if not processed:
+            time.sleep(args.poll_interval)
 
 
 if __name__ == "__main__":
@@ -23,7 +23,9 @@ import os
 import re
 import subprocess
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional
+
+import orjson
 
 # -----------------------------
 # Locked constants / mounts
@@ -62,12 +64,11 @@ def utc_timestamp_compact() -> str:
 # -----------------------------
 # Hashing helpers
 # -----------------------------
-def sha256_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
-    h = hashlib.sha256()
-    with path.open("rb") as f:
-        for b in iter(lambda: f.read(chunk_size), b""):
-            h.update(b)
-    return h.hexdigest()
+def sha256_file(path: Path) -> str:
+    # hashlib.file_digest runs the read/update loop in C (readinto one reused buffer, GIL
+    # released while hashing); unbuffered open avoids a second copy through BufferedReader.
+    with open(path, "rb", buffering=0) as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
 
 # -----------------------------
 # Chunk normalization (LOCKED order)
@@ -84,7 +85,11 @@ def chunk_text_hash(text: str) -> str:
     return hashlib.sha256(normalize_chunk_text(text).encode("utf-8")).hexdigest()
 
 def chunk_id(document_id: str, page_start: int, page_end: int, chunk_index: int, chunk_text: str) -> str:
-    cth = chunk_text_hash(chunk_text)
+    return chunk_id_from_text_hash(document_id, page_start, page_end, chunk_index, chunk_text_hash(chunk_text))
+
+def chunk_id_from_text_hash(document_id: str, page_start: int, page_end: int, chunk_index: int, cth: str) -> str:
+    """chunk_id() for a caller that already holds chunk_text_hash(chunk_text) (e.g. Step11,
+    which also stores it as text_norm_sha256)."""
     s = f"{document_id}:{page_start}-{page_end}:{chunk_index}:{cth}"
     return hashlib.sha256(s.encode("utf-8")).hexdigest()
 
@@ -103,16 +108,37 @@ def ensure_dir(path: Path) -> None:
 def safe_mkdir(path: Path) -> None:
     ensure_dir(path)
 
-def atomic_write_text(path: Path, text: str) -> None:
-    ensure_dir(path.parent)
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write data to <path>.tmp and rename over path. The parent is only created when the tmp
+    open fails with ENOENT, so the common case costs no extra mkdir round trip on the NAS."""
     tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(text, encoding="utf-8")
+    try:
+        tmp.write_bytes(data)
+    except FileNotFoundError:
+        ensure_dir(path.parent)
+        tmp.write_bytes(data)
     os.replace(str(tmp), str(path))
 
+def atomic_write_text(path: Path, text: str) -> None:
+    _atomic_write_bytes(path, text.encode("utf-8"))
+
 def atomic_write_json(path: Path, obj: Any) -> None:
-    ensure_dir(path.parent)
+    # stdlib json on purpose: artifact bytes (and their sha256) stay stable across runs, and
+    # NaN/Infinity in financial outputs are written as such instead of silently becoming null.
+    _atomic_write_bytes(path, json.dumps(obj, indent=2, sort_keys=True).encode("utf-8"))
+
+def atomic_write_jsonl(path: Path, records: Iterable[Any]) -> None:
+    """One compact orjson line per record, streamed to <path>.tmp (no joined blob in memory)
+    and renamed over path."""
     tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(json.dumps(obj, indent=2, sort_keys=True), encoding="utf-8")
+    try:
+        f = open(tmp, "wb")
+    except FileNotFoundError:
+        ensure_dir(path.parent)
+        f = open(tmp, "wb")
+    with f:
+        for rec in records:
+            f.write(orjson.dumps(rec, option=orjson.OPT_APPEND_NEWLINE))
     os.replace(str(tmp), str(path))
 
 def atomic_rename_dir(staging_dir: Path, final_dir: Path) -> None:
@@ -243,7 +269,13 @@ def _source_mount_is_effectively_ro() -> bool:
 
     return any(_opts_has_ro(opts) for (_, opts) in backing)
 
+# skip_source_check values whose preflight passed in this process. Steps run in-process by
+# run_loan_job / run_loan_pipeline each call preflight; the findmnt forks only run once.
+_PREFLIGHT_PASSED: set[bool] = set()
+
 def preflight_mount_contract(skip_source_check: bool = False) -> None:
+    if False in _PREFLIGHT_PASSED or skip_source_check in _PREFLIGHT_PASSED:
+        return
     # Source mount exists and is RO (skip when query-only, e.g. API "Ask a question" — no read from source)
     if not skip_source_check:
         if not _is_mountpoint(SOURCE_MOUNT):
@@ -285,6 +317,7 @@ def preflight_mount_contract(skip_source_check: bool = False) -> None:
     # NOTE: some findmnt builds don't report SOURCE for subdirectories; do not query subdir.
     _ = _findmnt_source(NAS_CHUNK)
     _ = _findmnt_source(NAS_ANALYZE)
+    _PREFLIGHT_PASSED.add(skip_source_check)
 
 # -----------------------------
 # Source path validation (LOCKED)
@@ -19,17 +19,22 @@ import hashlib
 import json
 import os
 import re
+import stat
 import subprocess
 import sys
 import threading
 import time
 import urllib.request
+from collections import OrderedDict
 from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
 from typing import Any, List
+from urllib.parse import quote
 
+import orjson
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from pydantic import BaseModel, Field
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
@@ -59,6 +64,12 @@ STDOUT_TRUNCATE = 50_000
 STDERR_TRUNCATE = 50_000
 ERROR_TRUNCATE = 4_000
 JOB_TIMEOUT_DEFAULT = 3600
+# Reusable read buffer size when hashing retrieval_pack.json for /artifacts
+SHA256_READ_CHUNK = 1024 * 1024
+# Parsed job_manifest.json entries kept by _load_manifest (LRU)
+MANIFEST_CACHE_MAX = 256
+_manifest_cache: "OrderedDict[str, tuple[tuple[int, int], Any]]" = OrderedDict()
+_manifest_cache_lock = threading.Lock()
 
 _RUN_ID_LINE_RE = re.compile(r"run_id\s*=\s*(\S+)")
 
@@ -73,6 +84,10 @@ _ALLOWED_TENANTS: set[str] = (
     if _ALLOWED_TENANTS_RAW else set()
 )
 
+# Zero-copy downloads behind Caddy (env at load time). When set, large nas_analyze files are
+# handed to the proxy via X-Accel-Redirect and served with sendfile(2); see infra/Caddyfile.
+_ACCEL_REDIRECT_PREFIX = os.environ.get("MORTGAGEDOCAI_ACCEL_REDIRECT_PREFIX", "").strip().rstrip("/")
+
 def _get_base_path() -> Path:
     return NAS_ANALYZE
 
@@ -82,6 +97,7 @@ def _get_base_path() -> Path:
 # ---------------------------------------------------------------------------
 from loan_service.adapters_disk import DiskJobStore, JobKeyIndexImpl, LoanLockImpl, _truncate
 from loan_service.adapters_subprocess import SubprocessRunner
+from loan_service.nas_io import ARTIFACT_SCAN_POOL, NasFileResponse, nas_io, run_step_tail, scan_profile_dir
 from loan_service.service import JobService
 
 _store = DiskJobStore(_get_base_path)
@@ -114,10 +130,12 @@ def _utc_run_id() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H%M%SZ")
 
 
+# Word chars and dashes with at least one alphanumeric (same as the old str.replace/isalnum chain)
+_LOAN_DIR_RE = re.compile(r"[\w-]*[^\W_][\w-]*")
+
+
 def _is_loan_dir(name: str) -> bool:
-    if not name or name.startswith("."):
-        return False
-    return name.replace("-", "").replace("_", "").isalnum() or name.isdigit()
+    return _LOAN_DIR_RE.fullmatch(name) is not None
 
 
 # Source-of-truth loan folder detection (under SOURCE_LOANS_ROOT, 2-level enumerate)
@@ -238,15 +256,17 @@ PROFILE_FILE_NAMES = (
     "decision.md",
     "version.json",
 )
+PROFILE_FILE_NAMES_SET = frozenset(PROFILE_FILE_NAMES)
+
+
+_UNSAFE_COMPONENT_RE = re.compile(r"\.\.|[/\\]")
 
 
 def _safe_single_component(name: str) -> bool:
-    if not name or ".." in name or "/" in name or "\\" in name:
-        return False
-    return True
+    return bool(name) and _UNSAFE_COMPONENT_RE.search(name) is None
 
 
-def _media_type_for_filename(filename: str) -> str:
+def _media_type_by_suffix(filename: str) -> str:
     if filename.endswith(".json") and filename != ".json":
         return "application/json"
     if filename.endswith(".jsonl"):
@@ -258,83 +278,130 @@ def _media_type_for_filename(filename: str) -> str:
     return "application/octet-stream"
 
 
-def _sha256_file(path: Path) -> str:
+# Fixed artifact names resolve with one dict lookup; other names (e.g. form templates) fall back to suffixes.
+_PROFILE_MEDIA_TYPES = {name: _media_type_by_suffix(name) for name in PROFILE_FILE_NAMES}
+
+
+def _media_type_for_filename(filename: str) -> str:
+    return _PROFILE_MEDIA_TYPES.get(filename) or _media_type_by_suffix(filename)
+
+
+def _sha256_file(path: str) -> str:
+    # readinto() a single reusable buffer: no per-chunk bytes allocation, and
+    # unbuffered reads go straight from the page cache into it (hashlib drops the GIL).
     h = hashlib.sha256()
-    with path.open("rb") as f:
+    buf = bytearray(SHA256_READ_CHUNK)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
         while True:
-            chunk = f.read(1024 * 1024)
-            if not chunk:
+            n = f.readinto(buf)
+            if not n:
                 break
-            h.update(chunk)
+            h.update(view[:n])
     return h.hexdigest()
 
 
+def _nas_analyze_file_response(
+    path: str | Path, media_type: str, headers: dict[str, str], stat_result: os.stat_result | None = None
+) -> Response:
+    """Serve a file under NAS_ANALYZE. With MORTGAGEDOCAI_ACCEL_REDIRECT_PREFIX set, return an empty
+    X-Accel-Redirect response so the reverse proxy streams the bytes; otherwise a plain FileResponse."""
+    if _ACCEL_REDIRECT_PREFIX:
+        root = os.path.realpath(NAS_ANALYZE)
+        real = os.path.realpath(path)
+        if real.startswith(root + os.sep):
+            rel = real[len(root) + 1:].replace(os.sep, "/")
+            return Response(
+                media_type=media_type,
+                headers={**headers, "X-Accel-Redirect": f"{_ACCEL_REDIRECT_PREFIX}/{quote(rel)}"},
+            )
+    return NasFileResponse(path=path, media_type=media_type, headers=headers, stat_result=stat_result)
+
+
+def _stat_or_none(path: str) -> os.stat_result | None:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _load_manifest(path: str, st: os.stat_result | None = None) -> Any:
+    """Parsed job_manifest.json, reused while the file's (mtime_ns, size) is unchanged.
+
+    Shared by run status and the artifacts index so pollers hitting both parse once.
+    Raises OSError / orjson.JSONDecodeError like a direct read. Pass st when the caller
+    has just stat()ed the file.
+    """
+    if st is None:
+        st = os.stat(path)
+    sig = (st.st_mtime_ns, st.st_size)
+    with _manifest_cache_lock:
+        ent = _manifest_cache.get(path)
+        if ent is not None and ent[0] == sig:
+            _manifest_cache.move_to_end(path)
+            return ent[1]
+    with open(path, "rb") as f:
+        data = orjson.loads(f.read())
+    with _manifest_cache_lock:
+        _manifest_cache[path] = (sig, data)
+        _manifest_cache.move_to_end(path)
+        while len(_manifest_cache) > MANIFEST_CACHE_MAX:
+            _manifest_cache.popitem(last=False)
+    return data
+
+
+def _analyze_loan_dir(tenant_id: str, loan_id: str) -> str:
+    """nas_analyze/tenants/<t>/loans/<l> as a plain string (hot endpoints skip Path objects)."""
+    return os.path.join(NAS_ANALYZE, "tenants", tenant_id, "loans", loan_id)
+
+
 def _build_artifacts_index(tenant_id: str, loan_id: str, run_id: str) -> dict[str, Any]:
-    base = NAS_ANALYZE / "tenants" / tenant_id / "loans" / loan_id / run_id
-    if not base.is_dir():
+    loan_dir = _analyze_loan_dir(tenant_id, loan_id)
+    if not os.path.isdir(os.path.join(loan_dir, run_id)):
         raise FileNotFoundError("Run not found")
-    base_dir = str(base.resolve())
-    retrieve_base = NAS_ANALYZE / "tenants" / tenant_id / "loans" / loan_id / "retrieve" / run_id
-    rp_path = retrieve_base / "retrieval_pack.json"
-    rp_exists = rp_path.is_file()
+    # One realpath for the loan dir; every path reported below is joined onto it.
+    loan_dir_real = os.path.realpath(loan_dir)
+    base_dir = os.path.join(loan_dir_real, run_id)
+    rp_path = os.path.join(loan_dir_real, "retrieve", run_id, "retrieval_pack.json")
+    # One stat per artifact answers both "present at all" (path) and "regular file" (exists).
+    rp_st = _stat_or_none(rp_path)
+    rp_exists = rp_st is not None and stat.S_ISREG(rp_st.st_mode)
     rp_sha256: str | None = None
     if rp_exists:
         try:
             rp_sha256 = _sha256_file(rp_path)
         except OSError:
             pass
-    manifest_path = base / "job_manifest.json"
-    manifest_exists = manifest_path.is_file()
+    manifest_path = os.path.join(base_dir, "job_manifest.json")
+    manifest_st = _stat_or_none(manifest_path)
+    manifest_exists = manifest_st is not None and stat.S_ISREG(manifest_st.st_mode)
     manifest_status: str | None = None
     if manifest_exists:
         try:
-            with manifest_path.open() as f:
-                manifest = json.load(f)
+            manifest = _load_manifest(manifest_path, manifest_st)
             manifest_status = manifest.get("status") if isinstance(manifest, dict) else None
-        except (json.JSONDecodeError, OSError):
+        except (orjson.JSONDecodeError, OSError):
             pass
     retrieval_pack = {
-        "path": str(rp_path.resolve()) if rp_path.exists() else None,
+        "path": rp_path if rp_st is not None else None,
         "sha256": rp_sha256,
         "exists": rp_exists,
     }
     job_manifest = {
-        "path": str(manifest_path.resolve()) if manifest_path.exists() else None,
+        "path": manifest_path if manifest_st is not None else None,
         "exists": manifest_exists,
         "status": manifest_status,
     }
-    profiles_dir = base / "outputs" / "profiles"
+    profiles_dir = os.path.join(base_dir, "outputs", "profiles")
     profiles_list: List[dict[str, Any]] = []
-    if profiles_dir.is_dir():
-        profile_dirs = sorted([d for d in profiles_dir.iterdir() if d.is_dir()])
-        for prof_dir in profile_dirs:
-            name = prof_dir.name
-            files_list: List[dict[str, Any]] = []
-            for fname in PROFILE_FILE_NAMES:
-                fpath = prof_dir / fname
-                exists = fpath.is_file()
-                entry: dict[str, Any] = {
-                    "name": fname,
-                    "path": str(fpath.resolve()),
-                    "exists": exists,
-                }
-                if exists:
-                    try:
-                        st = fpath.stat()
-                        entry["size_bytes"] = st.st_size
-                        entry["mtime_utc"] = datetime.fromtimestamp(st.st_mtime, tz=timezone.utc).isoformat().replace("+00:00", "Z")
-                    except OSError:
-                        entry["size_bytes"] = None
-                        entry["mtime_utc"] = None
-                else:
-                    entry["size_bytes"] = None
-                    entry["mtime_utc"] = None
-                files_list.append(entry)
-            profiles_list.append({
-                "name": name,
-                "dir": str(prof_dir.resolve()),
-                "files": files_list,
-            })
+    if os.path.isdir(profiles_dir):
+        with os.scandir(profiles_dir) as it:
+            profile_dirs = [os.path.join(profiles_dir, n) for n in sorted(de.name for de in it if de.is_dir())]
+        # Threads overlap per-file stat round-trips on the NAS mount; map() keeps name order.
+        profiles_list = list(ARTIFACT_SCAN_POOL.map(
+            partial(scan_profile_dir, file_names=PROFILE_FILE_NAMES, file_names_set=PROFILE_FILE_NAMES_SET),
+            profile_dirs,
+        ))
     return {
         "tenant_id": tenant_id,
         "loan_id": loan_id,
@@ -700,32 +767,38 @@ async def _startup() -> None:
     # 3. For orphaned jobs, undo the recovery and restore RUNNING so the watcher can
     #    finalise them correctly once the scope exits.
     for job_id, _tid, _lid, _run_id in orphaned:
-        with _service._lock:
+        with _service._job_lock(job_id):
             if job_id in _service._jobs:
-                _service._jobs[job_id]["status"] = "RUNNING"
-                _service._jobs[job_id]["finished_at_utc"] = None
-                _service._jobs[job_id]["error"] = None
-                _store.save(dict(_service._jobs[job_id]))
+                job = _service._jobs[job_id]
+                job.status = "RUNNING"
+                job.finished_at_utc = None
+                job.error = None
+                _store.save(job.to_dict())
         t = threading.Thread(target=_watch_orphaned_job, args=(job_id,), daemon=True)
         t.start()
 
 
 
+# Static bodies for / and /health (load-balancer pings): pre-encoded once, no per-request JSON encoding.
+_ROOT_BODY = orjson.dumps({
+    "service": "MortgageDocAI Loan API",
+    "docs": "/docs",
+    "health": "/health",
+    "tenants": "/tenants/{tenant_id}/loans",
+    "jobs": "/tenants/{tenant_id}/loans/{loan_id}/jobs",
+    "ui": "/ui",
+})
+_HEALTH_BODY = orjson.dumps({"status": "ok"})
+
+
 @app.get("/")
-def root() -> dict[str, Any]:
-    return {
-        "service": "MortgageDocAI Loan API",
-        "docs": "/docs",
-        "health": "/health",
-        "tenants": "/tenants/{tenant_id}/loans",
-        "jobs": "/tenants/{tenant_id}/loans/{loan_id}/jobs",
-        "ui": "/ui",
-    }
+def root() -> Response:
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/health")
-def health() -> dict[str, str]:
-    return {"status": "ok"}
+def health() -> Response:
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 @app.get("/ollama/models")
@@ -758,15 +831,18 @@ def browse_source(base: str = DEFAULT_SOURCE_BASE) -> dict[str, Any]:
 
 
 @app.get("/tenants/{tenant_id}/loans")
-def list_loans(tenant_id: str) -> dict[str, list[str]]:
-    loans_dir = NAS_ANALYZE / "tenants" / tenant_id / "loans"
-    if not loans_dir.is_dir():
+async def list_loans(tenant_id: str) -> dict[str, list[str]]:
+    return await nas_io(_list_loans, tenant_id)
+
+
+def _list_loans(tenant_id: str) -> dict[str, list[str]]:
+    loans_dir = os.path.join(NAS_ANALYZE, "tenants", tenant_id, "loans")
+    if not os.path.isdir(loans_dir):
         raise HTTPException(status_code=404, detail=f"Tenant loans path not found: {loans_dir}")
-    loan_ids = [
-        d.name for d in loans_dir.iterdir()
-        if d.is_dir() and _is_loan_dir(d.name)
-    ]
-    return {"loan_ids": sorted(loan_ids)}
+    # Name check first: is_dir() is free from d_type on most entries but may stat the rest.
+    with os.scandir(loans_dir) as it:
+        loan_ids = sorted(d.name for d in it if _is_loan_dir(d.name) and d.is_dir())
+    return {"loan_ids": loan_ids}
 
 
 def _ensure_source_loans_root_mounted() -> None:
@@ -817,6 +893,8 @@ def start_run(tenant_id: str, loan_id: str, body: StartRunBody) -> dict[str, Any
         cmd += ["--skip-process"]
     if body.source_path:
         cmd += ["--source-path", body.source_path]
+    # Popen (not os.posix_spawn): with no preexec_fn CPython >= 3.10 launches via vfork, so the
+    # API's RSS is never copied; posix_spawn has no portable chdir for cwd and would leave us reaping pids.
     try:
         subprocess.Popen(
             cmd,
@@ -836,38 +914,48 @@ def start_run(tenant_id: str, loan_id: str, body: StartRunBody) -> dict[str, Any
 
 
 @app.get("/tenants/{tenant_id}/loans/{loan_id}/runs")
-def list_runs(tenant_id: str, loan_id: str) -> dict[str, list[str]]:
-    loan_dir = NAS_ANALYZE / "tenants" / tenant_id / "loans" / loan_id
-    if not loan_dir.is_dir():
+async def list_runs(tenant_id: str, loan_id: str) -> dict[str, list[str]]:
+    return await nas_io(_list_runs, tenant_id, loan_id)
+
+
+def _list_runs(tenant_id: str, loan_id: str) -> dict[str, list[str]]:
+    loan_dir = _analyze_loan_dir(tenant_id, loan_id)
+    if not os.path.isdir(loan_dir):
         raise HTTPException(status_code=404, detail=f"Loan path not found: {loan_dir}")
     run_ids = []
-    for d in loan_dir.iterdir():
-        if not d.is_dir():
-            continue
-        if (d / "job_manifest.json").exists() or (d / "outputs").is_dir():
-            run_ids.append(d.name)
-    return {"run_ids": sorted(run_ids)}
+    with os.scandir(loan_dir) as it:
+        for d in it:
+            if not d.is_dir():
+                continue
+            if (os.path.exists(os.path.join(d.path, "job_manifest.json"))
+                    or os.path.isdir(os.path.join(d.path, "outputs"))):
+                run_ids.append(d.name)
+    run_ids.sort()
+    return {"run_ids": run_ids}
 
 
 @app.get("/tenants/{tenant_id}/loans/{loan_id}/runs/{run_id}")
-def get_run_status(tenant_id: str, loan_id: str, run_id: str) -> dict[str, Any]:
-    manifest_path = NAS_ANALYZE / "tenants" / tenant_id / "loans" / loan_id / run_id / "job_manifest.json"
-    if not manifest_path.exists():
+async def get_run_status(tenant_id: str, loan_id: str, run_id: str) -> dict[str, Any]:
+    return await nas_io(_run_status, tenant_id, loan_id, run_id)
+
+
+def _run_status(tenant_id: str, loan_id: str, run_id: str) -> dict[str, Any]:
+    manifest_path = os.path.join(_analyze_loan_dir(tenant_id, loan_id), run_id, "job_manifest.json")
+    if not os.path.exists(manifest_path):
         raise HTTPException(
             status_code=404,
             detail=f"job_manifest.json not found at {manifest_path}. Run may not exist or job not finished.",
         )
     try:
-        with manifest_path.open() as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
+        return _load_manifest(manifest_path)
+    except orjson.JSONDecodeError as e:
         raise HTTPException(status_code=500, detail=f"Invalid JSON in {manifest_path}: {e}")
 
 
 @app.get("/tenants/{tenant_id}/loans/{loan_id}/runs/{run_id}/artifacts")
-def get_run_artifacts(tenant_id: str, loan_id: str, run_id: str) -> dict[str, Any]:
+async def get_run_artifacts(tenant_id: str, loan_id: str, run_id: str) -> dict[str, Any]:
     try:
-        return _build_artifacts_index(tenant_id, loan_id, run_id)
+        return await nas_io(_build_artifacts_index, tenant_id, loan_id, run_id)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Run not found")
 
@@ -881,24 +969,22 @@ def get_document_inventory(tenant_id: str, loan_id: str, run_id: str) -> dict[st
 @app.get("/tenants/{tenant_id}/loans/{loan_id}/runs/{run_id}/artifacts/{profile}/{filename}")
 def get_profile_artifact(
     tenant_id: str, loan_id: str, run_id: str, profile: str, filename: str
-) -> FileResponse:
-    base = NAS_ANALYZE / "tenants" / tenant_id / "loans" / loan_id / run_id
-    if not base.is_dir():
+) -> Response:
+    base = os.path.join(_analyze_loan_dir(tenant_id, loan_id), run_id)
+    if not os.path.isdir(base):
         raise HTTPException(status_code=404, detail="Run not found")
     if not _safe_single_component(profile) or not _safe_single_component(filename):
         raise HTTPException(status_code=404, detail="Artifact not found")
-    if filename not in PROFILE_FILE_NAMES:
+    if filename not in PROFILE_FILE_NAMES_SET:
         raise HTTPException(status_code=404, detail="Artifact not found")
-    profiles_base = (base / "outputs" / "profiles").resolve()
-    candidate = (profiles_base / profile / filename).resolve()
-    try:
-        candidate.relative_to(profiles_base)
-    except ValueError:
+    profiles_base = os.path.realpath(os.path.join(base, "outputs", "profiles"))
+    candidate = os.path.realpath(os.path.join(profiles_base, profile, filename))
+    if not candidate.startswith(profiles_base + os.sep):
         raise HTTPException(status_code=404, detail="Artifact not found")
-    if not candidate.is_file():
+    if not os.path.isfile(candidate):
         raise HTTPException(status_code=404, detail="Artifact not found")
-    return FileResponse(
-        path=str(candidate),
+    return _nas_analyze_file_response(
+        candidate,
         media_type=_media_type_for_filename(filename),
         headers={"Content-Disposition": f'inline; filename="{filename}"'},
     )
@@ -964,30 +1050,26 @@ def generate_formfill(
 
 
 @app.get("/tenants/{tenant_id}/loans/{loan_id}/runs/{run_id}/retrieval_pack")
-def get_retrieval_pack(tenant_id: str, loan_id: str, run_id: str) -> FileResponse:
-    rp_path = (
-        NAS_ANALYZE / "tenants" / tenant_id / "loans" / loan_id
-        / "retrieve" / run_id / "retrieval_pack.json"
-    )
-    if not rp_path.is_file():
+def get_retrieval_pack(tenant_id: str, loan_id: str, run_id: str) -> Response:
+    rp_path = os.path.join(_analyze_loan_dir(tenant_id, loan_id), "retrieve", run_id, "retrieval_pack.json")
+    rp_st = _stat_or_none(rp_path)
+    if rp_st is None or not stat.S_ISREG(rp_st.st_mode):
         raise HTTPException(status_code=404, detail="Retrieval pack not found")
-    return FileResponse(
-        path=str(rp_path.resolve()),
+    return _nas_analyze_file_response(
+        os.path.realpath(rp_path),
         media_type="application/json",
         headers={"Content-Disposition": 'inline; filename="retrieval_pack.json"'},
+        stat_result=rp_st,
     )
 
 
 @app.get("/tenants/{tenant_id}/loans/{loan_id}/runs/{run_id}/job_manifest")
-def get_job_manifest(tenant_id: str, loan_id: str, run_id: str) -> FileResponse:
-    manifest_path = (
-        NAS_ANALYZE / "tenants" / tenant_id / "loans" / loan_id / run_id
-        / "job_manifest.json"
-    )
-    if not manifest_path.is_file():
+def get_job_manifest(tenant_id: str, loan_id: str, run_id: str) -> Response:
+    manifest_path = os.path.join(_analyze_loan_dir(tenant_id, loan_id), run_id, "job_manifest.json")
+    if not os.path.isfile(manifest_path):
         raise HTTPException(status_code=404, detail="Job manifest not found")
-    return FileResponse(
-        path=str(manifest_path.resolve()),
+    return _nas_analyze_file_response(
+        os.path.realpath(manifest_path),
         media_type="application/json",
         headers={"Content-Disposition": 'inline; filename="job_manifest.json"'},
     )
@@ -1082,7 +1164,7 @@ def submit_query_job(
 
 
 @app.post("/tenants/{tenant_id}/loans/{loan_id}/runs/{run_id}/query")
-def query_run(tenant_id: str, loan_id: str, run_id: str, body: QueryBody) -> dict[str, Any]:
+async def query_run(tenant_id: str, loan_id: str, run_id: str, body: QueryBody) -> dict[str, Any]:
     valid_profiles = ("default", "uw_conditions", "income_analysis", "uw_decision")
     if body.profile not in valid_profiles:
         raise HTTPException(status_code=422, detail=f"profile must be one of {valid_profiles}")
@@ -1101,10 +1183,9 @@ def query_run(tenant_id: str, loan_id: str, run_id: str, body: QueryBody) -> dic
     ]
     if body.offline_embeddings:
         step13_cmd.append("--offline-embeddings")
-    result13 = subprocess.run(step13_cmd, cwd=str(REPO_ROOT), env=env, capture_output=True, text=True)
-    if result13.returncode != 0:
-        stderr_tail = (result13.stderr or result13.stdout or "")[-2000:]
-        raise HTTPException(status_code=500, detail=f"Step13 failed (exit {result13.returncode}). stderr tail: {stderr_tail}")
+    rc13, stderr_tail = await run_step_tail(step13_cmd, REPO_ROOT, env)
+    if rc13 != 0:
+        raise HTTPException(status_code=500, detail=f"Step13 failed (exit {rc13}). stderr tail: {stderr_tail}")
     step12_cmd = [
         sys.executable, step12,
         "--tenant-id", tenant_id,
@@ -1118,21 +1199,20 @@ def query_run(tenant_id: str, loan_id: str, run_id: str, body: QueryBody) -> dic
         step12_cmd += ["--llm-model", body.llm_model]
     # Lower evidence + tokens for API "Ask a question" so Ollama can complete on weak/sandbox servers
     step12_cmd += ["--ollama-timeout", "600", "--evidence-max-chars", "6000", "--llm-max-tokens", "400"]
-    result12 = subprocess.run(step12_cmd, cwd=str(REPO_ROOT), env=env, capture_output=True, text=True)
-    if result12.returncode != 0:
-        stderr_tail = (result12.stderr or result12.stdout or "")[-2000:]
-        raise HTTPException(status_code=500, detail=f"Step12 failed (exit {result12.returncode}). stderr tail: {stderr_tail}")
+    rc12, stderr_tail = await run_step_tail(step12_cmd, REPO_ROOT, env)
+    if rc12 != 0:
+        raise HTTPException(status_code=500, detail=f"Step12 failed (exit {rc12}). stderr tail: {stderr_tail}")
     answer_path = (
         NAS_ANALYZE / "tenants" / tenant_id / "loans" / loan_id / run_id
         / "outputs" / "profiles" / body.profile / "answer.json"
     )
-    if not answer_path.exists():
-        stderr_tail = (result12.stderr or result12.stdout or "")[-2000:]
+    try:
+        raw = await nas_io(answer_path.read_bytes)
+    except FileNotFoundError:
         raise HTTPException(status_code=500, detail=f"Profile output missing: {answer_path}. Step12 stderr tail: {stderr_tail}")
     try:
-        with answer_path.open() as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError as e:
         raise HTTPException(status_code=500, detail=f"Invalid JSON in {answer_path}: {e}")
 
 
@@ -1155,16 +1235,16 @@ def submit_job(tenant_id: str, loan_id: str, body: SubmitJobBody) -> dict[str, A
 
 
 @app.get("/jobs/{job_id}")
-def get_job_status(job_id: str) -> dict[str, Any]:
-    job = _service.get_job(job_id)
+async def get_job_status(job_id: str) -> dict[str, Any]:
+    job = await nas_io(_service.get_job, job_id)
     if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
 
 
 @app.get("/jobs")
-def list_jobs(limit: int = 50, status: str | None = None) -> dict[str, list[dict[str, Any]]]:
-    return _service.list_jobs(limit=limit, status=status)
+async def list_jobs(limit: int = 50, status: str | None = None) -> dict[str, list[dict[str, Any]]]:
+    return await nas_io(lambda: _service.list_jobs(limit=limit, status=status))
 
 
 # ---------------------------------------------------------------------------
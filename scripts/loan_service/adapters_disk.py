@@ -1,15 +1,19 @@
 """Disk-backed job store, job-key index, loan lock; manifest/truncation helpers."""
 from __future__ import annotations
 
+import functools
 import hashlib
 import json
 import os
 import re
 import sys
+import threading
 import time
 from pathlib import Path
 from typing import Any, Callable
 
+import orjson
+
 from .domain import _utc_now_z
 
 # Same caps and limits as job_runner
@@ -19,8 +23,11 @@ ERROR_TRUNCATE = 4_000
 JOB_RELOAD_LIMIT = int(os.environ.get("JOB_RELOAD_LIMIT", "500"))
 JOB_RETENTION_DAYS = int(os.environ.get("JOB_RETENTION_DAYS", "30"))
 LOCK_RETRY_SEC = 2
+# Debounce window for save_progress(): a burst of progress snapshots becomes one write per job
+PROGRESS_FLUSH_SEC = 0.02
 
-_RUN_ID_LINE_RE = re.compile(r"run_id\s*=\s*(\S+)")
+# [ \t] rather than \s so a match never spans lines (searched over the whole stdout, not per line).
+_RUN_ID_LINE_RE = re.compile(r"run_id[ \t]*=[ \t]*(\S+)")
 
 
 def _truncate(s: str, max_len: int) -> str:
@@ -29,36 +36,97 @@ def _truncate(s: str, max_len: int) -> str:
     return s[:max_len] + "\n... (truncated)"
 
 
+class _CappedText:
+    """Append-only text that renders exactly like repeated _truncate(current + s, cap).
+
+    Appends are O(len(s)) instead of re-copying the accumulated text per line; once past
+    the cap, further appends are dropped (the truncated head would not change).
+    """
+
+    __slots__ = ("_parts", "_len", "_cap")
+
+    def __init__(self, initial: str, cap: int) -> None:
+        self._parts = [initial] if initial else []
+        self._len = len(initial)
+        self._cap = cap
+
+    def append(self, s: str) -> None:
+        if self._len > self._cap:
+            return
+        self._parts.append(s)
+        self._len += len(s)
+
+    def render(self) -> str:
+        return _truncate("".join(self._parts), self._cap)
+
+
 def _parse_run_id_from_stdout(stdout: str) -> str | None:
-    for line in stdout.splitlines():
-        m = _RUN_ID_LINE_RE.search(line)
-        if m:
-            return m.group(1).strip()
-    return None
+    # run_loan_job prints "run_id = ..." before any step runs, so the search stops near the head
+    # instead of splitting the whole captured stdout into lines.
+    m = _RUN_ID_LINE_RE.search(stdout)
+    return m.group(1) if m else None
+
+
+def _parse_manifest_summary_from_stdout(stdout: str, run_id: str) -> dict[str, Any] | None:
+    """Return the last MANIFEST:{...} line run_loan_job printed for run_id, or None.
+
+    None (absent, truncated away, unparsable or another run_id) means: read the manifest file.
+    """
+    idx = stdout.rfind("\nMANIFEST:")
+    if idx < 0:
+        return None
+    line = stdout[idx + len("\nMANIFEST:"):].split("\n", 1)[0]
+    try:
+        summary = orjson.loads(line)
+    except orjson.JSONDecodeError:
+        return None
+    if not isinstance(summary, dict) or summary.get("run_id") != run_id:
+        return None
+    return summary
+
+
+# Reused encoder: json.dumps() with non-default options builds a fresh JSONEncoder per call.
+_JOB_KEY_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
 
 
 def compute_job_key(tenant_id: str, loan_id: str, req: dict[str, Any]) -> str:
     """Stable sha256 of tenant_id + loan_id + request for idempotency."""
     payload = {"tenant_id": tenant_id, "loan_id": loan_id, "request": req}
-    raw = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    raw = _JOB_KEY_ENCODER.encode(payload).encode()
     return hashlib.sha256(raw).hexdigest()
 
 
+MANIFEST_CACHE_MAX = 1024
+
+
+@functools.lru_cache(maxsize=MANIFEST_CACHE_MAX)
+def _parse_manifest(path: str, mtime_ns: int, size: int) -> dict[str, Any] | None:
+    """Parse job_manifest.json; (mtime_ns, size) in the key invalidate the entry on rewrite.
+    The returned dict is shared between callers and must be treated as read-only."""
+    try:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    except (orjson.JSONDecodeError, OSError):
+        return None
+
+
+def _manifest_path(get_base: Callable[[], Path], tenant_id: str, loan_id: str, run_id: str) -> Path:
+    return get_base() / "tenants" / tenant_id / "loans" / loan_id / run_id / "job_manifest.json"
+
+
 def load_manifest_if_present(
     get_base: Callable[[], Path],
     tenant_id: str,
     loan_id: str,
     run_id: str,
 ) -> dict[str, Any] | None:
-    base = get_base()
-    mp = base / "tenants" / tenant_id / "loans" / loan_id / run_id / "job_manifest.json"
-    if not mp.exists():
-        return None
+    """Return the parsed manifest (read-only, cached by mtime) or None; one stat per call."""
+    mp = _manifest_path(get_base, tenant_id, loan_id, run_id)
     try:
-        with mp.open() as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError):
+        st = os.stat(mp)
+    except OSError:
         return None
+    return _parse_manifest(str(mp), st.st_mtime_ns, st.st_size)
 
 
 def result_from_manifest(
@@ -71,8 +139,7 @@ def result_from_manifest(
     manifest = load_manifest_if_present(get_base, tenant_id, loan_id, run_id)
     if not manifest or manifest.get("status") != "SUCCESS":
         return None
-    base = get_base()
-    mp = base / "tenants" / tenant_id / "loans" / loan_id / run_id / "job_manifest.json"
+    mp = _manifest_path(get_base, tenant_id, loan_id, run_id)
     return {
         "manifest_path": str(mp),
         "status": manifest.get("status"),
@@ -86,6 +153,13 @@ class DiskJobStore:
 
     def __init__(self, get_base_path: Callable[[], Path]):
         self._get_base = get_base_path
+        # Progress snapshots waiting for the flusher (latest per job_id wins).
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._pending_lock = threading.Lock()
+        # Serializes job-file writes so a queued snapshot can never land after a newer save().
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher: threading.Thread | None = None
 
     def _job_file_path(self, tenant_id: str, loan_id: str, job_id: str) -> Path:
         base = self._get_base()
@@ -311,7 +385,7 @@ class DiskJobStore:
                     print(f"[job_runner] retention delete failed {path}: {e}", file=sys.stderr)
         return jobs
 
-    def save(self, job: dict[str, Any]) -> None:
+    def _write_job(self, job: dict[str, Any]) -> None:
         tenant_id = job.get("tenant_id")
         loan_id = job.get("loan_id")
         job_id = job.get("job_id")
@@ -321,12 +395,50 @@ class DiskJobStore:
         try:
             path.parent.mkdir(parents=True, exist_ok=True)
             tmp = path.with_suffix(path.suffix + ".tmp")
-            with tmp.open("w") as f:
-                json.dump(job, f, indent=None)
+            # One C-level encode straight to bytes; stdout/stderr make these files tens of KB.
+            tmp.write_bytes(orjson.dumps(job))
             os.replace(tmp, path)
         except OSError as e:
             print(f"[job_runner] persist failed: {e}", file=sys.stderr)
 
+    def save(self, job: dict[str, Any]) -> None:
+        """Write job now; supersedes any progress snapshot still queued for it."""
+        with self._write_lock:
+            with self._pending_lock:
+                self._pending.pop(job.get("job_id"), None)
+            self._write_job(job)
+
+    def save_progress(self, job: dict[str, Any]) -> None:
+        """Queue a snapshot of a running job; the flusher thread writes the latest one per job.
+
+        Used for stdout progress (PHASE lines), where bursts would otherwise rewrite the
+        whole job file once per line. State transitions use save().
+        """
+        job_id = job.get("job_id")
+        if not job_id:
+            return
+        with self._pending_lock:
+            self._pending[job_id] = dict(job)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="job-store-flush", daemon=True)
+                self._flusher.start()
+        self._wake.set()
+
+    def _flush(self) -> None:
+        """Write all queued progress snapshots now."""
+        with self._write_lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, {}
+            for job in batch.values():
+                self._write_job(job)
+
+    def _flush_loop(self) -> None:
+        while True:
+            self._wake.wait()
+            time.sleep(PROGRESS_FLUSH_SEC)
+            self._wake.clear()
+            self._flush()
+
     # ------------------------------------------------------------------
     # Job-ID index: _meta/job_index/{job_id}.json -> {tenant_id, loan_id}
     # Enables get_job(job_id) to load from disk without any in-memory cache.
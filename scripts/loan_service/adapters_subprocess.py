@@ -10,7 +10,13 @@ import time
 from pathlib import Path
 from typing import Any
 
-from .adapters_disk import STDOUT_TRUNCATE, STDERR_TRUNCATE, _parse_run_id_from_stdout, _truncate
+from .adapters_disk import (
+    STDOUT_TRUNCATE,
+    STDERR_TRUNCATE,
+    _CappedText,
+    _parse_run_id_from_stdout,
+    _truncate,
+)
 
 JOB_TIMEOUT_DEFAULT = 3600
 _SCRIPT_DIR = Path(__file__).resolve().parent.parent  # scripts/
@@ -41,19 +47,26 @@ def _job_temp_rc(job_id: str) -> Path:
     return _TEMP_DIR / f"mortgagedocai-{job_id}.rc"
 
 
+_QUIET_ENV_OVERRIDES = {
+    "PYTHONUNBUFFERED": "1",
+    "HF_HUB_DISABLE_PROGRESS_BARS": "1",
+    "TRANSFORMERS_VERBOSITY": "error",
+    "TQDM_MININTERVAL": "999999",
+    "PYTHONPATH": str(SCRIPTS_DIR),
+}
+
+
 def _quiet_env() -> dict[str, str]:
-    env = dict(os.environ)
-    env["PYTHONUNBUFFERED"] = "1"
-    env["HF_HUB_DISABLE_PROGRESS_BARS"] = "1"
-    env["TRANSFORMERS_VERBOSITY"] = "error"
-    env["TQDM_MININTERVAL"] = "999999"
-    env["PYTHONPATH"] = str(SCRIPTS_DIR)
-    return env
+    return {**os.environ, **_QUIET_ENV_OVERRIDES}
 
 
-def get_job_env(request: dict[str, Any]) -> dict[str, str]:
-    """Build env for run_loan_job subprocess (quiet env + request-driven vars)."""
-    env = _quiet_env()
+def get_job_env(request: dict[str, Any], base_env: dict[str, str] | None = None) -> dict[str, str]:
+    """Build env for run_loan_job subprocess (quiet env + request-driven vars).
+
+    base_env: a _quiet_env() snapshot to copy instead of re-reading os.environ (which decodes
+    every entry on each iteration); never mutated.
+    """
+    env = dict(base_env) if base_env is not None else _quiet_env()
     env["SMOKE_DEBUG"] = "1" if request.get("smoke_debug") else "0"
     if "expect_rp_hash_stable" in request:
         env["EXPECT_RP_HASH_STABLE"] = "1" if request["expect_rp_hash_stable"] else "0"
@@ -185,8 +198,10 @@ class SubprocessRunner:
         if job_id and _SYSTEMD_RUN:
             return self._run_with_systemd(cmd, job_id, env, timeout, on_stdout_line)
 
-        stdout_parts: list[str] = []
-        stderr_parts: list[str] = []
+        # Bounded capture: text past the truncation cap is dropped as it streams in, so a noisy
+        # pipeline never holds more than ~cap characters per stream.
+        stdout_buf = _CappedText("", STDOUT_TRUNCATE)
+        stderr_buf = _CappedText("", STDERR_TRUNCATE)
 
         try:
             proc = subprocess.Popen(
@@ -202,7 +217,7 @@ class SubprocessRunner:
             def _read_stdout() -> None:
                 for line in proc.stdout or []:
                     line = line if line.endswith("\n") else line + "\n"
-                    stdout_parts.append(line)
+                    stdout_buf.append(line)
                     if on_stdout_line is not None:
                         try:
                             on_stdout_line(line)
@@ -211,7 +226,7 @@ class SubprocessRunner:
 
             def _read_stderr() -> None:
                 for line in proc.stderr or []:
-                    stderr_parts.append(line)
+                    stderr_buf.append(line)
 
             t_out = threading.Thread(target=_read_stdout, daemon=True)
             t_err = threading.Thread(target=_read_stderr, daemon=True)
@@ -223,16 +238,14 @@ class SubprocessRunner:
                 proc.kill()
                 proc.wait()
                 returncode = -1
-                stderr_parts.append(f"Job timed out after {timeout}s\n")
+                stderr_buf.append(f"Job timed out after {timeout}s\n")
             t_out.join(timeout=2.0)
             t_err.join(timeout=2.0)
         except Exception as e:
             returncode = -1
-            stderr_parts.append(str(e) + "\n")
+            stderr_buf.append(str(e) + "\n")
 
-        stdout = _truncate("".join(stdout_parts), STDOUT_TRUNCATE)
-        stderr = _truncate("".join(stderr_parts), STDERR_TRUNCATE)
-        return returncode, stdout, stderr
+        return returncode, stdout_buf.render(), stderr_buf.render()
 
     def _run_with_systemd(
         self,
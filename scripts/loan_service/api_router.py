@@ -2,13 +2,18 @@
 from __future__ import annotations
 
 import hashlib
-import json
+import os
+import re
+import stat
 import subprocess
 import sys
+import threading
 import time
-from datetime import datetime, timezone
+from collections import OrderedDict
+from functools import partial
 from pathlib import Path
 from typing import Any, Dict, List, Optional
+from urllib.parse import quote
 
 PROFILE_FILE_NAMES = (
     "answer.json",
@@ -20,16 +25,18 @@ PROFILE_FILE_NAMES = (
     "decision.md",
     "version.json",
 )
+PROFILE_FILE_NAMES_SET = frozenset(PROFILE_FILE_NAMES)
+
+
+_UNSAFE_COMPONENT_RE = re.compile(r"\.\.|[/\\]")
 
 
 def _safe_single_component(name: str) -> bool:
     """Reject path traversal: no .., no path separators, no empty."""
-    if not name or ".." in name or "/" in name or "\\" in name:
-        return False
-    return True
+    return bool(name) and _UNSAFE_COMPONENT_RE.search(name) is None
 
 
-def _media_type_for_filename(filename: str) -> str:
+def _media_type_by_suffix(filename: str) -> str:
     if filename.endswith(".json") and filename != ".json":
         return "application/json"
     if filename.endswith(".jsonl"):
@@ -38,19 +45,48 @@ def _media_type_for_filename(filename: str) -> str:
         return "text/markdown; charset=utf-8"
     return "application/octet-stream"
 
+
+# Fixed artifact names resolve with one dict lookup; other names (e.g. form templates) fall back to suffixes.
+_PROFILE_MEDIA_TYPES = {name: _media_type_by_suffix(name) for name in PROFILE_FILE_NAMES}
+
+
+def _media_type_for_filename(filename: str) -> str:
+    return _PROFILE_MEDIA_TYPES.get(filename) or _media_type_by_suffix(filename)
+
 WORKER_HEARTBEAT_MAX_AGE_SEC = 300
+SHA256_READ_CHUNK = 1024 * 1024
+MANIFEST_CACHE_MAX = 256
+_manifest_cache: "OrderedDict[str, tuple[tuple[int, int], Any]]" = OrderedDict()
+_manifest_cache_lock = threading.Lock()
 
+# X-Accel-Redirect prefix for zero-copy downloads behind Caddy (see infra/Caddyfile); empty = FileResponse.
+_ACCEL_REDIRECT_PREFIX = os.environ.get("MORTGAGEDOCAI_ACCEL_REDIRECT_PREFIX", "").strip().rstrip("/")
+
+import orjson
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
 
 from .adapters_subprocess import _quiet_env
+from .nas_io import ARTIFACT_SCAN_POOL, NasFileResponse, nas_io, run_step_tail, scan_profile_dir
+
+# Static bodies for / and /health, pre-encoded once (no per-request JSON encoding).
+_ROOT_BODY = orjson.dumps({
+    "service": "MortgageDocAI Loan API",
+    "docs": "/docs",
+    "health": "/health",
+    "tenants": "/tenants/{tenant_id}/loans",
+    "jobs": "/tenants/{tenant_id}/loans/{loan_id}/jobs",
+})
+_HEALTH_BODY = orjson.dumps({"status": "ok"})
+
+
+# Word chars and dashes with at least one alphanumeric (same as the old str.replace/isalnum chain)
+_LOAN_DIR_RE = re.compile(r"[\w-]*[^\W_][\w-]*")
+
 
-# Paths (injected by caller)
 def _is_loan_dir(name: str) -> bool:
-    if not name or name.startswith("."):
-        return False
-    return name.replace("-", "").replace("_", "").isalnum() or name.isdigit()
+    return _LOAN_DIR_RE.fullmatch(name) is not None
 
 
 class StartRunBody(BaseModel):
@@ -85,83 +121,120 @@ class SubmitJobBody(BaseModel):
     timeout: Optional[int] = Field(None, description="Subprocess timeout in seconds (default 3600)")
 
 
-def _sha256_file(path: Path) -> str:
+def _sha256_file(path: str) -> str:
+    # readinto() a single reusable buffer: no per-chunk bytes allocation, and
+    # unbuffered reads go straight from the page cache into it (hashlib drops the GIL).
     h = hashlib.sha256()
-    with path.open("rb") as f:
+    buf = bytearray(SHA256_READ_CHUNK)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
         while True:
-            chunk = f.read(1024 * 1024)
-            if not chunk:
+            n = f.readinto(buf)
+            if not n:
                 break
-            h.update(chunk)
+            h.update(view[:n])
     return h.hexdigest()
 
 
+def _nas_analyze_file_response(
+    nas_analyze: Path,
+    path: str,
+    media_type: str,
+    headers: Dict[str, str],
+    stat_result: Optional[os.stat_result] = None,
+) -> Response:
+    """X-Accel-Redirect handoff to the reverse proxy when configured; FileResponse otherwise."""
+    if _ACCEL_REDIRECT_PREFIX:
+        root = os.path.realpath(nas_analyze)
+        real = os.path.realpath(path)
+        if real.startswith(root + os.sep):
+            rel = real[len(root) + 1:].replace(os.sep, "/")
+            return Response(
+                media_type=media_type,
+                headers={**headers, "X-Accel-Redirect": f"{_ACCEL_REDIRECT_PREFIX}/{quote(rel)}"},
+            )
+    return NasFileResponse(path=path, media_type=media_type, headers=headers, stat_result=stat_result)
+
+
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _load_manifest(path: str, st: Optional[os.stat_result] = None) -> Any:
+    """Parsed job_manifest.json, reused while the file's (mtime_ns, size) is unchanged.
+
+    Shared by run status and the artifacts index so pollers hitting both parse once.
+    Raises OSError / orjson.JSONDecodeError like a direct read. Pass st when the caller
+    has just stat()ed the file.
+    """
+    if st is None:
+        st = os.stat(path)
+    sig = (st.st_mtime_ns, st.st_size)
+    with _manifest_cache_lock:
+        ent = _manifest_cache.get(path)
+        if ent is not None and ent[0] == sig:
+            _manifest_cache.move_to_end(path)
+            return ent[1]
+    with open(path, "rb") as f:
+        data = orjson.loads(f.read())
+    with _manifest_cache_lock:
+        _manifest_cache[path] = (sig, data)
+        _manifest_cache.move_to_end(path)
+        while len(_manifest_cache) > MANIFEST_CACHE_MAX:
+            _manifest_cache.popitem(last=False)
+    return data
+
+
 def _build_artifacts_index(nas_analyze: Path, tenant_id: str, loan_id: str, run_id: str) -> Dict[str, Any]:
-    base = nas_analyze / "tenants" / tenant_id / "loans" / loan_id / run_id
-    if not base.is_dir():
+    loan_dir = os.path.join(nas_analyze, "tenants", tenant_id, "loans", loan_id)
+    if not os.path.isdir(os.path.join(loan_dir, run_id)):
         raise FileNotFoundError("Run not found")
-    base_dir = str(base.resolve())
-    retrieve_base = nas_analyze / "tenants" / tenant_id / "loans" / loan_id / "retrieve" / run_id
-    rp_path = retrieve_base / "retrieval_pack.json"
-    rp_exists = rp_path.is_file()
+    # One realpath for the loan dir; every path reported below is joined onto it.
+    loan_dir_real = os.path.realpath(loan_dir)
+    base_dir = os.path.join(loan_dir_real, run_id)
+    rp_path = os.path.join(loan_dir_real, "retrieve", run_id, "retrieval_pack.json")
+    # One stat per artifact answers both "present at all" (path) and "regular file" (exists).
+    rp_st = _stat_or_none(rp_path)
+    rp_exists = rp_st is not None and stat.S_ISREG(rp_st.st_mode)
     rp_sha256: Optional[str] = None
     if rp_exists:
         try:
             rp_sha256 = _sha256_file(rp_path)
         except OSError:
             pass
-    manifest_path = base / "job_manifest.json"
-    manifest_exists = manifest_path.is_file()
+    manifest_path = os.path.join(base_dir, "job_manifest.json")
+    manifest_st = _stat_or_none(manifest_path)
+    manifest_exists = manifest_st is not None and stat.S_ISREG(manifest_st.st_mode)
     manifest_status: Optional[str] = None
     if manifest_exists:
         try:
-            with manifest_path.open() as f:
-                manifest = json.load(f)
+            manifest = _load_manifest(manifest_path, manifest_st)
             manifest_status = manifest.get("status") if isinstance(manifest, dict) else None
-        except (json.JSONDecodeError, OSError):
+        except (orjson.JSONDecodeError, OSError):
             pass
     retrieval_pack = {
-        "path": str(rp_path.resolve()) if rp_path.exists() else None,
+        "path": rp_path if rp_st is not None else None,
         "sha256": rp_sha256,
         "exists": rp_exists,
     }
     job_manifest = {
-        "path": str(manifest_path.resolve()) if manifest_path.exists() else None,
+        "path": manifest_path if manifest_st is not None else None,
         "exists": manifest_exists,
         "status": manifest_status,
     }
-    profiles_dir = base / "outputs" / "profiles"
+    profiles_dir = os.path.join(base_dir, "outputs", "profiles")
     profiles_list: List[Dict[str, Any]] = []
-    if profiles_dir.is_dir():
-        profile_dirs = sorted([d for d in profiles_dir.iterdir() if d.is_dir()])
-        for prof_dir in profile_dirs:
-            name = prof_dir.name
-            files_list: List[Dict[str, Any]] = []
-            for fname in PROFILE_FILE_NAMES:
-                fpath = prof_dir / fname
-                exists = fpath.is_file()
-                entry = {
-                    "name": fname,
-                    "path": str(fpath.resolve()),
-                    "exists": exists,
-                }
-                if exists:
-                    try:
-                        st = fpath.stat()
-                        entry["size_bytes"] = st.st_size
-                        entry["mtime_utc"] = datetime.fromtimestamp(st.st_mtime, tz=timezone.utc).isoformat().replace("+00:00", "Z")
-                    except OSError:
-                        entry["size_bytes"] = None
-                        entry["mtime_utc"] = None
-                else:
-                    entry["size_bytes"] = None
-                    entry["mtime_utc"] = None
-                files_list.append(entry)
-            profiles_list.append({
-                "name": name,
-                "dir": str(prof_dir.resolve()),
-                "files": files_list,
-            })
+    if os.path.isdir(profiles_dir):
+        with os.scandir(profiles_dir) as it:
+            profile_dirs = [os.path.join(profiles_dir, n) for n in sorted(de.name for de in it if de.is_dir())]
+        # Threads overlap per-file stat round-trips on the NAS mount; map() keeps name order.
+        profiles_list = list(ARTIFACT_SCAN_POOL.map(
+            partial(scan_profile_dir, file_names=PROFILE_FILE_NAMES, file_names_set=PROFILE_FILE_NAMES_SET),
+            profile_dirs,
+        ))
     return {
         "tenant_id": tenant_id,
         "loan_id": loan_id,
@@ -180,34 +253,33 @@ def create_router(
     repo_root: Path,
 ) -> APIRouter:
     router = APIRouter()
+    _nas_root = str(nas_analyze)
+
+    def _loan_dir(tenant_id: str, loan_id: str) -> str:
+        return os.path.join(_nas_root, "tenants", tenant_id, "loans", loan_id)
 
     @router.get("/")
-    def root() -> Dict[str, Any]:
-        return {
-            "service": "MortgageDocAI Loan API",
-            "docs": "/docs",
-            "health": "/health",
-            "tenants": "/tenants/{tenant_id}/loans",
-            "jobs": "/tenants/{tenant_id}/loans/{loan_id}/jobs",
-        }
+    def root() -> Response:
+        return Response(content=_ROOT_BODY, media_type="application/json")
 
     @router.get("/health")
-    def health() -> Dict[str, str]:
-        return {"status": "ok"}
+    def health() -> Response:
+        return Response(content=_HEALTH_BODY, media_type="application/json")
 
-    @router.get("/tenants/{tenant_id}/loans")
-    def list_loans(tenant_id: str) -> Dict[str, List[str]]:
-        loans_dir = nas_analyze / "tenants" / tenant_id / "loans"
-        if not loans_dir.is_dir():
+    def _list_loans(tenant_id: str) -> Dict[str, List[str]]:
+        loans_dir = os.path.join(_nas_root, "tenants", tenant_id, "loans")
+        if not os.path.isdir(loans_dir):
             raise HTTPException(
                 status_code=404,
                 detail=f"Tenant loans path not found: {loans_dir}",
             )
-        loan_ids = [
-            d.name for d in loans_dir.iterdir()
-            if d.is_dir() and _is_loan_dir(d.name)
-        ]
-        return {"loan_ids": sorted(loan_ids)}
+        with os.scandir(loans_dir) as it:
+            loan_ids = sorted(d.name for d in it if _is_loan_dir(d.name) and d.is_dir())
+        return {"loan_ids": loan_ids}
+
+    @router.get("/tenants/{tenant_id}/loans")
+    async def list_loans(tenant_id: str) -> Dict[str, List[str]]:
+        return await nas_io(_list_loans, tenant_id)
 
     @router.post("/tenants/{tenant_id}/loans/{loan_id}/runs", status_code=202)
     def start_run(tenant_id: str, loan_id: str, body: StartRunBody) -> Dict[str, Any]:
@@ -235,6 +307,8 @@ def create_router(
             cmd += ["--skip-process"]
         if body.source_path:
             cmd += ["--source-path", body.source_path]
+        # Popen (not os.posix_spawn): with no preexec_fn CPython >= 3.10 launches via vfork, so the
+        # API's RSS is never copied; posix_spawn has no portable chdir for cwd and would leave us reaping pids.
         try:
             subprocess.Popen(
                 cmd,
@@ -255,97 +329,100 @@ def create_router(
             "status": "STARTED",
         }
 
-    @router.get("/tenants/{tenant_id}/loans/{loan_id}/runs")
-    def list_runs(tenant_id: str, loan_id: str) -> Dict[str, List[str]]:
-        loan_dir = nas_analyze / "tenants" / tenant_id / "loans" / loan_id
-        if not loan_dir.is_dir():
+    def _list_runs(tenant_id: str, loan_id: str) -> Dict[str, List[str]]:
+        loan_dir = _loan_dir(tenant_id, loan_id)
+        if not os.path.isdir(loan_dir):
             raise HTTPException(
                 status_code=404,
                 detail=f"Loan path not found: {loan_dir}",
             )
         run_ids = []
-        for d in loan_dir.iterdir():
-            if not d.is_dir():
-                continue
-            if (d / "job_manifest.json").exists() or (d / "outputs").is_dir():
-                run_ids.append(d.name)
-        return {"run_ids": sorted(run_ids)}
+        with os.scandir(loan_dir) as it:
+            for d in it:
+                if not d.is_dir():
+                    continue
+                if (os.path.exists(os.path.join(d.path, "job_manifest.json"))
+                        or os.path.isdir(os.path.join(d.path, "outputs"))):
+                    run_ids.append(d.name)
+        run_ids.sort()
+        return {"run_ids": run_ids}
 
-    @router.get("/tenants/{tenant_id}/loans/{loan_id}/runs/{run_id}")
-    def get_run_status(tenant_id: str, loan_id: str, run_id: str) -> Dict[str, Any]:
-        manifest_path = (
-            nas_analyze / "tenants" / tenant_id / "loans" / loan_id / run_id / "job_manifest.json"
-        )
-        if not manifest_path.exists():
+    @router.get("/tenants/{tenant_id}/loans/{loan_id}/runs")
+    async def list_runs(tenant_id: str, loan_id: str) -> Dict[str, List[str]]:
+        return await nas_io(_list_runs, tenant_id, loan_id)
+
+    def _run_status(tenant_id: str, loan_id: str, run_id: str) -> Dict[str, Any]:
+        manifest_path = os.path.join(_loan_dir(tenant_id, loan_id), run_id, "job_manifest.json")
+        if not os.path.exists(manifest_path):
             raise HTTPException(
                 status_code=404,
                 detail=f"job_manifest.json not found at {manifest_path}. Run may not exist or job not finished.",
             )
         try:
-            with manifest_path.open() as f:
-                return json.load(f)
-        except json.JSONDecodeError as e:
+            return _load_manifest(manifest_path)
+        except orjson.JSONDecodeError as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Invalid JSON in {manifest_path}: {e}",
             )
 
+    @router.get("/tenants/{tenant_id}/loans/{loan_id}/runs/{run_id}")
+    async def get_run_status(tenant_id: str, loan_id: str, run_id: str) -> Dict[str, Any]:
+        return await nas_io(_run_status, tenant_id, loan_id, run_id)
+
     @router.get("/tenants/{tenant_id}/loans/{loan_id}/runs/{run_id}/artifacts")
-    def get_run_artifacts(tenant_id: str, loan_id: str, run_id: str) -> Dict[str, Any]:
+    async def get_run_artifacts(tenant_id: str, loan_id: str, run_id: str) -> Dict[str, Any]:
         try:
-            return _build_artifacts_index(nas_analyze, tenant_id, loan_id, run_id)
+            return await nas_io(_build_artifacts_index, nas_analyze, tenant_id, loan_id, run_id)
         except FileNotFoundError:
             raise HTTPException(status_code=404, detail="Run not found")
 
     @router.get("/tenants/{tenant_id}/loans/{loan_id}/runs/{run_id}/artifacts/{profile}/{filename}")
     def get_profile_artifact(
         tenant_id: str, loan_id: str, run_id: str, profile: str, filename: str
-    ) -> FileResponse:
-        base = nas_analyze / "tenants" / tenant_id / "loans" / loan_id / run_id
-        if not base.is_dir():
+    ) -> Response:
+        base = os.path.join(_loan_dir(tenant_id, loan_id), run_id)
+        if not os.path.isdir(base):
             raise HTTPException(status_code=404, detail="Run not found")
         if not _safe_single_component(profile) or not _safe_single_component(filename):
             raise HTTPException(status_code=404, detail="Artifact not found")
-        if filename not in PROFILE_FILE_NAMES:
+        if filename not in PROFILE_FILE_NAMES_SET:
             raise HTTPException(status_code=404, detail="Artifact not found")
-        profiles_base = (base / "outputs" / "profiles").resolve()
-        candidate = (profiles_base / profile / filename).resolve()
-        try:
-            candidate.relative_to(profiles_base)
-        except ValueError:
+        profiles_base = os.path.realpath(os.path.join(base, "outputs", "profiles"))
+        candidate = os.path.realpath(os.path.join(profiles_base, profile, filename))
+        if not candidate.startswith(profiles_base + os.sep):
             raise HTTPException(status_code=404, detail="Artifact not found")
-        if not candidate.is_file():
+        if not os.path.isfile(candidate):
             raise HTTPException(status_code=404, detail="Artifact not found")
-        return FileResponse(
-            path=str(candidate),
+        return _nas_analyze_file_response(
+            nas_analyze,
+            candidate,
             media_type=_media_type_for_filename(filename),
             headers={"Content-Disposition": f'inline; filename="{filename}"'},
         )
 
     @router.get("/tenants/{tenant_id}/loans/{loan_id}/runs/{run_id}/retrieval_pack")
-    def get_retrieval_pack(tenant_id: str, loan_id: str, run_id: str) -> FileResponse:
-        rp_path = (
-            nas_analyze / "tenants" / tenant_id / "loans" / loan_id
-            / "retrieve" / run_id / "retrieval_pack.json"
-        )
-        if not rp_path.is_file():
+    def get_retrieval_pack(tenant_id: str, loan_id: str, run_id: str) -> Response:
+        rp_path = os.path.join(_loan_dir(tenant_id, loan_id), "retrieve", run_id, "retrieval_pack.json")
+        rp_st = _stat_or_none(rp_path)
+        if rp_st is None or not stat.S_ISREG(rp_st.st_mode):
             raise HTTPException(status_code=404, detail="Retrieval pack not found")
-        return FileResponse(
-            path=str(rp_path.resolve()),
+        return _nas_analyze_file_response(
+            nas_analyze,
+            os.path.realpath(rp_path),
             media_type="application/json",
             headers={"Content-Disposition": 'inline; filename="retrieval_pack.json"'},
+            stat_result=rp_st,
         )
 
     @router.get("/tenants/{tenant_id}/loans/{loan_id}/runs/{run_id}/job_manifest")
-    def get_job_manifest(tenant_id: str, loan_id: str, run_id: str) -> FileResponse:
-        manifest_path = (
-            nas_analyze / "tenants" / tenant_id / "loans" / loan_id / run_id
-            / "job_manifest.json"
-        )
-        if not manifest_path.is_file():
+    def get_job_manifest(tenant_id: str, loan_id: str, run_id: str) -> Response:
+        manifest_path = os.path.join(_loan_dir(tenant_id, loan_id), run_id, "job_manifest.json")
+        if not os.path.isfile(manifest_path):
             raise HTTPException(status_code=404, detail="Job manifest not found")
-        return FileResponse(
-            path=str(manifest_path.resolve()),
+        return _nas_analyze_file_response(
+            nas_analyze,
+            os.path.realpath(manifest_path),
             media_type="application/json",
             headers={"Content-Disposition": 'inline; filename="job_manifest.json"'},
         )
@@ -395,21 +472,21 @@ def create_router(
         return result
 
     @router.get("/jobs/{job_id}")
-    def get_job_status(job_id: str) -> Dict[str, Any]:
-        job = job_service.get_job(job_id)
+    async def get_job_status(job_id: str) -> Dict[str, Any]:
+        job = await nas_io(job_service.get_job, job_id)
         if job is None:
             raise HTTPException(status_code=404, detail="Job not found")
         return job
 
     @router.get("/jobs")
-    def list_jobs(
+    async def list_jobs(
         limit: int = 50,
         status: Optional[str] = None,
     ) -> Dict[str, List[Dict[str, Any]]]:
-        return job_service.list_jobs(limit=limit, status=status)
+        return await nas_io(lambda: job_service.list_jobs(limit=limit, status=status))
 
     @router.post("/tenants/{tenant_id}/loans/{loan_id}/runs/{run_id}/query")
-    def query_run(
+    async def query_run(
         tenant_id: str,
         loan_id: str,
         run_id: str,
@@ -436,18 +513,11 @@ def create_router(
         ]
         if body.offline_embeddings:
             step13_cmd.append("--offline-embeddings")
-        result13 = subprocess.run(
-            step13_cmd,
-            cwd=str(repo_root),
-            env=env,
-            capture_output=True,
-            text=True,
-        )
-        if result13.returncode != 0:
-            stderr_tail = (result13.stderr or result13.stdout or "")[-2000:]
+        rc13, stderr_tail = await run_step_tail(step13_cmd, repo_root, env)
+        if rc13 != 0:
             raise HTTPException(
                 status_code=500,
-                detail=f"Step13 failed (exit {result13.returncode}). stderr tail: {stderr_tail}",
+                detail=f"Step13 failed (exit {rc13}). stderr tail: {stderr_tail}",
             )
         step12_cmd = [
             sys.executable, step12,
@@ -460,33 +530,26 @@ def create_router(
         ]
         if body.llm_model and body.profile != "uw_decision":
             step12_cmd += ["--llm-model", body.llm_model]
-        result12 = subprocess.run(
-            step12_cmd,
-            cwd=str(repo_root),
-            env=env,
-            capture_output=True,
-            text=True,
-        )
-        if result12.returncode != 0:
-            stderr_tail = (result12.stderr or result12.stdout or "")[-2000:]
+        rc12, stderr_tail = await run_step_tail(step12_cmd, repo_root, env)
+        if rc12 != 0:
             raise HTTPException(
                 status_code=500,
-                detail=f"Step12 failed (exit {result12.returncode}). stderr tail: {stderr_tail}",
+                detail=f"Step12 failed (exit {rc12}). stderr tail: {stderr_tail}",
             )
         answer_path = (
             nas_analyze / "tenants" / tenant_id / "loans" / loan_id / run_id
             / "outputs" / "profiles" / body.profile / "answer.json"
         )
-        if not answer_path.exists():
-            stderr_tail = (result12.stderr or result12.stdout or "")[-2000:]
+        try:
+            raw = await nas_io(answer_path.read_bytes)
+        except FileNotFoundError:
             raise HTTPException(
                 status_code=500,
                 detail=f"Profile output missing: {answer_path}. Step12 stderr tail: {stderr_tail}",
             )
         try:
-            with answer_path.open() as f:
-                return json.load(f)
-        except json.JSONDecodeError as e:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Invalid JSON in {answer_path}: {e}",
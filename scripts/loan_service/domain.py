@@ -1,19 +1,56 @@
 """Pure data models for the loan job system. No pydantic."""
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
-from datetime import datetime, timezone
 from typing import Any, Literal
 
 JobStatus = Literal["PENDING", "RUNNING", "SUCCESS", "FAIL"]
 
+# JobRequest.to_dict emits these only when set (order matches the persisted request dict).
+_JOB_REQUEST_OPTIONAL_KEYS = (
+    "run_id", "source_path", "run_llm", "max_dropped_chunks", "expect_rp_hash_stable", "timeout",
+)
+# API view key order (JobRecord.to_api_dict, _job_api_view); job_key is internal and never exposed.
+_JOB_API_KEYS = (
+    "job_id", "tenant_id", "loan_id", "status", "created_at_utc", "started_at_utc", "finished_at_utc",
+    "request", "result", "error", "stdout", "stderr", "run_id",
+)
+
+
+def _job_api_view(job: dict[str, Any]) -> dict[str, Any]:
+    """API view of a persisted job dict: the fixed _JOB_API_KEYS whose value is not None
+    (job_key is internal and simply not listed, so no per-key exclusion test)."""
+    return {k: v for k in _JOB_API_KEYS if (v := job.get(k)) is not None}
+
+
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") of the last _utc_now_z call; swapped as one tuple.
+_last_now_second: tuple[int, str] = (-1, "")
+
+
+def utc_z_from_ns(ns: int) -> str:
+    """UTC ISO8601 string with microseconds, ending with Z, for an epoch-nanosecond time."""
+    sec, frac = divmod(ns, 1_000_000_000)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec)) + f".{frac // 1000:06d}Z"
+
 
 def _utc_now_z() -> str:
-    """UTC ISO8601 string ending with Z (same as job_runner)."""
-    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    """UTC ISO8601 string ending with Z (same as job_runner).
+
+    No datetime/tzinfo round-trip; the seconds prefix is reused within the same second.
+    """
+    global _last_now_second
+    sec, frac = divmod(time.time_ns(), 1_000_000_000)
+    last = _last_now_second
+    if last[0] == sec:
+        prefix = last[1]
+    else:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+        _last_now_second = (sec, prefix)
+    return f"{prefix}.{frac // 1000:06d}Z"
 
 
-@dataclass
+@dataclass(slots=True)
 class JobRequest:
     """Request payload for enqueue (fields that map to run_loan_job.py)."""
     run_id: str | None = None
@@ -46,22 +83,14 @@ class JobRequest:
             "skip_process": self.skip_process,
             "smoke_debug": self.smoke_debug,
         }
-        if self.run_id is not None:
-            out["run_id"] = self.run_id
-        if self.source_path is not None:
-            out["source_path"] = self.source_path
-        if self.run_llm is not None:
-            out["run_llm"] = self.run_llm
-        if self.max_dropped_chunks is not None:
-            out["max_dropped_chunks"] = self.max_dropped_chunks
-        if self.expect_rp_hash_stable is not None:
-            out["expect_rp_hash_stable"] = self.expect_rp_hash_stable
-        if self.timeout is not None:
-            out["timeout"] = self.timeout
+        for k in _JOB_REQUEST_OPTIONAL_KEYS:
+            v = getattr(self, k)
+            if v is not None:
+                out[k] = v
         return out
 
 
-@dataclass
+@dataclass(slots=True)
 class JobResult:
     """Manifest-derived result fields."""
     manifest_path: str
@@ -70,7 +99,7 @@ class JobResult:
     outputs_base: str | None
 
 
-@dataclass
+@dataclass(slots=True)
 class JobRecord:
     """Full job record (dict-like for persistence; job_key is internal-only)."""
     job_id: str
@@ -102,9 +131,8 @@ class JobRecord:
             "error": self.error,
             "stdout": self.stdout,
             "stderr": self.stderr,
+            "run_id": self.run_id,
         }
-        if self.run_id is not None:
-            d["run_id"] = self.run_id
         if self.job_key is not None:
             d["job_key"] = self.job_key
         return d
@@ -113,8 +141,9 @@ class JobRecord:
     def from_dict(cls, d: dict[str, Any]) -> JobRecord:
         return cls(
             job_id=d["job_id"],
-            tenant_id=d["tenant_id"],
-            loan_id=d["loan_id"],
+            # DiskJobStore.load_all only requires job_id and status; legacy files may lack these.
+            tenant_id=d.get("tenant_id") or "",
+            loan_id=d.get("loan_id") or "",
             status=d["status"],
             created_at_utc=d.get("created_at_utc") or "",
             started_at_utc=d.get("started_at_utc"),
@@ -129,7 +158,5 @@ class JobRecord:
         )
 
     def to_api_dict(self) -> dict[str, Any]:
-        """Same as to_dict but omit job_key (internal only)."""
-        d = self.to_dict()
-        d.pop("job_key", None)
-        return {k: v for k, v in d.items() if v is not None}
+        """Same as to_dict but omit job_key (internal only) and None values."""
+        return {k: v for k in _JOB_API_KEYS if (v := getattr(self, k)) is not None}
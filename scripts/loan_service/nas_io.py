@@ -0,0 +1,110 @@
+"""nas_analyze I/O helpers shared by loan_api.py and the loan_service router."""
+from __future__ import annotations
+
+import asyncio
+import os
+import stat
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+import anyio
+import anyio.to_thread
+from fastapi.responses import FileResponse
+
+from .domain import utc_z_from_ns
+
+# Worker threads for async endpoints that block on nas_analyze (kept apart from the default threadpool)
+NAS_IO_THREADS = 64
+# Read size per thread hop when streaming nas_analyze files without X-Accel-Redirect
+NAS_FILE_CHUNK_BYTES = 1024 * 1024
+# Bytes of step stderr (or stdout) kept for /query error details
+QUERY_STDERR_TAIL_BYTES = 2000
+# Cap on threads stat-ing profile dirs for /artifacts (avoid thrashing the NAS server)
+ARTIFACT_SCAN_WORKERS = 8
+
+# One limiter per process: both apps' NAS-bound endpoints queue on the same NAS_IO_THREADS slots.
+NAS_IO_LIMITER = anyio.CapacityLimiter(NAS_IO_THREADS)
+# One scan pool per process, shared by both apps' /artifacts: at most NAS_IO_THREADS +
+# ARTIFACT_SCAN_WORKERS threads touch nas_analyze at once, and no thread startup per poll.
+ARTIFACT_SCAN_POOL = ThreadPoolExecutor(max_workers=ARTIFACT_SCAN_WORKERS, thread_name_prefix="artifact-scan")
+
+_T = TypeVar("_T")
+
+
+async def nas_io(func: Callable[..., _T], *args: Any) -> _T:
+    """Run a blocking nas_analyze call on the dedicated NAS I/O thread pool.
+
+    Stalls on the NAS mount then queue on NAS_IO_LIMITER instead of exhausting the
+    default threadpool that every other sync endpoint shares.
+    """
+    return await anyio.to_thread.run_sync(func, *args, limiter=NAS_IO_LIMITER)
+
+
+class NasFileResponse(FileResponse):
+    """FileResponse reading NAS_FILE_CHUNK_BYTES per worker-thread hop instead of Starlette's 64 KiB.
+
+    Starlette already emits http.response.pathsend when the server offers it; this only
+    matters on the read-and-send fallback, where large retrieval packs took 16x more hops.
+    """
+    chunk_size = NAS_FILE_CHUNK_BYTES
+
+
+def scan_profile_dir(
+    prof_dir: str, file_names: tuple[str, ...], file_names_set: frozenset[str]
+) -> dict[str, Any]:
+    """Index entry for one outputs/profiles/<profile> dir (already resolved): file_names with size/mtime."""
+    name = os.path.basename(prof_dir)
+    files_list: list[dict[str, Any]] = []
+    # One readdir of the profile dir replaces an is_file() probe per expected name; on the
+    # NAS mount absent files then cost nothing and present ones a single stat().
+    try:
+        with os.scandir(prof_dir) as it:
+            present = {de.name: de for de in it if de.name in file_names_set}
+    except OSError:
+        present = {}
+    for fname in file_names:
+        de = present.get(fname)
+        st = None
+        if de is not None:
+            try:
+                st = de.stat()
+            except OSError:
+                pass
+        exists = st is not None and stat.S_ISREG(st.st_mode)
+        entry: dict[str, Any] = {
+            "name": fname,
+            "path": os.path.join(prof_dir, fname),
+            "exists": exists,
+            "size_bytes": st.st_size if exists else None,
+            "mtime_utc": utc_z_from_ns(st.st_mtime_ns) if exists else None,
+        }
+        files_list.append(entry)
+    return {
+        "name": name,
+        "dir": prof_dir,
+        "files": files_list,
+    }
+
+
+async def run_step_tail(cmd: list[str], cwd: Path, env: dict[str, str]) -> tuple[int, str]:
+    """Run a step script without blocking the event loop; keep only the last
+    QUERY_STDERR_TAIL_BYTES of stderr (falling back to stdout) for error details."""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=str(cwd),
+        env=env,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    out_tail: deque[int] = deque(maxlen=QUERY_STDERR_TAIL_BYTES)
+    err_tail: deque[int] = deque(maxlen=QUERY_STDERR_TAIL_BYTES)
+
+    async def _drain(stream: asyncio.StreamReader, tail: deque[int]) -> None:
+        while chunk := await stream.read(64 * 1024):
+            tail.extend(chunk)
+
+    await asyncio.gather(_drain(proc.stdout, out_tail), _drain(proc.stderr, err_tail))
+    returncode = await proc.wait()
+    return returncode, bytes(err_tail or out_tail).decode(errors="replace")
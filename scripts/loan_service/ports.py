@@ -15,6 +15,10 @@ class JobStore(Protocol):
         """Persist a single job (atomic write)."""
         ...
 
+    def save_progress(self, job: dict[str, Any]) -> None:
+        """Queue a progress snapshot; written shortly after, coalesced per job. save() supersedes it."""
+        ...
+
 
 class JobKeyIndex(Protocol):
     def get(self, job_key: str) -> str | None:
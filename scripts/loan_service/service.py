@@ -1,6 +1,7 @@
 """Job service orchestrator: enqueue, get, list with same semantics as job_runner."""
 from __future__ import annotations
 
+import heapq
 import threading
 import time
 import uuid
@@ -13,10 +14,11 @@ from .adapters_disk import (
     load_manifest_if_present,
     result_from_manifest,
 )
+from .adapters_disk import _parse_manifest_summary_from_stdout as parse_manifest_summary_from_stdout
 from .adapters_disk import _parse_run_id_from_stdout as parse_run_id_from_stdout
-from .adapters_disk import _truncate
-from .adapters_subprocess import JOB_TIMEOUT_DEFAULT, get_job_env
-from .domain import _utc_now_z
+from .adapters_disk import _CappedText, _truncate
+from .adapters_subprocess import JOB_TIMEOUT_DEFAULT, _quiet_env, get_job_env
+from .domain import JobRecord, _job_api_view, _utc_now_z
 
 
 class JobService:
@@ -33,141 +35,145 @@ class JobService:
         self._loan_lock = loan_lock
         self._runner = runner
         self._get_base = get_base_path
-        self._jobs: dict[str, dict[str, Any]] = {}
+        # In-memory jobs are slotted JobRecords; dicts exist only at the store boundary.
+        self._jobs: dict[str, JobRecord] = {}
+        # Guards compound updates of _jobs membership and the key index; single dict reads/copies
+        # rely on GIL atomicity. Per-job state uses _job_lock(job_id) so stdout/phase updates of one
+        # running job never contend with another job or with enqueue.
         self._lock = threading.Lock()
+        self._job_locks: dict[str, threading.Lock] = {}
+        # Subprocess env base, built once; get_job_env() copies it and overlays request vars.
+        self._base_env = _quiet_env()
 
     def load_all_from_disk(self) -> None:
         """Load persisted jobs (with restart recovery) and rebuild key index."""
         jobs = self._store.load_all()
+        records = {job_id: JobRecord.from_dict(j) for job_id, j in jobs.items()}
         with self._lock:
-            self._jobs.update(jobs)
-            self._key_index.rebuild(self._jobs)
+            self._jobs.update(records)
+            self._key_index.rebuild({job_id: r.to_dict() for job_id, r in self._jobs.items()})
 
     def enqueue_job(self, tenant_id: str, loan_id: str, req: dict[str, Any]) -> dict[str, Any]:
+        """Enqueue (or dedupe onto) a job.
+
+        The job record takes ownership of req (no copy); callers must not mutate it afterwards.
+        """
         job_key = compute_job_key(tenant_id, loan_id, req)
         with self._lock:
             existing_id = self._key_index.get(job_key)
             if existing_id:
                 existing = self._jobs.get(existing_id)
-                if existing and existing.get("status") in ("PENDING", "RUNNING", "SUCCESS"):
+                if existing and existing.status in ("PENDING", "RUNNING", "SUCCESS"):
                     return {
                         "job_id": existing_id,
-                        "status": existing["status"],
+                        "status": existing.status,
                         "status_url": f"/jobs/{existing_id}",
                     }
         run_id = req.get("run_id")
+        result_summary = None
         if run_id and "question" not in req:
+            # Run already finished on disk: record it as a SUCCESS job instead of re-running.
             result_summary = result_from_manifest(self._get_base, tenant_id, loan_id, run_id)
-            if result_summary is not None:
-                job_id = str(uuid.uuid4())
-                job = {
-                    "job_id": job_id,
-                    "tenant_id": tenant_id,
-                    "loan_id": loan_id,
-                    "run_id": run_id,
-                    "status": "SUCCESS",
-                    "created_at_utc": _utc_now_z(),
-                    "started_at_utc": _utc_now_z(),
-                    "finished_at_utc": _utc_now_z(),
-                    "request": dict(req),
-                    "result": result_summary,
-                    "error": None,
-                    "stdout": None,
-                    "stderr": None,
-                    "job_key": job_key,
-                }
-                with self._lock:
-                    self._jobs[job_id] = job
-                    self._key_index.set(job_key, job_id)
-                job["stdout"] = f"PHASE:DONE {_utc_now_z()}\n"
-                self._store.save(job)
-                self._store.save_index_entry(job_id, tenant_id, loan_id)
-                return {"job_id": job_id, "status": "SUCCESS", "status_url": f"/jobs/{job_id}"}
         job_id = str(uuid.uuid4())
-        job = {
-            "job_id": job_id,
-            "tenant_id": tenant_id,
-            "loan_id": loan_id,
-            "run_id": req.get("run_id"),
-            "status": "PENDING",
-            "created_at_utc": _utc_now_z(),
-            "started_at_utc": None,
-            "finished_at_utc": None,
-            "request": dict(req),
-            "result": None,
-            "error": None,
-            "stdout": None,
-            "stderr": None,
-            "job_key": job_key,
-        }
+        now = _utc_now_z()
+        job = JobRecord(
+            job_id=job_id,
+            tenant_id=tenant_id,
+            loan_id=loan_id,
+            status="PENDING",
+            created_at_utc=now,
+            started_at_utc=None,
+            finished_at_utc=None,
+            request=req,
+            result=None,
+            error=None,
+            stdout=None,
+            stderr=None,
+            run_id=run_id,
+            job_key=job_key,
+        )
+        if result_summary is not None:
+            # Fully built before it is published below, then written to disk once.
+            job.status = "SUCCESS"
+            job.started_at_utc = now
+            job.finished_at_utc = now
+            job.result = result_summary
+            job.stdout = f"PHASE:DONE {now}\n"
         with self._lock:
             self._jobs[job_id] = job
             self._key_index.set(job_key, job_id)
-        self._store.save(job)
+        self._store.save(job.to_dict())
         self._store.save_index_entry(job_id, tenant_id, loan_id)
-        return {"job_id": job_id, "status": "PENDING", "status_url": f"/jobs/{job_id}"}
+        return {"job_id": job_id, "status": job.status, "status_url": f"/jobs/{job_id}"}
 
-    def _append_phase(self, job: dict[str, Any], name: str) -> None:
-        """Append one phase marker line to job stdout (caller holds self._lock)."""
-        current = job.get("stdout") or ""
-        line = f"PHASE:{name} {_utc_now_z()}\n"
-        job["stdout"] = _truncate(current + line, STDOUT_TRUNCATE)
+    def _job_lock(self, job_id: str) -> threading.Lock:
+        lock = self._job_locks.get(job_id)
+        if lock is None:
+            # dict.setdefault is atomic under the GIL: racing callers all get the first lock stored.
+            lock = self._job_locks.setdefault(job_id, threading.Lock())
+        return lock
+
+    def _append_phase(self, job: JobRecord, name: str, ts: str) -> None:
+        """Append one phase marker line stamped ts to job stdout (caller holds the job's _job_lock)."""
+        current = job.stdout or ""
+        line = f"PHASE:{name} {ts}\n"
+        job.stdout = _truncate(current + line, STDOUT_TRUNCATE)
 
     def _run_worker(self, job_id: str) -> None:
         import subprocess
 
-        with self._lock:
+        with self._job_lock(job_id):
             if job_id not in self._jobs:
                 return
             job = self._jobs[job_id]
-            tenant_id = job["tenant_id"]
-            loan_id = job["loan_id"]
-            request = job["request"]
+            tenant_id = job.tenant_id
+            loan_id = job.loan_id
+            request = job.request
         lock_held = False
         try:
             self._loan_lock.acquire(tenant_id, loan_id, job_id, _utc_now_z())
             lock_held = True
         except Exception as e:
-            with self._lock:
+            ts = _utc_now_z()
+            with self._job_lock(job_id):
                 if job_id in self._jobs:
-                    self._jobs[job_id]["status"] = "FAIL"
-                    self._jobs[job_id]["finished_at_utc"] = _utc_now_z()
-                    self._jobs[job_id]["error"] = _truncate(str(e), ERROR_TRUNCATE)
-                    self._append_phase(self._jobs[job_id], "FAIL")
-                    self._store.save(dict(self._jobs[job_id]))
+                    self._jobs[job_id].status = "FAIL"
+                    self._jobs[job_id].finished_at_utc = ts
+                    self._jobs[job_id].error = _truncate(str(e), ERROR_TRUNCATE)
+                    self._append_phase(self._jobs[job_id], "FAIL", ts)
+                    self._store.save(self._jobs[job_id].to_dict())
             return
         try:
-            with self._lock:
+            ts = _utc_now_z()
+            with self._job_lock(job_id):
                 if job_id not in self._jobs:
                     return
-                self._jobs[job_id]["status"] = "RUNNING"
-                self._jobs[job_id]["started_at_utc"] = _utc_now_z()
-                self._store.save(dict(self._jobs[job_id]))
+                self._jobs[job_id].status = "RUNNING"
+                self._jobs[job_id].started_at_utc = ts
+                stdout_buf = _CappedText(self._jobs[job_id].stdout or "", STDOUT_TRUNCATE)
+                self._store.save(self._jobs[job_id].to_dict())
         except Exception:
             if lock_held:
                 self._loan_lock.release(tenant_id, loan_id)
             raise
         timeout = request.get("timeout", JOB_TIMEOUT_DEFAULT)
-        env = get_job_env(request)
+        env = get_job_env(request, self._base_env)
 
         _last_flush = [0.0]  # mutable container for closure; epoch seconds
 
         def _on_line(line: str) -> None:
-            with self._lock:
+            with self._job_lock(job_id):
                 if job_id in self._jobs:
-                    current = self._jobs[job_id].get("stdout") or ""
-                    self._jobs[job_id]["stdout"] = _truncate(
-                        current + line, STDOUT_TRUNCATE
-                    )
+                    stdout_buf.append(line)
                     # Flush to disk on PHASE lines (stepper progress) or every 5s
                     # so the API (which reads from disk) can serve live progress.
-                    import time as _t
-                    now = _t.time()
+                    now = time.time()
                     is_phase = line.startswith("PHASE:")
                     if is_phase or now - _last_flush[0] >= 5.0:
                         _last_flush[0] = now
+                        self._jobs[job_id].stdout = stdout_buf.render()
                         try:
-                            self._store.save(dict(self._jobs[job_id]))
+                            self._store.save_progress(self._jobs[job_id].to_dict())
                         except Exception:
                             pass
 
@@ -178,22 +184,26 @@ class JobService:
                 job_id=job_id,
             )
         except subprocess.TimeoutExpired:
-            with self._lock:
+            ts = _utc_now_z()
+            with self._job_lock(job_id):
                 if job_id in self._jobs:
-                    self._jobs[job_id]["status"] = "FAIL"
-                    self._jobs[job_id]["finished_at_utc"] = _utc_now_z()
-                    self._jobs[job_id]["error"] = _truncate(f"Job timed out after {timeout}s", ERROR_TRUNCATE)
-                    self._append_phase(self._jobs[job_id], "FAIL")
-                    self._store.save(dict(self._jobs[job_id]))
+                    self._jobs[job_id].status = "FAIL"
+                    self._jobs[job_id].finished_at_utc = ts
+                    self._jobs[job_id].stdout = stdout_buf.render()
+                    self._jobs[job_id].error = _truncate(f"Job timed out after {timeout}s", ERROR_TRUNCATE)
+                    self._append_phase(self._jobs[job_id], "FAIL", ts)
+                    self._store.save(self._jobs[job_id].to_dict())
             return
         except Exception as e:
-            with self._lock:
+            ts = _utc_now_z()
+            with self._job_lock(job_id):
                 if job_id in self._jobs:
-                    self._jobs[job_id]["status"] = "FAIL"
-                    self._jobs[job_id]["finished_at_utc"] = _utc_now_z()
-                    self._jobs[job_id]["error"] = _truncate(str(e), ERROR_TRUNCATE)
-                    self._append_phase(self._jobs[job_id], "FAIL")
-                    self._store.save(dict(self._jobs[job_id]))
+                    self._jobs[job_id].status = "FAIL"
+                    self._jobs[job_id].finished_at_utc = ts
+                    self._jobs[job_id].stdout = stdout_buf.render()
+                    self._jobs[job_id].error = _truncate(str(e), ERROR_TRUNCATE)
+                    self._append_phase(self._jobs[job_id], "FAIL", ts)
+                    self._store.save(self._jobs[job_id].to_dict())
             return
         finally:
             if lock_held:
@@ -206,59 +216,56 @@ class JobService:
         """Persist final job state after subprocess completion.
 
         Called by _run_worker (normal path) and by the restart watcher (Task 5).
-        Lock is NOT held by the caller; this method acquires it as needed.
+        No lock is held by the caller; this method takes the job's lock as needed.
         """
-        with self._lock:
+        with self._job_lock(job_id):
             if job_id not in self._jobs:
                 return
             job = self._jobs[job_id]
-            request = job.get("request") or {}
-            tenant_id = job.get("tenant_id") or ""
-            loan_id = job.get("loan_id") or ""
+            request = job.request or {}
+            tenant_id = job.tenant_id or ""
+            loan_id = job.loan_id or ""
 
         resolved_run_id = request.get("run_id") or parse_run_id_from_stdout(stdout)
         result_summary: dict[str, Any] = {}
+        run_dir = (
+            self._get_base().joinpath("tenants", tenant_id, "loans", loan_id, resolved_run_id)
+            if resolved_run_id else None
+        )
         if "question" in request:
-            base = self._get_base()
-            run_dir = (
-                base / "tenants" / tenant_id / "loans" / loan_id / resolved_run_id
-                if resolved_run_id else None
-            )
             result_summary["outputs_base"] = str(run_dir) if run_dir else None
             result_summary["status"] = "SUCCESS" if returncode == 0 else "FAIL"
-        elif resolved_run_id:
-            manifest = load_manifest_if_present(
-                self._get_base, tenant_id, loan_id, resolved_run_id
-            )
-            if manifest:
-                base = self._get_base()
-                mp = (
-                    base / "tenants" / tenant_id / "loans" / loan_id
-                    / resolved_run_id / "job_manifest.json"
+        elif run_dir is not None:
+            manifest = parse_manifest_summary_from_stdout(stdout, resolved_run_id)
+            if manifest is None:
+                manifest = load_manifest_if_present(
+                    self._get_base, tenant_id, loan_id, resolved_run_id
                 )
-                result_summary["manifest_path"] = str(mp)
+            if manifest:
+                result_summary["manifest_path"] = str(run_dir / "job_manifest.json")
                 result_summary["status"] = manifest.get("status")
                 result_summary["rp_sha256"] = manifest.get("retrieval_pack_sha256")
-                result_summary["outputs_base"] = str(mp.parent) if mp.parent else None
+                result_summary["outputs_base"] = str(run_dir)
 
-        with self._lock:
+        ts = _utc_now_z()
+        with self._job_lock(job_id):
             if job_id not in self._jobs:
                 return
-            self._jobs[job_id]["finished_at_utc"] = _utc_now_z()
-            self._jobs[job_id]["stdout"] = stdout
-            self._jobs[job_id]["stderr"] = stderr
-            self._jobs[job_id]["run_id"] = resolved_run_id
+            self._jobs[job_id].finished_at_utc = ts
+            self._jobs[job_id].stdout = stdout
+            self._jobs[job_id].stderr = stderr
+            self._jobs[job_id].run_id = resolved_run_id
             if returncode == 0 and result_summary.get("status") == "SUCCESS":
-                self._jobs[job_id]["status"] = "SUCCESS"
-                self._jobs[job_id]["result"] = result_summary
+                self._jobs[job_id].status = "SUCCESS"
+                self._jobs[job_id].result = result_summary
             else:
-                self._jobs[job_id]["status"] = "FAIL"
+                self._jobs[job_id].status = "FAIL"
                 err = stderr or stdout or f"Exit code {returncode}"
-                self._jobs[job_id]["error"] = _truncate(err, ERROR_TRUNCATE)
+                self._jobs[job_id].error = _truncate(err, ERROR_TRUNCATE)
                 if result_summary:
-                    self._jobs[job_id]["result"] = result_summary
-                self._append_phase(self._jobs[job_id], "FAIL")
-            self._store.save(dict(self._jobs[job_id]))
+                    self._jobs[job_id].result = result_summary
+                self._append_phase(self._jobs[job_id], "FAIL", ts)
+            self._store.save(self._jobs[job_id].to_dict())
 
     def get_job(self, job_id: str) -> dict[str, Any] | None:
         """Load job from disk; uses index file for tenant/loan path lookup.
@@ -271,22 +278,26 @@ class JobService:
         job = self._store.load_job(tenant_id, loan_id, job_id)
         if job is None:
             return None
-        return {k: v for k, v in job.items() if v is not None and k != "job_key"}
+        return _job_api_view(job)
 
     def list_jobs(self, limit: int = 50, status: str | None = None) -> dict[str, list[dict[str, Any]]]:
         """Scan disk for current job state. No in-memory cache used."""
         raw = self._store.scan_all_raw()
-        if status:
-            raw = [j for j in raw if j.get("status") == status]
-        raw = sorted(raw, key=lambda j: j.get("created_at_utc") or "", reverse=True)[:limit]
-        return {"jobs": [{k: v for k, v in j.items() if v is not None and k != "job_key"} for j in raw]}
+        matching = (j for j in raw if j.get("status") == status) if status else raw
+        # Top-`limit` selection (O(N log limit)) instead of sorting every scanned job.
+        newest = heapq.nlargest(limit, matching, key=lambda j: j.get("created_at_utc") or "")
+        return {"jobs": [_job_api_view(j) for j in newest]}
 
     def get_jobs_raw(self) -> dict[str, dict[str, Any]]:
-        """For job_runner facade: return internal jobs dict."""
-        with self._lock:
-            return dict(self._jobs)
+        """For job_runner facade: return internal jobs as persistence dicts.
+
+        No lock: dict(self._jobs) is a single C-level copy under the GIL, and a slightly stale
+        snapshot is fine for this read-only view.
+        """
+        jobs = dict(self._jobs)
+        return {job_id: r.to_dict() for job_id, r in jobs.items()}
 
-    def get_jobs_mutable(self) -> dict[str, dict[str, Any]]:
+    def get_jobs_mutable(self) -> dict[str, JobRecord]:
         """For job_runner facade: return the actual in-memory jobs dict (so tests can .clear())."""
         return self._jobs
 
@@ -298,4 +309,5 @@ class JobService:
         """For tests: clear in-memory state."""
         with self._lock:
             self._jobs.clear()
+            self._job_locks.clear()
         self._key_index.rebuild({})
@@ -1,22 +1,29 @@
 #!/usr/bin/env python3
 """MortgageDocAI production entry point.
 
-Executes the full pipeline for a single loan via subprocess calls
-and writes a job_manifest.json summarizing the run.
+Executes the full pipeline for a single loan (Step10/Step12 in-process,
+Step11/Step13 via subprocess calls) and writes a job_manifest.json summarizing the run.
 """
 from __future__ import annotations
 
 import argparse
 import datetime
+import importlib
 import json
 import os
 import subprocess
 import sys
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+import orjson
+
+import _embedder_service
 from lib import (
     DEFAULT_TENANT,
+    EMBED_MODEL_NAME,
     NAS_ANALYZE,
     atomic_write_json,
     ensure_dir,
@@ -70,9 +77,50 @@ def _step(name: str) -> str:
     return str(SCRIPT_DIR / name)
 
 
+# Steps run via main(argv) in this interpreter instead of a fresh python per call: no torch/CUDA
+# state and no import-time env contract. Step11/Step13 stay subprocesses (embedding models on the
+# GPU; Step13 must set HF offline env before importing sentence_transformers); repeated Step13
+# calls share a warm model through _embedder_service instead.
+_IN_PROCESS_STEPS = {
+    "step10_intake.py": "step10_intake",
+    "step12_analyze.py": "step12_analyze",
+}
+_FORCE_SUBPROCESS = False  # set by main() from --force-subprocess
+
+
+def _run_in_process(module_name: str, cmd: list, env: Optional[Dict[str, str]]) -> None:
+    """Call module.main(cmd[2:]) with env overlaid on os.environ; failures raise CalledProcessError
+    (traceback on stderr) exactly as the subprocess path would."""
+    saved = {k: os.environ.get(k) for k in env} if env else {}
+    if env:
+        os.environ.update(env)
+    returncode = 0
+    try:
+        importlib.import_module(module_name).main(cmd[2:])
+    except SystemExit as exc:
+        if exc.code not in (None, 0):
+            returncode = exc.code if isinstance(exc.code, int) else 1
+    except Exception:
+        traceback.print_exc()
+        returncode = 1
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+        sys.stdout.flush()
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+
 def _run(cmd: list, label: str, env: Optional[Dict[str, str]] = None) -> None:
-    """Run a subprocess; raise on non-zero exit. If env is set, merge with os.environ."""
-    print(f"=== {label} ===", flush=True)
+    """Run a step; raise on non-zero exit. If env is set, merge with os.environ."""
+    print(f"=== {label} ===")
+    module_name = None if _FORCE_SUBPROCESS else _IN_PROCESS_STEPS.get(os.path.basename(cmd[1]))
+    if module_name is not None:
+        _run_in_process(module_name, cmd, env)
+        return
     run_env = {**os.environ, **env} if env else None
     subprocess.run(cmd, check=True, env=run_env)
 
@@ -83,9 +131,25 @@ def _utc_now_iso() -> str:
     )
 
 
+def _read_manifest(path: Path) -> Optional[Dict[str, Any]]:
+    """Parse an existing job_manifest.json with a single read (no exists() stat first); None if
+    missing, unreadable or not a JSON object."""
+    try:
+        data = orjson.loads(path.read_bytes())
+    except (orjson.JSONDecodeError, OSError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _print_manifest_summary(rp_sha256: Optional[str], run_id: str, status: str) -> None:
+    """Machine-readable summary so the job service need not re-read the manifest from the NAS."""
+    summary = {"retrieval_pack_sha256": rp_sha256, "run_id": run_id, "status": status}
+    print(f"MANIFEST:{json.dumps(summary, sort_keys=True)}")
+
+
 def _phase(name: str) -> None:
     """Emit one phase marker line to stdout for desktop progress (format: PHASE:<NAME> <UTC_ISO_Z>)."""
-    print(f"PHASE:{name} {_utc_now_iso()}", flush=True)
+    print(f"PHASE:{name} {_utc_now_iso()}")
 
 
 # ---------------------------------------------------------------------------
@@ -99,9 +163,9 @@ def _output_paths(
     ran_uw_decision: bool,
 ) -> Dict[str, Optional[str]]:
     """Build dict of absolute output file paths (null if step was skipped)."""
-    base = NAS_ANALYZE / "tenants" / tenant_id / "loans" / loan_id
-    rp = base / "retrieve" / run_id / "retrieval_pack.json"
-    profiles = base / run_id / "outputs" / "profiles"
+    base = NAS_ANALYZE.joinpath("tenants", tenant_id, "loans", loan_id)
+    rp = base.joinpath("retrieve", run_id, "retrieval_pack.json")
+    profiles = base.joinpath(run_id, "outputs", "profiles")
     return {
         "conditions_json": str(profiles / "uw_conditions" / "conditions.json"),
         "decision_json": (
@@ -166,6 +230,10 @@ def parse_args(argv=None) -> argparse.Namespace:
                    help="Override Step13 top-k for both general and income runs (default: 80 / 120)")
     p.add_argument("--max-per-file", type=int, default=None,
                    help="Override Step13 max-per-file for income run (default: 12)")
+    p.add_argument("--llm-cache-dir", default=None,
+                   help="Pass --llm-cache-dir to the Step12 LLM profiles (reuse responses to identical prompts)")
+    p.add_argument("--force-subprocess", action="store_true", default=False,
+                   help="Run every step as a separate python process (debugging; default runs Step10/Step12 in-process)")
     args = p.parse_args(argv)
     if not args.skip_intake and not args.source_path:
         p.error("--source-path is required unless --skip-intake is set")
@@ -178,7 +246,9 @@ def parse_args(argv=None) -> argparse.Namespace:
 # Main
 # ---------------------------------------------------------------------------
 def main(argv=None) -> int:
+    global _FORCE_SUBPROCESS
     args = parse_args(argv)
+    _FORCE_SUBPROCESS = args.force_subprocess
     tenant_id = args.tenant_id
     loan_id = args.loan_id
     source_path = args.source_path
@@ -193,35 +263,45 @@ def main(argv=None) -> int:
         return 2
 
     # Manifest path (may not exist yet — ensure_dir later)
-    manifest_dir = (
-        NAS_ANALYZE / "tenants" / tenant_id / "loans" / loan_id / run_id
-    )
+    loan_base = NAS_ANALYZE.joinpath("tenants", tenant_id, "loans", loan_id)
+    manifest_dir = loan_base / run_id
     manifest_path = manifest_dir / "job_manifest.json"
 
     # Short-circuit: if run_id was supplied and manifest already SUCCESS, skip run
-    if args.run_id and manifest_path.exists():
-        try:
-            with manifest_path.open() as f:
-                existing = json.load(f)
-            if existing.get("status") == "SUCCESS":
-                print(f"run_id = {run_id} (short-circuit: manifest already SUCCESS)", flush=True)
-                _phase("DONE")
-                return 0
-        except (json.JSONDecodeError, OSError):
-            pass
-
-    rp_path = (
-        NAS_ANALYZE / "tenants" / tenant_id / "loans" / loan_id
-        / "retrieve" / run_id / "retrieval_pack.json"
-    )
+    if args.run_id:
+        existing = _read_manifest(manifest_path)
+        if existing is not None and existing.get("status") == "SUCCESS":
+            print(f"run_id = {run_id} (short-circuit: manifest already SUCCESS)")
+            _print_manifest_summary(existing.get("retrieval_pack_sha256"), run_id, "SUCCESS")
+            _phase("DONE")
+            return 0
+
+    rp_path = loan_base.joinpath("retrieve", run_id, "retrieval_pack.json")
 
     error_msg: Optional[str] = None
     failed_step: Optional[str] = None
 
+    # The manifest's RP hash is computed in the background as soon as the last Step13 has written
+    # the pack; Step12 never rewrites it, so the hash overlaps the remaining LLM steps.
+    hash_pool = ThreadPoolExecutor(max_workers=1)
+    rp_hash_future: Optional[Future] = None
+
+    def _start_rp_hash(known_sha256: Optional[str] = None) -> None:
+        """known_sha256: hash the caller just computed over the final pack (no second pass)."""
+        nonlocal rp_hash_future
+        if known_sha256 is not None:
+            rp_hash_future = Future()
+            rp_hash_future.set_result(known_sha256)
+        elif rp_path.exists():
+            rp_hash_future = hash_pool.submit(sha256_file, rp_path)
+
+    # Jobs that run Step13 more than once share one warm query embedder (see _embedder_service).
+    embedder: Optional[_embedder_service.EmbedderService] = None
+
     try:
         preflight_mount_contract()
 
-        print(f"run_id = {run_id}", flush=True)
+        print(f"run_id = {run_id}")
 
         # --- Step 10: Intake ---
         if not args.skip_intake:
@@ -244,8 +324,12 @@ def main(argv=None) -> int:
                 "--run-id", run_id,
             ], "Step11: process + embed")
 
+        step12_env = None if args.run_llm else {"RUN_LLM": "0"}
+
         # --- Step 13: General retrieval pack ---
-        _phase("STEP13_GENERAL")
+        # With income analysis on, the general pack goes to its own directory so the income Step13
+        # (which owns retrieval_pack.json) can run at the same time; only uw_conditions reads it.
+        general_rp_path = rp_path.parent / "general" / "retrieval_pack.json" if ran_income else rp_path
         top_k_general = args.top_k if args.top_k is not None else 80
         step13_general_cmd = [
             sys.executable, _step("step13_build_retrieval_pack.py"),
@@ -256,54 +340,37 @@ def main(argv=None) -> int:
             "--out-run-id", run_id,
             "--top-k", str(top_k_general),
         ]
+        if ran_income:
+            step13_general_cmd += ["--out-dir", str(general_rp_path.parent)]
         if args.debug:
             step13_general_cmd.append("--debug")
         if args.offline_embeddings:
             step13_general_cmd.append("--offline-embeddings")
-        _run(step13_general_cmd, "Step13: general retrieval pack")
-        if args.expect_rp_hash_stable:
-            if not rp_path.exists():
-                raise RuntimeError("expect_rp_hash_stable: retrieval_pack.json missing after first Step13")
-            hash1 = sha256_file(rp_path)
-            _run(step13_general_cmd, "Step13: general retrieval pack (rerun for hash stability)")
-            if not rp_path.exists():
-                raise RuntimeError("expect_rp_hash_stable: retrieval_pack.json missing after rerun")
-            hash2 = sha256_file(rp_path)
-            if hash1 != hash2:
-                raise RuntimeError(
-                    f"expect_rp_hash_stable: retrieval_pack hash changed (first={hash1!r}, second={hash2!r})"
-                )
-            if args.debug:
-                print(f"[debug] expect_rp_hash_stable: hashes match {hash1!r}", flush=True)
-
-        step12_env = None if args.run_llm else {"RUN_LLM": "0"}
 
-        # --- UW Conditions (uses general retrieval pack) ---
-        _phase("STEP12_UW_CONDITIONS")
-        step12_uw_cond_cmd = [
-            sys.executable, _step("step12_analyze.py"),
-            "--tenant-id", tenant_id,
-            "--loan-id", loan_id,
-            "--run-id", run_id,
-            "--query", UW_CONDITIONS_QUERY,
-            "--analysis-profile", "uw_conditions",
-            "--ollama-url", ollama_url,
-            "--llm-model", "mistral",
-            "--llm-temperature", "0",
-            "--llm-max-tokens", "1500",
-            "--evidence-max-chars", "6000",
-            "--ollama-timeout", "900",
-            "--save-llm-raw",
-            "--no-auto-retrieve",
-        ]
-        if args.debug:
-            step12_uw_cond_cmd.append("--debug")
-        _run(step12_uw_cond_cmd, "Step12: uw_conditions", env=step12_env)
+        def _general_retrieval() -> Optional[str]:
+            """Run the general Step13; return the verified pack hash when expect_rp_hash_stable."""
+            _phase("STEP13_GENERAL")
+            _run(step13_general_cmd, "Step13: general retrieval pack")
+            if args.expect_rp_hash_stable:
+                if not general_rp_path.exists():
+                    raise RuntimeError("expect_rp_hash_stable: retrieval_pack.json missing after first Step13")
+                hash1 = sha256_file(general_rp_path)
+                _run(step13_general_cmd, "Step13: general retrieval pack (rerun for hash stability)")
+                if not general_rp_path.exists():
+                    raise RuntimeError("expect_rp_hash_stable: retrieval_pack.json missing after rerun")
+                hash2 = sha256_file(general_rp_path)
+                if hash1 != hash2:
+                    raise RuntimeError(
+                        f"expect_rp_hash_stable: retrieval_pack hash changed (first={hash1!r}, second={hash2!r})"
+                    )
+                if args.debug:
+                    print(f"[debug] expect_rp_hash_stable: hashes match {hash1!r}")
+                return hash2
+            return None
 
-        # --- Income analysis ---
+        # --- Step 13: Income-focused retrieval pack (writes retrieval_pack.json) ---
+        step13_income_cmd: Optional[list] = None
         if ran_income:
-            _phase("STEP13_INCOME")
-            # Step 13: income-focused retrieval (overwrites RP)
             top_k_income = args.top_k if args.top_k is not None else 120
             max_per_file = args.max_per_file if args.max_per_file is not None else 12
             step13_income_cmd = [
@@ -322,11 +389,18 @@ def main(argv=None) -> int:
                 step13_income_cmd.append("--debug")
             if args.offline_embeddings:
                 step13_income_cmd.append("--offline-embeddings")
+
+        def _income_retrieval() -> None:
+            _phase("STEP13_INCOME")
             _run(step13_income_cmd, "Step13: income-focused retrieval pack")
+            _start_rp_hash()
             if args.max_dropped_chunks is not None and rp_path.exists():
-                with rp_path.open() as f:
-                    rp_data = json.load(f)
-                meta = rp_data.get("retrieval_pack_meta") or {}
+                meta_path = rp_path.with_name("retrieval_pack.meta.json")
+                try:
+                    meta = orjson.loads(meta_path.read_bytes())
+                except FileNotFoundError:
+                    # Pack from a Step13 without the sidecar: read the meta from the pack itself.
+                    meta = orjson.loads(rp_path.read_bytes()).get("retrieval_pack_meta") or {}
                 dropped_count = meta.get("dropped_chunk_ids_count", 0)
                 if dropped_count > args.max_dropped_chunks:
                     raise RuntimeError(
@@ -334,8 +408,55 @@ def main(argv=None) -> int:
                         f"dropped_chunk_ids_count={dropped_count}"
                     )
                 if args.debug:
-                    print(f"[debug] max_dropped_chunks check: dropped_chunk_ids_count={dropped_count}", flush=True)
+                    print(f"[debug] max_dropped_chunks check: dropped_chunk_ids_count={dropped_count}")
+
+        # --- UW Conditions (uses general retrieval pack) ---
+        step12_uw_cond_cmd = [
+            sys.executable, _step("step12_analyze.py"),
+            "--tenant-id", tenant_id,
+            "--loan-id", loan_id,
+            "--run-id", run_id,
+            "--query", UW_CONDITIONS_QUERY,
+            "--analysis-profile", "uw_conditions",
+            "--ollama-url", ollama_url,
+            "--llm-model", "mistral",
+            "--llm-temperature", "0",
+            "--llm-max-tokens", "1500",
+            "--evidence-max-chars", "6000",
+            "--ollama-timeout", "900",
+            "--save-llm-raw",
+            "--no-auto-retrieve",
+        ]
+        if ran_income:
+            step12_uw_cond_cmd += ["--retrieval-pack", str(general_rp_path)]
+        if args.llm_cache_dir:
+            step12_uw_cond_cmd += ["--llm-cache-dir", args.llm_cache_dir]
+        if args.debug:
+            step12_uw_cond_cmd.append("--debug")
 
+        # Dependency graph after Step11: S13g -> S12 uw_conditions, and S13i (concurrently with
+        # both) -> S12 income -> S12 uw_decision. Step12 calls stay serial: each rebuilds the same
+        # analyze run directory. Leaving the with-block waits for the income branch.
+        if ran_income or args.expect_rp_hash_stable:
+            embedder = _embedder_service.start(EMBED_MODEL_NAME, offline=args.offline_embeddings)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            income_future = pool.submit(_income_retrieval) if ran_income else None
+            general_sha256 = _general_retrieval()
+            if embedder is not None:
+                # Free the embedder (and its GPU memory) once the last Step13 is done.
+                if income_future is None:
+                    embedder.stop()
+                else:
+                    income_future.add_done_callback(lambda _f: embedder.stop())
+            if income_future is None:
+                _start_rp_hash(general_sha256)
+            _phase("STEP12_UW_CONDITIONS")
+            _run(step12_uw_cond_cmd, "Step12: uw_conditions", env=step12_env)
+            if income_future is not None:
+                income_future.result()
+
+        # --- Income analysis ---
+        if ran_income:
             _phase("STEP12_INCOME_ANALYSIS")
             # Step 12: income_analysis (env RUN_LLM=0 when --no-run-llm)
             step12_income_cmd = [
@@ -353,6 +474,8 @@ def main(argv=None) -> int:
                 "--ollama-timeout", "900",
                 "--save-llm-raw",
             ]
+            if args.llm_cache_dir:
+                step12_income_cmd += ["--llm-cache-dir", args.llm_cache_dir]
             if args.debug:
                 step12_income_cmd.append("--debug")
             _run(step12_income_cmd, "Step12: income_analysis", env=step12_env)
@@ -383,14 +506,20 @@ def main(argv=None) -> int:
         failed_step = exc.cmd[1] if len(exc.cmd) > 1 else str(exc.cmd)
     except Exception as exc:
         error_msg = str(exc)
+    if embedder is not None:
+        embedder.stop()
 
     # --- Compute RP hash ---
     rp_sha256: Optional[str] = None
-    if rp_path.exists():
-        try:
+    try:
+        if rp_hash_future is not None:
+            rp_sha256 = rp_hash_future.result()
+        elif rp_path.exists():
+            # Failed before the final Step13: hash whatever pack is on disk.
             rp_sha256 = sha256_file(rp_path)
-        except OSError:
-            pass
+    except OSError:
+        pass
+    hash_pool.shutdown()
 
     # --- Write manifest ---
     status = "SUCCESS" if error_msg is None else "FAIL"
@@ -412,6 +541,7 @@ def main(argv=None) -> int:
             "offline_embeddings": args.offline_embeddings,
             "top_k": args.top_k,
             "max_per_file": args.max_per_file,
+            "llm_cache_dir": args.llm_cache_dir,
         },
     }
     if error_msg is not None:
@@ -421,8 +551,9 @@ def main(argv=None) -> int:
 
     ensure_dir(manifest_dir)
     atomic_write_json(manifest_path, manifest)
-    print(f"\n{'✓' if status == 'SUCCESS' else '✗'} job_manifest: {manifest_path}", flush=True)
-    print(f"  status={status}  run_id={run_id}  rp_sha256={rp_sha256 or 'null'}", flush=True)
+    print(f"\n{'✓' if status == 'SUCCESS' else '✗'} job_manifest: {manifest_path}")
+    print(f"  status={status}  run_id={run_id}  rp_sha256={rp_sha256 or 'null'}")
+    _print_manifest_summary(rp_sha256, run_id, status)
 
     if status == "SUCCESS":
         _phase("DONE")
@@ -432,4 +563,6 @@ def main(argv=None) -> int:
 
 
 if __name__ == "__main__":
+    # PHASE:/MANIFEST: lines are read live from the pipe: flush each line without flush=True.
+    sys.stdout.reconfigure(line_buffering=True)
     raise SystemExit(main())
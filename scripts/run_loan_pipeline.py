@@ -11,9 +11,9 @@ from lib import (
     validate_source_path,
     utc_run_id,
 )
-from step10_intake import main as step10_main
-from step11_process import main as step11_main
-from step12_analyze import main as step12_main
+# Step modules are imported where each step runs: step11_process pulls in torch,
+# sentence-transformers and qdrant_client, which --help, argument errors and a failed
+# preflight or intake should not have to load.
 
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="MortgageDocAI v1 orchestrator (Steps 10–13)")
@@ -28,6 +28,7 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--embedding-dim", type=int, default=1024)
     p.add_argument("--embedding-device", choices=["cpu","cuda"], default=None)
     p.add_argument("--batch-size", type=int, default=64)
+    p.add_argument("--upsert-parallel", type=int, default=2)
 
     p.add_argument("--chunk-target-chars", type=int, default=4500)
     p.add_argument("--chunk-max-chars", type=int, default=6000)
@@ -58,6 +59,7 @@ def main() -> int:
         run_id = args.run_id or utc_run_id()
 
         # Step 10
+        from step10_intake import main as step10_main
         step10_main([
             "--tenant-id", args.tenant_id,
             "--loan-id", args.loan_id,
@@ -74,6 +76,7 @@ def main() -> int:
             "--embedding-model", args.embedding_model,
             "--embedding-dim", str(args.embedding_dim),
             "--batch-size", str(args.batch_size),
+            "--upsert-parallel", str(args.upsert_parallel),
             "--chunk-target-chars", str(args.chunk_target_chars),
             "--chunk-max-chars", str(args.chunk_max_chars),
             "--chunk-overlap-chars", str(args.chunk_overlap_chars),
@@ -85,6 +88,7 @@ def main() -> int:
         ]
         if args.embedding_device:
             step11_argv += ["--embedding-device", args.embedding_device]
+        from step11_process import main as step11_main
         step11_main(step11_argv)
 
         # Step 12
@@ -106,6 +110,7 @@ def main() -> int:
         if args.retrieval_packs:
             for rp in args.retrieval_packs:
                 step12_argv += ["--retrieval-pack", rp]
+        from step12_analyze import main as step12_main
         step12_main(step12_argv)
 
         print("✓ Pipeline complete")
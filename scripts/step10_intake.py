@@ -8,8 +8,14 @@ Step 10 — Intake / staging (canonical v1)
 from __future__ import annotations
 
 import argparse
+import errno
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional
 
 from lib import (
     DEFAULT_TENANT, ContractError,
@@ -28,8 +34,168 @@ def parse_args(argv=None) -> argparse.Namespace:
     ap.add_argument("--force", action="store_true")
     return ap.parse_args(argv)
 
-def _iter_files(root: Path) -> List[Path]:
-    return [p for p in root.rglob("*") if p.is_file()]
+def _iter_files(root: Path) -> Iterator[str]:
+    """Yield paths of all files under root (same set as rglob("*") + is_file()).
+
+    os.scandir walk: file/dir type comes from the DirEntry (d_type), so no per-entry stat and
+    no Path object per entry. Directory symlinks are not descended, as with rglob.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    yield entry.path
+
+COPY_CHUNK_BYTES = 1 << 20
+KERNEL_COPY_BYTES = 1 << 30
+_NO_COPY_FILE_RANGE = {errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.EINVAL, errno.EPERM}
+INTAKE_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def _copy_and_hash(src: Path, dst: Path) -> tuple[str, int]:
+    """Copy src to dst in 1 MiB chunks, hashing each chunk as it passes; return (sha256, size).
+
+    One read of the source instead of copy + re-reading dst for sha256_file.
+    """
+    h = hashlib.sha256()
+    buf = bytearray(COPY_CHUNK_BYTES)
+    view = memoryview(buf)
+    size = 0
+    with open(src, "rb", buffering=0) as f_src:
+        fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while n := f_src.readinto(buf):
+                chunk = view[:n]
+                h.update(chunk)
+                while chunk:
+                    chunk = chunk[os.write(fd, chunk):]
+                size += n
+        finally:
+            os.close(fd)
+    return h.hexdigest(), size
+
+
+def _hash_staged(dst: Path) -> Optional[tuple[str, int]]:
+    """(sha256, size) of a file already staged at dst, or None if there is none.
+
+    One open + fstat on the NAS instead of exists() + hash + stat() (three round trips).
+    """
+    try:
+        f = open(dst, "rb", buffering=0)
+    except FileNotFoundError:
+        return None
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        return hashlib.file_digest(f, "sha256").hexdigest(), size
+
+
+def _load_prior_staged(loan_root: Path) -> Dict[str, Dict[str, Any]]:
+    """Index the loan's previous intake_manifest.json by sha256 (empty on first intake)."""
+    try:
+        files = json.loads((loan_root / "_meta" / "intake_manifest.json").read_bytes()).get("files") or []
+    except (OSError, ValueError):
+        return {}
+    return {f["sha256"]: f for f in files if f.get("sha256") and f.get("stored_relative_path")}
+
+
+def _kernel_copy(src: Path, dst: Path) -> None:
+    """Copy src to dst without pulling the bytes through Python, for content whose hash is known.
+
+    copy_file_range lets NFS 4.2 / SMB3 do a server-side copy between files on the same share;
+    where it is unsupported (EXDEV, ENOSYS, EOPNOTSUPP...) shutil.copyfile uses sendfile.
+    """
+    with open(src, "rb", buffering=0) as f_src:
+        fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while os.copy_file_range(f_src.fileno(), fd, KERNEL_COPY_BYTES):
+                pass
+            return
+        except OSError as exc:
+            if exc.errno not in _NO_COPY_FILE_RANGE:
+                raise
+        finally:
+            os.close(fd)
+    shutil.copyfile(src, dst)
+
+
+def _reuse_prior_copy(
+    src_path: str,
+    dst: Path,
+    loan_root: Path,
+    prior: Dict[str, Dict[str, Any]],
+    prior_sizes: FrozenSet[int],
+) -> Optional[tuple[str, int]]:
+    """Stage src_path from an identical file of a previous intake; return (sha256, size).
+
+    Hard link first; on shares without hard links, a kernel copy of the prior staged file (the
+    hash is already known, so the bytes need not pass through Python). None when the source is
+    new or the prior copy is gone (caller copies and hashes it). Sizes are checked first so new
+    files are not read an extra time just to learn they have no prior copy.
+    """
+    size = os.stat(src_path).st_size
+    if size not in prior_sizes:
+        return None
+    h = sha256_file(src_path)
+    entry = prior.get(h)
+    if entry is None or entry.get("size_bytes") != size:
+        return None
+    prior_copy = loan_root / entry["stored_relative_path"]
+    try:
+        os.link(prior_copy, dst)
+    except FileNotFoundError:
+        return None
+    except OSError:
+        _kernel_copy(prior_copy, dst)
+    return h, size
+
+
+def _stage_one(
+    src_path: str,
+    source_root: str,
+    bucket_dir: Path,
+    source_rel_root: Path,
+    bucket_rel_root: Path,
+    force: bool,
+    loan_root: Path,
+    prior: Dict[str, Dict[str, Any]],
+    prior_sizes: FrozenSet[int],
+) -> Dict[str, Any]:
+    """Stage one source file into bucket_dir; return its intake_manifest entry.
+
+    source_rel_root / bucket_rel_root: the source root relative to SOURCE_MOUNT and bucket_dir
+    relative to the loan root, both resolved once by the caller. Manifest paths are joined onto
+    them instead of resolve()-ing (a readlink per path component) every file on the NAS.
+    prior / prior_sizes: the previous intake's files by sha256 and their sizes; content already
+    staged is reused from the prior bucket instead of copied (skipped with --force).
+    """
+    rel = os.path.relpath(src_path, source_root)
+    dst = bucket_dir / rel
+    ensure_dir(dst.parent)
+    staged = None if force else _hash_staged(dst)
+    if staged is not None:
+        h, size = staged
+    else:
+        reused = None if force or not prior else _reuse_prior_copy(src_path, dst, loan_root, prior, prior_sizes)
+        if reused is not None:
+            h, size = reused
+        else:
+            h, size = _copy_and_hash(Path(src_path), dst)
+    if os.path.islink(src_path):
+        # A file symlink is recorded by its target, exactly as resolve() did before.
+        original = Path(src_path).resolve().relative_to(SOURCE_MOUNT.resolve())
+    else:
+        original = source_rel_root / rel
+    return {
+        "document_id": h,
+        "original_source_path": str(original),
+        "stored_relative_path": str(bucket_rel_root / rel),
+        "size_bytes": size,
+        "sha256": h,
+    }
+
 
 def main(argv=None) -> None:
     args = parse_args(argv)
@@ -41,28 +207,27 @@ def main(argv=None) -> None:
     loan_root = NAS_INGEST / "tenants" / args.tenant_id / "loans" / args.loan_id
     meta_dir = loan_root / "_meta"
     ensure_dir(meta_dir)
+    prior = _load_prior_staged(loan_root)
+    prior_sizes = frozenset(f.get("size_bytes") for f in prior.values())
 
     ts = utc_timestamp_compact()
     bucket_dir = loan_root / args.intake_bucket / ts
     ensure_dir(bucket_dir)
 
-    staged_files: List[Dict[str, Any]] = []
-    for src in sorted(_iter_files(source_root), key=lambda p: str(p).lower()):
-        rel = src.relative_to(source_root)
-        dst = bucket_dir / rel
-        ensure_dir(dst.parent)
-        if dst.exists() and not args.force:
-            pass
-        else:
-            dst.write_bytes(src.read_bytes())
-        h = sha256_file(dst)
-        staged_files.append({
-            "document_id": h,
-            "original_source_path": str(src.resolve().relative_to(SOURCE_MOUNT.resolve())),
-            "stored_relative_path": str(dst.resolve().relative_to(loan_root.resolve())),
-            "size_bytes": dst.stat().st_size,
-            "sha256": h,
-        })
+    sources = sorted(_iter_files(source_root), key=str.lower)
+    source_root_str = os.fspath(source_root)
+    source_rel_root = source_root.resolve().relative_to(SOURCE_MOUNT.resolve())
+    bucket_rel_root = bucket_dir.resolve().relative_to(loan_root.resolve())
+    # Copy+hash is I/O and hashlib work that releases the GIL, so threads overlap NAS streams;
+    # map() keeps results in the sorted source order for a deterministic manifest.
+    with ThreadPoolExecutor(max_workers=min(INTAKE_WORKERS, len(sources) or 1)) as pool:
+        staged_files: List[Dict[str, Any]] = list(pool.map(
+            lambda src: _stage_one(
+                src, source_root_str, bucket_dir, source_rel_root, bucket_rel_root, args.force,
+                loan_root, prior, prior_sizes,
+            ),
+            sources,
+        ))
 
     atomic_write_json(meta_dir / "intake_manifest.json", {
         "tenant_id": args.tenant_id,
@@ -3,16 +3,21 @@ from __future__ import annotations
 
 import argparse
 import hashlib
+import importlib.util
 import json
+import multiprocessing
+import os
 import subprocess
 import uuid
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
 
 import torch
 from sentence_transformers import SentenceTransformer
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams, PointStruct
+from qdrant_client.http.models import Distance, OptimizersConfigDiff, VectorParams, PointStruct
 
 from lib import (
     DEFAULT_TENANT,
@@ -24,9 +29,10 @@ from lib import (
     build_run_context,
     qdrant_collection_name,
     normalize_chunk_text,
-    chunk_id,
+    chunk_id_from_text_hash,
     chunk_text_hash,
     atomic_write_json,
+    atomic_write_jsonl,
     atomic_write_text,
     atomic_rename_dir,
     ensure_dir,
@@ -38,10 +44,28 @@ from lib import (
 # Deterministic Qdrant point ID (UUIDv5 from chunk_id)
 # ---------------------------------------------------------------------
 _UUID_NAMESPACE = uuid.UUID("b1f0b5d8-2a54-4d7f-8f1e-9f9b0b3a9b1a")
+_NS_BYTES = _UUID_NAMESPACE.bytes
 
 
 def point_id_from_chunk_id(chunk_id_hex: str) -> str:
-    return str(uuid.uuid5(_UUID_NAMESPACE, chunk_id_hex))
+    """str(uuid.uuid5(_UUID_NAMESPACE, chunk_id_hex)) without building a UUID object per chunk."""
+    b = bytearray(hashlib.sha1(_NS_BYTES + chunk_id_hex.encode("utf-8")).digest()[:16])
+    b[6] = (b[6] & 0x0F) | 0x50  # version 5
+    b[8] = (b[8] & 0x3F) | 0x80  # RFC 4122 variant
+    x = b.hex()
+    return f"{x[:8]}-{x[8:12]}-{x[12:16]}-{x[16:20]}-{x[20:]}"
+
+
+# Chunk record fields copied into each Qdrant point payload (with tenant_id, loan_id, run_id).
+_PAYLOAD_FIELDS = ("document_id", "file_relpath", "page_start", "page_end", "chunk_index", "chunk_id")
+
+
+# Default --upsert-parallel: upsert batches in flight while the next batch is embedded. Each
+# upsert still uses wait=True, so every point is committed before the drain after the chunk loop.
+UPSERT_IN_FLIGHT = 2
+
+# Qdrant's default indexing_threshold (KB), restored after a new collection's first bulk load.
+INDEXING_THRESHOLD_KB = 20000
 
 
 # ---------------------------------------------------------------------
@@ -54,10 +78,21 @@ def parse_args(argv=None) -> argparse.Namespace:
     p.add_argument("--run-id", required=True)
 
     p.add_argument("--qdrant-url", default="http://localhost:6333")
+    p.add_argument("--grpc-port", type=int, default=6334,
+                   help="Qdrant gRPC port used for the bulk upserts (0 = REST only)")
     p.add_argument("--embedding-model", default=EMBED_MODEL_NAME)
     p.add_argument("--embedding-dim", type=int, default=EMBED_DIM)
     p.add_argument("--embedding-device", choices=["cpu", "cuda"], default=None)
+    p.add_argument("--embedding-backend", choices=["torch", "onnx", "openvino"], default="torch",
+                   help="SentenceTransformer inference backend (onnx/openvino need "
+                        "sentence-transformers>=3.2 with the optimum extras)")
+    p.add_argument("--encode-threads", type=int, default=None,
+                   help="torch intra-op threads for CPU encoding (default: torch's own, one per physical core)")
+    p.add_argument("--embedding-fp16", action="store_true", default=False,
+                   help="Run the torch encoder in float16 on CUDA (ignored on CPU and other backends)")
     p.add_argument("--batch-size", type=int, default=32)
+    p.add_argument("--upsert-parallel", type=int, default=UPSERT_IN_FLIGHT,
+                   help="Qdrant upsert batches in flight while the next batch is embedded")
 
     p.add_argument("--chunk-target-chars", type=int, default=4500)
     p.add_argument("--chunk-max-chars", type=int, default=6000)
@@ -69,6 +104,9 @@ def parse_args(argv=None) -> argparse.Namespace:
     p.add_argument("--dense-chunk-overlap-chars", type=int, default=350)
 
     p.add_argument("--ocr-threshold-chars", type=int, default=400)
+    p.add_argument("--pdf-extractor", choices=["pypdf", "pdfium"], default="pypdf",
+                   help="PDF text layer: pypdf (default) or PDFium via pypdfium2 (faster; different "
+                        "text, so chunk ids differ from pypdf runs)")
     return p.parse_args(argv)
 
 
@@ -88,6 +126,17 @@ def _extract_pdf_pages_text(pdf_path: Path) -> List[str]:
     return pages
 
 
+def _extract_pdf_pages_text_pdfium(pdf_path: Path) -> List[str]:
+    """--pdf-extractor pdfium: PDFium (C++) text layer; password-protected PDFs raise PdfiumError."""
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(str(pdf_path))
+    try:
+        return [pdf[i].get_textpage().get_text_range() for i in range(len(pdf))]
+    finally:
+        pdf.close()
+
+
 def _extract_docx_text(path: Path) -> str:
     """Extract text from .docx; deterministic (paragraphs joined with newlines)."""
     from docx import Document
@@ -118,6 +167,62 @@ def _extract_xlsx_text(path: Path) -> str:
     return "\n".join(parts).strip()
 
 
+_EXTRACTORS = {
+    ".pdf": _extract_pdf_pages_text,
+    ".docx": _extract_docx_text,
+    ".xlsx": _extract_xlsx_text,
+}
+
+# Worker processes for hash checks + text extraction (pypdf/python-docx/openpyxl hold the GIL).
+EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def _verify_and_extract(
+    staged_path: Path, sha256: str, pdf_extractor: str = "pypdf"
+) -> Tuple[bool, Any, Optional[str]]:
+    """Extraction worker: return (hash_ok, extracted, error).
+
+    extracted is the PDF page list or the DOCX/XLSX text (None for other types, or when the
+    parser raised, in which case error carries its message).
+    """
+    if sha256_file(staged_path) != sha256:
+        return False, None, None
+    suffix = staged_path.suffix.lower()
+    if suffix == ".pdf" and pdf_extractor == "pdfium":
+        extract = _extract_pdf_pages_text_pdfium
+    else:
+        extract = _EXTRACTORS.get(suffix)
+    if extract is None:
+        return True, None, None
+    try:
+        return True, extract(staged_path), None
+    except Exception as e:
+        return True, None, str(e)
+
+
+def _recording_chunk_map(
+    records: List[Dict[str, Any]], chunk_map: Dict[str, Dict[str, Any]]
+) -> Iterator[Dict[str, Any]]:
+    """Yield chunk records unchanged, filling chunk_map (chunk_id -> location) on the way."""
+    for rec in records:
+        chunk_map[rec["chunk_id"]] = {
+            "document_id": rec["document_id"],
+            "file_relpath": rec["file_relpath"],
+            "page_start": rec["page_start"],
+            "page_end": rec["page_end"],
+            "chunk_index": rec["chunk_index"],
+        }
+        yield rec
+
+
+def _write_doc_artifacts(doc_chunk_dir: Path, chunk_records: List[Dict[str, Any]]) -> None:
+    """Write one document's chunks.jsonl and chunk_map.json in a single pass over its records
+    (the atomic writers create doc_chunk_dir)."""
+    chunk_map: Dict[str, Dict[str, Any]] = {}
+    atomic_write_jsonl(doc_chunk_dir / "chunks.jsonl", _recording_chunk_map(chunk_records, chunk_map))
+    atomic_write_json(doc_chunk_dir / "chunk_map.json", chunk_map)
+
+
 def _looks_dense_doc(filename: str) -> bool:
     name = filename.lower()
     return any(
@@ -133,17 +238,15 @@ def _chunk_page_text(
     if not t:
         return []
 
-    chunks: List[str] = []
-    i = 0
+    # Fixed windows of width min(target, maxc), each starting `overlap` chars before the previous
+    # one ended; the last window is the first that reaches the end of the page.
     n = len(t)
-
-    while i < n:
-        end = min(i + target, n)
-        end = min(end, i + maxc)
-        chunks.append(t[i:end])
-        if end >= n:
-            break
-        i = max(0, end - overlap)
+    width = min(target, maxc)
+    step = width - overlap
+    if step <= 0 and n > width:
+        raise ContractError(f"chunk overlap ({overlap}) must be smaller than the chunk size ({width})")
+    last_start = -(-(n - width) // step) * step if n > width else 0
+    chunks = [t[i:i + width] for i in range(0, last_start + 1, max(step, 1))]
 
     merged: List[str] = []
     buf = ""
@@ -161,7 +264,23 @@ def _chunk_page_text(
     return merged
 
 
-def _ensure_collection(client: QdrantClient, collection: str) -> None:
+def _load_embedding_model(model_name: str, device: str, backend: str) -> SentenceTransformer:
+    """Passage encoder for --embedding-backend. torch (the default) is the same runtime as
+    Step13's query encoder; onnx picks the onnxruntime provider matching the device."""
+    if backend == "torch":
+        return SentenceTransformer(model_name, device=device)
+    model_kwargs = {}
+    if backend == "onnx":
+        model_kwargs["provider"] = "CUDAExecutionProvider" if device == "cuda" else "CPUExecutionProvider"
+    return SentenceTransformer(model_name, device=device, backend=backend, model_kwargs=model_kwargs)
+
+
+def _ensure_collection(client: QdrantClient, collection: str) -> bool:
+    """Validate the tenant collection, creating it if needed; return True when it was created.
+
+    A new collection starts with HNSW indexing off (indexing_threshold=0) so its first bulk load
+    is not indexed batch by batch; main() turns indexing on once every upsert has landed.
+    """
     try:
         info = client.get_collection(collection)
         vp = info.config.params.vectors
@@ -175,7 +294,10 @@ def _ensure_collection(client: QdrantClient, collection: str) -> None:
         client.recreate_collection(
             collection_name=collection,
             vectors_config=VectorParams(size=EMBED_DIM, distance=Distance.COSINE),
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=0),
         )
+        return True
+    return False
 
 
 # ---------------------------------------------------------------------
@@ -205,16 +327,54 @@ def main(argv=None) -> None:
     for d in ["_meta", "text", "ocr", "chunks", "embeddings/qdrant"]:
         ensure_dir(run_staging / d)
 
-    device = args.embedding_device or ("cuda" if torch.cuda.is_available() else "cpu")
-    model = SentenceTransformer(args.embedding_model, device=device)
+    pdf_extractor = args.pdf_extractor
+    if pdf_extractor == "pdfium" and importlib.util.find_spec("pypdfium2") is None:
+        print("[WARN] --pdf-extractor pdfium: pypdfium2 is not installed; using pypdf")
+        pdf_extractor = "pypdf"
+
+    # Extraction runs in worker processes while the model loads and chunking proceeds; the fork
+    # context starts every worker on the first submit, i.e. before any CUDA context exists.
+    extract_pool = ProcessPoolExecutor(
+        max_workers=min(EXTRACT_WORKERS, len(files) or 1), mp_context=multiprocessing.get_context("fork")
+    )
+    extractions = [
+        extract_pool.submit(
+            _verify_and_extract, ingest_root / f["stored_relative_path"], f["sha256"], pdf_extractor
+        )
+        for f in files
+    ]
 
-    qdrant = QdrantClient(url=args.qdrant_url)
+    device = args.embedding_device or ("cuda" if torch.cuda.is_available() else "cpu")
+    if device == "cpu" and args.encode_threads:
+        torch.set_num_threads(args.encode_threads)
+    model = _load_embedding_model(args.embedding_model, device, args.embedding_backend)
+    fp16 = args.embedding_fp16 and device == "cuda" and args.embedding_backend == "torch"
+    if fp16:
+        # Half the memory traffic; vectors are still L2-normalized by encode().
+        model.half()
+    if device == "cuda":
+        # First CUDA encode pays for kernel selection / allocator growth; take it while the
+        # extraction pool is still working rather than on the first real batch.
+        with torch.inference_mode():
+            model.encode(["passage: warmup"], normalize_embeddings=True, convert_to_numpy=True)
+
+    # Upserts over gRPC send vectors as packed float32 instead of JSON number text.
+    if args.grpc_port:
+        qdrant = QdrantClient(url=args.qdrant_url, prefer_grpc=True, grpc_port=args.grpc_port, timeout=60)
+    else:
+        qdrant = QdrantClient(url=args.qdrant_url)
     collection = qdrant_collection_name(args.tenant_id)
-    _ensure_collection(qdrant, collection)
+    created_collection = _ensure_collection(qdrant, collection)
     atomic_write_text(run_staging / "embeddings/qdrant/collection_name.txt", collection)
 
-    batch_texts: List[str] = []
-    batch_meta: List[Tuple[str, Dict[str, Any]]] = []
+    # Every chunk record, in chunker order, for embedding. Point ids, Qdrant payloads and the
+    # "passage: " input are derived per batch, so a chunk's text and fields are held once (in the
+    # same record the artifacts are written from).
+    embed_queue: List[Dict[str, Any]] = []
+    payload_base = {"tenant_id": args.tenant_id, "loan_id": args.loan_id, "run_id": args.run_id}
+    upsert_parallel = max(1, args.upsert_parallel)
+    upsert_pool = ThreadPoolExecutor(max_workers=upsert_parallel)
+    pending_upserts: Deque[Future] = deque()
     upserts = 0
     total_chunks = 0
     skipped_encrypted_count = 0
@@ -222,59 +382,77 @@ def main(argv=None) -> None:
     # Accumulate chunks per document for artifacts
     # Key: document_id -> list of chunk record dicts
     doc_chunks: Dict[str, List[Dict[str, Any]]] = {}
-
-    def flush_batch() -> None:
-        nonlocal upserts, batch_texts, batch_meta
-        if not batch_meta:
-            return
-
+    # A document's chunks.jsonl / chunk_map.json are written in the background as soon as its
+    # last manifest entry (identical files share a document_id) has been chunked, overlapping
+    # NAS writes with extraction, chunking and encoding of the rest of the loan.
+    entries_left = Counter(f["document_id"] for f in files)
+    artifact_pool = ThreadPoolExecutor(max_workers=2)
+    artifact_writes: List[Future] = []
+    documents_processed = 0
+
+    def write_document_artifacts(document_id: str) -> None:
+        nonlocal documents_processed
+        documents_processed += 1
+        artifact_writes.append(artifact_pool.submit(
+            _write_doc_artifacts, run_staging / "chunks" / document_id, doc_chunks.pop(document_id)
+        ))
+
+    # embed_queue index of a text's first chunk -> indices of later chunks with identical text.
+    same_text: Dict[int, List[int]] = {}
+
+    def flush_batch(indices: List[int]) -> None:
+        nonlocal upserts
         vecs = model.encode(
-            batch_texts, normalize_embeddings=True, convert_to_numpy=True
+            ["passage: " + embed_queue[i]["text"] for i in indices],
+            normalize_embeddings=True, convert_to_numpy=True,
         )
+        # PointStruct validates vector as a list of floats: convert the batch in one C call.
+        vectors = vecs.tolist()
         points = [
-            PointStruct(id=pid, vector=vecs[i].tolist(), payload=payload)
-            for i, (pid, payload) in enumerate(batch_meta)
+            PointStruct(
+                id=point_id_from_chunk_id(rec["chunk_id"]),
+                vector=vectors[j],
+                payload={**payload_base, **{k: rec[k] for k in _PAYLOAD_FIELDS}},
+            )
+            for j, i in enumerate(indices)
+            for rec in [embed_queue[k] for k in (i, *same_text.get(i, ()))]
         ]
-        qdrant.upsert(collection_name=collection, points=points, wait=True)
+        if len(pending_upserts) >= upsert_parallel:
+            pending_upserts.popleft().result()
+        pending_upserts.append(
+            upsert_pool.submit(qdrant.upsert, collection_name=collection, points=points, wait=True)
+        )
         upserts += len(points)
-        batch_texts.clear()
-        batch_meta.clear()
 
-    for f in files:
+    for f, extraction in zip(files, extractions):
         stored_rel = f["stored_relative_path"]
         document_id = f["document_id"]
         staged_path = ingest_root / stored_rel
+        entries_left[document_id] -= 1
 
-        if sha256_file(staged_path) != f["sha256"]:
+        hash_ok, extracted, error = extraction.result()
+        if not hash_ok:
             raise ContractError(f"Hash mismatch: {staged_path}")
 
         suffix = staged_path.suffix.lower()
         pages: List[str] = []
 
         if suffix == ".pdf":
-            try:
-                pages = _extract_pdf_pages_text(staged_path)
-            except Exception as e:
-                print(f"[WARN] Skipping unreadable/encrypted PDF: {staged_path} ({e})")
+            if error is not None:
+                print(f"[WARN] Skipping unreadable/encrypted PDF: {staged_path} ({error})")
                 skipped_encrypted_count += 1
                 continue
-        elif suffix == ".docx":
-            try:
-                text = _extract_docx_text(staged_path)
-                text_path = run_staging / "text" / f"{document_id}.txt"
-                atomic_write_text(text_path, text)
-                pages = [text] if text.strip() else []
-            except Exception as e:
-                print(f"[WARN] Skipping unreadable DOCX: {staged_path} ({e})")
-                continue
-        elif suffix == ".xlsx":
-            try:
-                text = _extract_xlsx_text(staged_path)
-                text_path = run_staging / "text" / f"{document_id}.txt"
-                atomic_write_text(text_path, text)
-                pages = [text] if text.strip() else []
-            except Exception as e:
-                print(f"[WARN] Skipping unreadable XLSX: {staged_path} ({e})")
+            pages = extracted
+        elif suffix in (".docx", ".xlsx"):
+            if error is None:
+                try:
+                    text_path = run_staging / "text" / f"{document_id}.txt"
+                    atomic_write_text(text_path, extracted)
+                    pages = [extracted] if extracted.strip() else []
+                except Exception as e:
+                    error = str(e)
+            if error is not None:
+                print(f"[WARN] Skipping unreadable {suffix[1:].upper()}: {staged_path} ({error})")
                 continue
         else:
             continue
@@ -303,24 +481,11 @@ def main(argv=None) -> None:
             for cidx, chunk in enumerate(
                 _chunk_page_text(page_text, target, maxc, overlap, minc)
             ):
-                cid = chunk_id(document_id, page_i, page_i, cidx, chunk)
-                pid = point_id_from_chunk_id(cid)
-                payload = {
-                    "tenant_id": args.tenant_id,
-                    "loan_id": args.loan_id,
-                    "run_id": args.run_id,
-                    "document_id": document_id,
-                    "file_relpath": stored_rel,
-                    "page_start": page_i,
-                    "page_end": page_i,
-                    "chunk_index": cidx,
-                    "chunk_id": cid,
-                }
-                batch_texts.append("passage: " + chunk)
-                batch_meta.append((pid, payload))
+                cth = chunk_text_hash(chunk)
+                cid = chunk_id_from_text_hash(document_id, page_i, page_i, cidx, cth)
                 total_chunks += 1
 
-                # Accumulate chunk record for artifacts (text WITHOUT "passage: " prefix)
+                # Chunk record for artifacts and embedding (text WITHOUT "passage: " prefix)
                 chunk_record = {
                     "chunk_id": cid,
                     "document_id": document_id,
@@ -329,41 +494,53 @@ def main(argv=None) -> None:
                     "page_end": page_i,
                     "chunk_index": cidx,
                     "text": chunk,
-                    "text_norm_sha256": chunk_text_hash(chunk),
+                    "text_norm_sha256": cth,
                 }
+                embed_queue.append(chunk_record)
                 if document_id not in doc_chunks:
                     doc_chunks[document_id] = []
                 doc_chunks[document_id].append(chunk_record)
 
-                if len(batch_meta) >= args.batch_size:
-                    flush_batch()
-
-    flush_batch()
-
-    # ---------------------------------------------------------------
-    # PART 1A: Write chunks.jsonl per document
-    # ---------------------------------------------------------------
-    for document_id, chunk_records in doc_chunks.items():
-        doc_chunk_dir = run_staging / "chunks" / document_id
-        ensure_dir(doc_chunk_dir)
-        lines = [json.dumps(rec, ensure_ascii=False) for rec in chunk_records]
-        atomic_write_text(doc_chunk_dir / "chunks.jsonl", "\n".join(lines) + "\n")
+        if not entries_left[document_id] and document_id in doc_chunks:
+            write_document_artifacts(document_id)
+
+    extract_pool.shutdown()
+    # Documents whose later duplicate entries were skipped (unreadable / empty) are still pending.
+    for document_id in list(doc_chunks):
+        write_document_artifacts(document_id)
+
+    # Boilerplate (statement headers/footers, repeated disclosures) yields identical chunk texts:
+    # encode each distinct text once and give every copy its vector (each keeps its own point).
+    first_with_text: Dict[str, int] = {}
+    for i, rec in enumerate(embed_queue):
+        first = first_with_text.setdefault(rec["text"], i)
+        if first != i:
+            same_text.setdefault(first, []).append(i)
+
+    # Embed the whole loan in length order: each batch then pads to similar-length chunks instead
+    # of the longest chunk of whatever documents happened to be adjacent.
+    by_length = sorted(first_with_text.values(), key=lambda i: len(embed_queue[i]["text"]))
+    # encode() only uses no_grad; inference_mode also skips autograd version counters / view tracking.
+    with torch.inference_mode():
+        for start in range(0, len(by_length), args.batch_size):
+            flush_batch(by_length[start:start + args.batch_size])
+    while pending_upserts:
+        pending_upserts.popleft().result()
+    upsert_pool.shutdown()
+    if created_collection:
+        # Build the HNSW index once over the whole first load (Qdrant indexes in the background;
+        # Step13 queries are exact over unindexed segments meanwhile).
+        qdrant.update_collection(
+            collection_name=collection,
+            optimizer_config=OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD_KB),
+        )
 
     # ---------------------------------------------------------------
-    # PART 1B: Write chunk_map.json per document
+    # PART 1A/1B: chunks.jsonl and chunk_map.json per document (written in the background)
     # ---------------------------------------------------------------
-    for document_id, chunk_records in doc_chunks.items():
-        doc_chunk_dir = run_staging / "chunks" / document_id
-        chunk_map: Dict[str, Dict[str, Any]] = {}
-        for rec in chunk_records:
-            chunk_map[rec["chunk_id"]] = {
-                "document_id": rec["document_id"],
-                "file_relpath": rec["file_relpath"],
-                "page_start": rec["page_start"],
-                "page_end": rec["page_end"],
-                "chunk_index": rec["chunk_index"],
-            }
-        atomic_write_json(doc_chunk_dir / "chunk_map.json", chunk_map)
+    for write in artifact_writes:
+        write.result()
+    artifact_pool.shutdown()
 
     # ---------------------------------------------------------------
     # PART 1C: Write processing_run.json
@@ -377,6 +554,9 @@ def main(argv=None) -> None:
         "distance_metric": "cosine",
         "normalize": True,
         "device": device,
+        "embedding_backend": args.embedding_backend,
+        "embedding_dtype": "float16" if fp16 else "float32",
+        "pdf_extractor": pdf_extractor,
         "chunker": {
             "chunk_target_chars": args.chunk_target_chars,
             "chunk_max_chars": args.chunk_max_chars,
@@ -390,7 +570,7 @@ def main(argv=None) -> None:
         "total_chunks": total_chunks,
         "upserts": upserts,
         "skipped_encrypted_count": skipped_encrypted_count,
-        "documents_processed": len(doc_chunks),
+        "documents_processed": documents_processed,
         "qdrant_collection": collection,
     }
     atomic_write_json(run_staging / "_meta" / "processing_run.json", processing_meta)
@@ -415,7 +595,7 @@ def main(argv=None) -> None:
     ensure_dir(run_final.parent)
     atomic_rename_dir(run_staging, run_final)
     overwrite_msg = " (overwrote prior run)" if overwrite else ""
-    print(f"✓ Step11 complete: {run_final} (upserts={upserts}, chunks={total_chunks}, docs={len(doc_chunks)}, skipped_encrypted={skipped_encrypted_count}){overwrite_msg}")
+    print(f"✓ Step11 complete: {run_final} (upserts={upserts}, chunks={total_chunks}, docs={documents_processed}, skipped_encrypted={skipped_encrypted_count}){overwrite_msg}")
 
 
 if __name__ == "__main__":
@@ -3,15 +3,21 @@ from __future__ import annotations
 
 import argparse
 import datetime
+import functools
+import hashlib
 import json
 import os
 import re
 import subprocess
+import time
 from collections import Counter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from lib import (
     DEFAULT_TENANT,
@@ -97,13 +103,26 @@ def _build_evidence_block(retrieved_chunks: List[Dict[str, Any]], max_chars_tota
         text = (ch.get("text") or "").strip()
         if not chunk_id or not text:
             continue
-        entry = f"[chunk_id={chunk_id}] {text}\n"
-        if used + len(entry) > max_chars_total:
+        # len(f"[chunk_id={chunk_id}] {text}\n"), known before building the entry.
+        entry_len = len(chunk_id) + len(text) + 13
+        if used + entry_len > max_chars_total:
             break
-        parts.append(entry)
-        used += len(entry)
+        parts.append(f"[chunk_id={chunk_id}] {text}\n")
+        used += entry_len
     return "\n".join(parts).strip()
 
+# One keep-alive connection pool per process: run_loan_job imports this module once and runs
+# uw_conditions, income_analysis and uw_decision in-process, so all three reuse the connection.
+_OLLAMA_SESSION = requests.Session()
+# Retry failed connects (Ollama restarting) and 503 "server busy" (request queue full, nothing
+# was generated) with backoff, honouring Retry-After. Read errors and other statuses are not
+# retried, so a generate request the server accepted is not sent twice.
+_OLLAMA_SESSION.mount("http://", HTTPAdapter(max_retries=Retry(
+    total=5, connect=3, read=0, status=3, redirect=0, backoff_factor=1.0,
+    status_forcelist=(503,), allowed_methods=frozenset({"POST"}),
+)))
+OLLAMA_CONNECT_TIMEOUT_SEC = 10
+
 def _ollama_generate(
     ollama_url: str,
     model: str,
@@ -112,20 +131,129 @@ def _ollama_generate(
     max_tokens: int = 800,
     timeout: int = 600,
 ) -> str:
+    """Generate with Ollama, streaming the response; timeout bounds the whole generation.
+
+    Tokens are collected as they are decoded instead of as one body at the end. A stream that
+    ends without Ollama's final done chunk (dropped connection, server restart) raises instead
+    of returning the partial text.
+    """
     url = ollama_url.rstrip("/") + "/api/generate"
     payload = {
         "model": model,
         "prompt": prompt,
-        "stream": False,
+        "stream": True,
         "options": {
             "temperature": float(temperature),
             "num_predict": int(max_tokens),
         },
     }
-    r = requests.post(url, json=payload, timeout=timeout)
-    r.raise_for_status()
-    data = r.json()
-    return data.get("response", "")
+    parts: List[str] = []
+    deadline = time.monotonic() + timeout
+    with _OLLAMA_SESSION.post(url, json=payload, timeout=(OLLAMA_CONNECT_TIMEOUT_SEC, timeout),
+                              stream=True) as r:
+        r.raise_for_status()
+        for line in r.iter_lines():
+            if not line:
+                continue
+            chunk = orjson.loads(line)
+            if chunk.get("error"):
+                raise RuntimeError(f"Ollama generate failed: {chunk['error']}")
+            parts.append(chunk.get("response", ""))
+            if chunk.get("done"):
+                return "".join(parts)
+            if time.monotonic() > deadline:
+                raise requests.Timeout(f"Ollama generate exceeded {timeout}s")
+    raise RuntimeError(f"Ollama generate stream ended before completion ({len(parts)} chunks received)")
+
+
+LLM_CACHE_MAX_BYTES = 1 << 30
+
+
+def _evict_llm_cache(cache_dir: Path, max_bytes: int) -> None:
+    """Delete least recently used entries (oldest mtime; hits touch theirs) until under max_bytes."""
+    entries = []
+    for p in cache_dir.glob("*/*.json"):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, p))
+    total = sum(size for _, size, _ in entries)
+    for _, size, p in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        p.unlink(missing_ok=True)
+        total -= size
+
+
+def _ollama_model_digest(ollama_url: str, model: str) -> Optional[str]:
+    """Digest of the model tag on this Ollama server (changes on `ollama pull`); None if unknown."""
+    name = model if ":" in model else model + ":latest"
+    try:
+        r = _OLLAMA_SESSION.get(ollama_url.rstrip("/") + "/api/tags",
+                                timeout=(OLLAMA_CONNECT_TIMEOUT_SEC, 30))
+        r.raise_for_status()
+        models = r.json().get("models") or []
+    except (requests.RequestException, ValueError, AttributeError):
+        return None
+    for m in models:
+        if name in (m.get("name"), m.get("model")):
+            return m.get("digest")
+    return None
+
+
+def _cached_ollama_generate(
+    cache_dir: Optional[Path],
+    ollama_url: str,
+    model: str,
+    prompt: str,
+    temperature: float = 0.0,
+    max_tokens: int = 800,
+    timeout: int = 600,
+) -> str:
+    """_ollama_generate behind an on-disk cache.
+
+    Keyed by sha256(ollama_url, model digest, model, temperature, max_tokens, prompt): a rerun over
+    the same evidence and question reuses the stored response, while a re-pulled model tag or
+    another server misses. Only completed generations are stored (_ollama_generate raises on a
+    truncated stream). Without --llm-cache-dir, or when the model digest cannot be read, every
+    call generates. Cache write failures are logged and do not fail the run.
+    """
+    def generate() -> str:
+        return _ollama_generate(ollama_url=ollama_url, model=model, prompt=prompt,
+                                temperature=temperature, max_tokens=max_tokens, timeout=timeout)
+
+    if cache_dir is None:
+        return generate()
+    digest = _ollama_model_digest(ollama_url, model)
+    if not digest:
+        _dprint(f"[DEBUG] LLM cache bypassed: no digest for model {model!r} at {ollama_url}")
+        return generate()
+    key = hashlib.sha256(
+        f"{ollama_url.rstrip('/')}|{digest}|{model}|{float(temperature)}|{int(max_tokens)}|{prompt}"
+        .encode("utf-8")
+    ).hexdigest()
+    path = cache_dir / key[:2] / f"{key}.json"
+    try:
+        response = orjson.loads(path.read_bytes())["response"]
+        os.utime(path)
+        _dprint(f"[DEBUG] LLM cache hit: {path}")
+        return response
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    response = generate()
+    try:
+        atomic_write_json(path, {
+            "model": model,
+            "model_digest": digest,
+            "temperature": float(temperature),
+            "max_tokens": int(max_tokens),
+            "response": response,
+        })
+        _evict_llm_cache(cache_dir, LLM_CACHE_MAX_BYTES)
+    except OSError as e:
+        _dprint(f"[DEBUG] LLM cache write skipped: {e}")
+    return response
 
 def _evidence_only_prompt(question: str, evidence_block: str) -> str:
     return f"""You are MortgageDocAI.
@@ -319,15 +447,18 @@ _UW_DEDUPE_BOILERPLATE = [
 ]
 
 
+_DEDUPE_PUNCT_RE = re.compile(r"[^\w\s]")
+# One anchored alternation; alternatives are tried in list order, like the startswith() scan was.
+_DEDUPE_BOILERPLATE_RE = re.compile(
+    r"^(?:" + "|".join(re.escape(v) for v in _UW_DEDUPE_BOILERPLATE) + r") "
+)
+
+
+@functools.lru_cache(maxsize=4096)
 def _make_dedupe_key(description: str) -> str:
-    """Normalise a condition description to a stable deduplication key."""
-    key = description.lower()
-    key = re.sub(r"[^\w\s]", " ", key)       # punctuation -> space
-    key = re.sub(r"\s+", " ", key).strip()    # collapse whitespace
-    for verb in _UW_DEDUPE_BOILERPLATE:
-        if key.startswith(verb + " "):
-            key = key[len(verb) + 1:]
-            break
+    """Normalise a condition description to a stable deduplication key (memoized per description)."""
+    key = " ".join(_DEDUPE_PUNCT_RE.sub(" ", description.lower()).split())  # punctuation -> space, collapse
+    key = _DEDUPE_BOILERPLATE_RE.sub("", key, count=1)
     key = key.rstrip(".")                     # trailing period safety net
     return key.strip()
 
@@ -342,6 +473,38 @@ def _token_jaccard(a: str, b: str) -> float:
     return len(set_a & set_b) / len(union)
 
 
+def _similar_condition_pairs(keys: List[str]) -> Iterator[Tuple[int, int]]:
+    """Yield index pairs (i < j) whose dedupe keys are identical or have _token_jaccard >= 0.92.
+
+    Same merges as comparing every pair, but token sets are built once per key and only pairs
+    sharing a token (found via an inverted index) are compared: Jaccard > 0 needs a common token.
+    Empty keys have no tokens and are paired by identity alone.
+    """
+    tok_sets = [frozenset(k.split()) for k in keys]
+    postings: Dict[str, List[int]] = {}
+    for i, toks in enumerate(tok_sets):
+        for t in toks:
+            postings.setdefault(t, []).append(i)
+    for i, a in enumerate(tok_sets):
+        for j in sorted({j for t in a for j in postings[t] if j > i}):
+            b = tok_sets[j]
+            if keys[i] == keys[j] or len(a & b) / len(a | b) >= 0.92:
+                yield i, j
+    empty = [i for i, k in enumerate(keys) if not k]
+    for j in empty[1:]:
+        yield empty[0], j
+
+
+def _first_majority(values: Iterable[str]) -> str:
+    """Most frequent value; ties go to the value encountered first.
+
+    Counter keeps first-insertion order and max() returns the first maximal key, so one counting
+    pass replaces the separate order list + max + next() scans.
+    """
+    counts = Counter(values)
+    return max(counts, key=counts.__getitem__)
+
+
 def _dedup_conditions(conditions: List[Dict]) -> "tuple[List[Dict], Dict]":
     """Deduplicate uw_conditions deterministically via Union-Find + token Jaccard.
 
@@ -372,12 +535,8 @@ def _dedup_conditions(conditions: List[Dict]) -> "tuple[List[Dict], Dict]":
 
     keys = [_make_dedupe_key(c.get("description", "")) for c in conditions]
 
-    for i in range(n):
-        for j in range(i + 1, n):
-            if _find(i) == _find(j):
-                continue
-            if keys[i] == keys[j] or _token_jaccard(keys[i], keys[j]) >= 0.92:
-                _union(i, j)
+    for i, j in _similar_condition_pairs(keys):
+        _union(i, j)
 
     groups: Dict[int, List[int]] = {}
     for i in range(n):
@@ -396,8 +555,7 @@ def _dedup_conditions(conditions: List[Dict]) -> "tuple[List[Dict], Dict]":
         # Winner: longest description after boilerplate strip; first-index tie-break
         winner_idx = members[0]
         for idx in members[1:]:
-            if len(_make_dedupe_key(conditions[idx].get("description", ""))) > \
-               len(_make_dedupe_key(conditions[winner_idx].get("description", ""))):
+            if len(keys[idx]) > len(keys[winner_idx]):
                 winner_idx = idx
         winner = conditions[winner_idx]
 
@@ -416,26 +574,10 @@ def _dedup_conditions(conditions: List[Dict]) -> "tuple[List[Dict], Dict]":
         citations_out = [{"chunk_id": cid, "quote": q} for cid, q in merged_cits.items()]
 
         # Category: most frequent; first-encountered tie-break
-        cat_order: List[str] = []
-        cat_counter: Counter = Counter()
-        for idx in members:
-            cat = conditions[idx].get("category", "Other")
-            cat_counter[cat] += 1
-            if cat not in cat_order:
-                cat_order.append(cat)
-        best = max(cat_counter.values())
-        category = next(c for c in cat_order if cat_counter[c] == best)
+        category = _first_majority(conditions[idx].get("category", "Other") for idx in members)
 
         # Timing: most frequent; first-encountered tie-break
-        tim_order: List[str] = []
-        tim_counter: Counter = Counter()
-        for idx in members:
-            tim = conditions[idx].get("timing", "Unknown")
-            tim_counter[tim] += 1
-            if tim not in tim_order:
-                tim_order.append(tim)
-        best_t = max(tim_counter.values())
-        timing = next(t for t in tim_order if tim_counter[t] == best_t)
+        timing = _first_majority(conditions[idx].get("timing", "Unknown") for idx in members)
 
         merged.append({
             "description": winner.get("description", ""),
@@ -515,12 +657,8 @@ def _postprocess_conditions(
 
     keys = [_make_dedupe_key(c.get("description", "")) for c in conditions]
 
-    for i in range(n):
-        for j in range(i + 1, n):
-            if _find(i) == _find(j):
-                continue
-            if keys[i] == keys[j] or _token_jaccard(keys[i], keys[j]) >= 0.92:
-                _union(i, j)
+    for i, j in _similar_condition_pairs(keys):
+        _union(i, j)
 
     groups: Dict[int, List[int]] = {}
     for i in range(n):
@@ -557,26 +695,10 @@ def _postprocess_conditions(
         citations_out = [{"chunk_id": cid, "quote": q} for cid, q in merged_cits.items()]
 
         # Category: majority vote; first-encountered tie-break
-        cat_order: List[str] = []
-        cat_counter: Counter = Counter()
-        for idx in members:
-            cat = conditions[idx].get("category", "Other")
-            cat_counter[cat] += 1
-            if cat not in cat_order:
-                cat_order.append(cat)
-        best_cat = max(cat_counter.values())
-        category = next(c for c in cat_order if cat_counter[c] == best_cat)
+        category = _first_majority(conditions[idx].get("category", "Other") for idx in members)
 
         # Timing: majority vote; first-encountered tie-break
-        tim_order: List[str] = []
-        tim_counter: Counter = Counter()
-        for idx in members:
-            tim = conditions[idx].get("timing", "Unknown")
-            tim_counter[tim] += 1
-            if tim not in tim_order:
-                tim_order.append(tim)
-        best_tim = max(tim_counter.values())
-        timing = next(t for t in tim_order if tim_counter[t] == best_tim)
+        timing = _first_majority(conditions[idx].get("timing", "Unknown") for idx in members)
 
         # source.documents: union by (document_id, file_relpath, page_start, page_end);
         # stable ordering by first appearance across members.
@@ -914,6 +1036,10 @@ def _extract_monthly_liabilities_total_from_retrieval_pack(
 
         file_relpath = (ch.get("payload") or {}).get("file_relpath", "")
         text_lower = text.lower()
+        # Every liability label contains "total" and its amount follows a "$": chunks without
+        # both cannot match, so skip their regex scans.
+        if "total" not in text_lower or "$" not in text:
+            continue
         file_lower = file_relpath.lower()
 
         # Credit-related heuristic
@@ -1113,6 +1239,11 @@ def _extract_proposed_pitia_from_retrieval_pack(
         text = (ch.get("text") or "").strip()
         if not text:
             continue
+        text_lower = text.lower()
+        # Candidates come only from the PITI ("PITI" / "... Insurance") and "Estimated Total
+        # Monthly Payment" labels: skip the P&I, loan-ID and pattern scans for chunks without them.
+        if "piti" not in text_lower and "insurance" not in text_lower and "estimated" not in text_lower:
+            continue
 
         # Detect P&I amounts in this chunk for deprioritization
         pi_amounts: set = set()
@@ -1127,7 +1258,6 @@ def _extract_proposed_pitia_from_retrieval_pack(
         relpath_score, relpath_doc_type = _score_doc_type_from_relpath(file_relpath)
 
         # --- Text-based scoring (secondary signal) ---
-        text_lower = text.lower()
         text_score = 0
         text_doc_type = "other"
         if "closing disclosure" in text_lower:
@@ -1368,7 +1498,9 @@ def _extract_monthly_income_total_from_retrieval_pack(
         doc_score, doc_source = _score_income_source(text_lower, file_relpath)
 
         # --- Stage A: AUS / 1003 monthly income patterns ---
-        for pat_name, pat, pat_bonus in _STAGE_A_PATTERNS:
+        # All Stage A labels contain "income" and take a "$" amount; skip the scans otherwise.
+        stage_a = _STAGE_A_PATTERNS if "income" in text_lower and "$" in text else ()
+        for pat_name, pat, pat_bonus in stage_a:
             for m in pat.finditer(text):
                 amt_str = m.group("amount")
                 try:
@@ -2004,6 +2136,7 @@ def _resolve_uw_decision_inputs(
     dti_path = base / "dti.json"
 
     if ia_path.exists() and dti_path.exists():
+        # stdlib json: these are atomic_write_json outputs, which may carry NaN/Infinity.
         income_analysis = json.loads(ia_path.read_text(encoding="utf-8"))
         dti = json.loads(dti_path.read_text(encoding="utf-8"))
         _dprint(f"[DEBUG] uw_decision: loaded inputs from {base}")
@@ -2766,7 +2899,10 @@ def parse_args(argv=None) -> argparse.Namespace:
     ap.add_argument("--llm-max-tokens", type=int, default=800)
     ap.add_argument("--evidence-max-chars", type=int, default=12000)
     ap.add_argument("--ollama-timeout", type=int, default=600,
-                    help="Timeout in seconds for Ollama HTTP request (default: 600)")
+                    help="Timeout in seconds for the whole Ollama generation (default: 600)")
+    ap.add_argument("--llm-cache-dir", type=Path, default=None,
+                    help="Reuse LLM responses for identical (model, temperature, max tokens, prompt) "
+                         "from this directory (default: off, always generate)")
     ap.add_argument("--debug", action="store_true", default=False,
                     help="Enable diagnostic debug output")
     ap.add_argument("--save-llm-raw", action="store_true", default=False,
@@ -2826,7 +2962,7 @@ def main(argv=None) -> None:
                                 f"{existing_prof.name}")
         existing_meta = final / "_meta" / "analysis_run.json"
         if existing_meta.exists():
-            _prev_run_meta = json.loads(existing_meta.read_text(encoding="utf-8"))
+            _prev_run_meta = orjson.loads(existing_meta.read_bytes())
         shutil.rmtree(final)
 
     run_meta: List[Dict[str, Any]] = []
@@ -2856,7 +2992,8 @@ def main(argv=None) -> None:
         retrieved: List[Dict[str, Any]] = []
         pack: Dict[str, Any] = {}
         if rp_path and rp_path.exists():
-            pack = json.loads(rp_path.read_text(encoding="utf-8"))
+            # orjson parses the multi-MB pack straight from bytes (no decoded str copy).
+            pack = orjson.loads(rp_path.read_bytes())
             retrieved = pack.get("retrieved_chunks", []) or []
 
         evidence_block = _build_evidence_block(retrieved, max_chars_total=args.evidence_max_chars)
@@ -2987,7 +3124,8 @@ def main(argv=None) -> None:
                 prompt = _income_analysis_prompt(question, evidence_block)
             else:
                 prompt = _evidence_only_prompt(question, evidence_block)
-            llm_raw = _ollama_generate(
+            llm_raw = _cached_ollama_generate(
+                args.llm_cache_dir,
                 ollama_url=args.ollama_url,
                 model=args.llm_model,
                 prompt=prompt,
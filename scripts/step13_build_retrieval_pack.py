@@ -22,7 +22,7 @@ from typing import Any, Dict, List, Optional, Tuple
 from qdrant_client import QdrantClient
 from qdrant_client.http.models import Filter, FieldCondition, MatchValue, SearchParams
 
-# NOTE: sentence_transformers and torch are imported inside main() so that
+# NOTE: sentence_transformers and torch are imported inside _load_embedding_model() so that
 # offline env vars (TRANSFORMERS_OFFLINE, HF_HUB_OFFLINE, HF_DATASETS_OFFLINE)
 # are set BEFORE any HF/transformers code initializes.
 
@@ -37,6 +37,7 @@ from lib import (
     ensure_dir,
 
 )
+from _embedder_service import embed_via_service
 
 _DEBUG = False  # set by main() from --debug flag
 
@@ -45,6 +46,40 @@ def _dprint(msg: str) -> None:
     if _DEBUG:
         print(msg)
 
+def _load_embedding_model(model_name: str, device: Optional[str], offline: bool):
+    """Load the SentenceTransformer; return (model, device). Also used by _embedder_service."""
+    # --- Offline env vars MUST be set before importing sentence_transformers / torch ---
+    if offline:
+        os.environ["TRANSFORMERS_OFFLINE"] = "1"
+        os.environ["HF_HUB_OFFLINE"] = "1"
+        os.environ["HF_DATASETS_OFFLINE"] = "1"
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+
+    if offline:
+        # Resolve model to a local cache path; fail immediately if not cached.
+        try:
+            from huggingface_hub import snapshot_download
+            local_path = snapshot_download(model_name, local_files_only=True)
+        except Exception as exc:
+            raise ContractError(
+                f"Embedding model not found in local cache while offline mode is enabled. "
+                f"Pre-cache {model_name} first."
+            ) from exc
+        try:
+            model = SentenceTransformer(local_path, device=device)
+        except Exception as exc:
+            raise ContractError(
+                f"Embedding model not found in local cache while offline mode is enabled. "
+                f"Pre-cache {model_name} first."
+            ) from exc
+    else:
+        model = SentenceTransformer(model_name, device=device)
+    return model, device
+
 def parse_args(argv=None) -> argparse.Namespace:
     ap = argparse.ArgumentParser(description="Step 13 — Build retrieval pack (v1)")
     ap.add_argument("--tenant-id", default=DEFAULT_TENANT)
@@ -236,38 +271,16 @@ def main(argv=None) -> None:
     run_dir = NAS_CHUNK / "tenants" / tenant_id / "loans" / loan_id / run_id
     chunk_index = _load_chunk_text_index(run_dir, strict=args.strict)
 
-    # --- Offline env vars MUST be set before importing sentence_transformers / torch ---
-    if args.offline_embeddings:
-        os.environ["TRANSFORMERS_OFFLINE"] = "1"
-        os.environ["HF_HUB_OFFLINE"] = "1"
-        os.environ["HF_DATASETS_OFFLINE"] = "1"
-
-    import torch
-    from sentence_transformers import SentenceTransformer
-
-    device = args.embedding_device or ("cuda" if torch.cuda.is_available() else "cpu")
-
-    if args.offline_embeddings:
-        # Resolve model to a local cache path; fail immediately if not cached.
-        try:
-            from huggingface_hub import snapshot_download
-            local_path = snapshot_download(args.embedding_model, local_files_only=True)
-        except Exception as exc:
-            raise ContractError(
-                f"Embedding model not found in local cache while offline mode is enabled. "
-                f"Pre-cache {args.embedding_model} first."
-            ) from exc
-        try:
-            model = SentenceTransformer(local_path, device=device)
-        except Exception as exc:
-            raise ContractError(
-                f"Embedding model not found in local cache while offline mode is enabled. "
-                f"Pre-cache {args.embedding_model} first."
-            ) from exc
-    else:
-        model = SentenceTransformer(args.embedding_model, device=device)
     qtext = "query: " + normalize_chunk_text(args.query)
-    qvec = model.encode([qtext], normalize_embeddings=True, convert_to_numpy=True, show_progress_bar=False)[0].tolist()
+    # run_loan_job shares one warm model across its Step13 calls; fall back to a local load.
+    # The service picks its own device, so an explicit --embedding-device always loads locally.
+    served = None if args.embedding_device else embed_via_service([qtext], args.embedding_model)
+    if served is not None:
+        vectors, device = served
+        qvec = vectors[0]
+    else:
+        model, device = _load_embedding_model(args.embedding_model, args.embedding_device, args.offline_embeddings)
+        qvec = model.encode([qtext], normalize_embeddings=True, convert_to_numpy=True, show_progress_bar=False)[0].tolist()
 
     qdrant = QdrantClient(url=args.qdrant_url)
     flt = Filter(must=[
@@ -446,6 +459,8 @@ def main(argv=None) -> None:
         "retrieved_chunks": items,
     }
     atomic_write_json(out_root / "retrieval_pack.json", pack)
+    # Sidecar so run_loan_job's --max-dropped-chunks gate need not parse the whole pack.
+    atomic_write_json(out_root / "retrieval_pack.meta.json", retrieval_pack_meta)
     print(f"✓ Step13 wrote retrieval pack: {out_root / 'retrieval_pack.json'}")
 
 if __name__ == "__main__":
@@ -221,6 +221,29 @@ def test_load_all_rebuilds_missing_index():
     assert entry == ("t1", "L1"), f"expected ('t1','L1'), got {entry}"
     print("test_load_all_rebuilds_missing_index OK")
 
+def test_load_all_accepts_job_file_without_tenant_or_loan():
+    """A legacy job file missing tenant_id/loan_id loads instead of failing startup."""
+    import json as _json, uuid as _uuid
+    from loan_service.adapters_disk import DiskJobStore, JobKeyIndexImpl, LoanLockImpl
+    from loan_service.service import JobService
+    nas = _tmp_nas()
+    job_dir = nas / "tenants" / "t1" / "loans" / "L1" / "_meta" / "jobs"
+    job_dir.mkdir(parents=True)
+    job_id = str(_uuid.uuid4())
+    (job_dir / f"{job_id}.json").write_text(_json.dumps({"job_id": job_id, "status": "FAIL"}))
+    svc = JobService(
+        store=DiskJobStore(lambda: nas),
+        key_index=JobKeyIndexImpl(),
+        loan_lock=LoanLockImpl(lambda: nas),
+        runner=None,
+        get_base_path=lambda: nas,
+    )
+    svc.load_all_from_disk()
+    rec = svc._jobs[job_id]
+    assert (rec.tenant_id, rec.loan_id, rec.status) == ("", "", "FAIL")
+    assert rec.to_dict()["run_id"] is None
+    print("test_load_all_accepts_job_file_without_tenant_or_loan OK")
+
 def test_enqueue_writes_index():
     """enqueue_job() creates a disk index entry so get_job can find the file path."""
     from loan_service.adapters_disk import DiskJobStore, JobKeyIndexImpl, LoanLockImpl
@@ -238,6 +261,79 @@ def test_enqueue_writes_index():
     assert entry == ("t1", "L1"), f"expected ('t1','L1'), got {entry}"
     print("test_enqueue_writes_index OK")
 
+def test_enqueue_replays_finished_run_with_single_save():
+    """enqueue_job() on a run with a SUCCESS manifest records SUCCESS with one store write."""
+    import json as _json
+    from loan_service.adapters_disk import DiskJobStore, JobKeyIndexImpl, LoanLockImpl
+    from loan_service.service import JobService
+    nas = _tmp_nas()
+    run_dir = nas / "tenants" / "t1" / "loans" / "L1" / "run-done"
+    run_dir.mkdir(parents=True)
+    (run_dir / "job_manifest.json").write_text(_json.dumps({"status": "SUCCESS", "retrieval_pack_sha256": "abc"}))
+    store = DiskJobStore(lambda: nas)
+    svc = JobService(
+        store=store, key_index=JobKeyIndexImpl(),
+        loan_lock=LoanLockImpl(lambda: nas), runner=None, get_base_path=lambda: nas,
+    )
+    saves = []
+    real_save = store.save
+    with patch.object(store, "save", side_effect=lambda j: (saves.append(dict(j)), real_save(j))):
+        result = svc.enqueue_job("t1", "L1", {"run_id": "run-done", "skip_intake": True})
+    assert result["status"] == "SUCCESS"
+    assert len(saves) == 1, f"expected one save, got {len(saves)}"
+    job = svc.get_job(result["job_id"])
+    assert job["status"] == "SUCCESS"
+    assert job["result"]["rp_sha256"] == "abc"
+    assert job["stdout"].startswith("PHASE:DONE ")
+    assert job["created_at_utc"] == job["finished_at_utc"]
+    # In memory the job is a slotted JobRecord; the store only ever sees plain dicts.
+    assert not hasattr(svc.get_jobs_mutable()[result["job_id"]], "__dict__")
+    assert isinstance(saves[0], dict) and saves[0]["job_key"]
+    print("test_enqueue_replays_finished_run_with_single_save OK")
+
+def test_store_save_progress_coalesces_and_save_supersedes():
+    """save_progress() bursts become one write; a later save() wins over a queued snapshot."""
+    import json as _json
+    from loan_service.adapters_disk import DiskJobStore
+    nas = _tmp_nas()
+    store = DiskJobStore(lambda: nas)
+    writes = []
+    real_write = store._write_job
+    store._write_job = lambda j: (writes.append(j.get("stdout")), real_write(j))
+    job = {"job_id": "j1", "tenant_id": "t1", "loan_id": "L1", "status": "RUNNING", "stdout": ""}
+    for i in range(20):
+        job["stdout"] += f"PHASE:STEP{i} x\n"
+        store.save_progress(job)
+    path = nas / "tenants" / "t1" / "loans" / "L1" / "_meta" / "jobs" / "j1.json"
+    deadline = time.time() + 2
+    while not path.exists() and time.time() < deadline:
+        time.sleep(0.01)
+    store._flush()
+    assert _json.loads(path.read_text())["stdout"].endswith("PHASE:STEP19 x\n")
+    assert len(writes) < 20, f"expected coalesced writes, got {len(writes)}"
+    store._write_job = real_write
+    job["stdout"] += "PHASE:STEP20 x\n"
+    store.save_progress(job)
+    job["status"] = "SUCCESS"
+    store.save(job)
+    time.sleep(0.1)
+    assert _json.loads(path.read_text())["status"] == "SUCCESS"
+    print("test_store_save_progress_coalesces_and_save_supersedes OK")
+
+def test_capped_text_matches_repeated_truncate():
+    """_CappedText renders the same as the old per-line _truncate(current + line, cap)."""
+    from loan_service.adapters_disk import _truncate
+    from loan_service.adapters_disk import _CappedText
+    for initial in ("", "PHASE:START x\n", "z" * 40):
+        cur = initial
+        buf = _CappedText(initial, 32)
+        for i in range(12):
+            line = f"line {i}\n"
+            cur = _truncate(cur + line, 32)
+            buf.append(line)
+            assert buf.render() == cur
+    print("test_capped_text_matches_repeated_truncate OK")
+
 def test_get_job_reads_live_disk_state():
     """get_job returns current disk state even if in-memory cache has stale PENDING."""
     import json as _json
@@ -298,6 +394,68 @@ def test_list_jobs_reads_live_disk_state():
     assert "job_key" not in matched[0], "job_key must be filtered out"
     print("test_list_jobs_reads_live_disk_state OK")
 
+def test_utc_now_z_format():
+    """_utc_now_z / utc_z_from_ns: fixed-width ISO8601 with microseconds and Z, parseable."""
+    import re
+    from datetime import datetime, timezone
+    from loan_service.domain import _utc_now_z, utc_z_from_ns
+    ns = 1_700_000_000_123_456_789
+    assert utc_z_from_ns(ns) == "2023-11-14T22:13:20.123456Z"
+    assert utc_z_from_ns(1_700_000_000_000_000_000) == "2023-11-14T22:13:20.000000Z"
+    a, b = _utc_now_z(), _utc_now_z()
+    for s in (a, b):
+        assert re.fullmatch(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}Z", s), s
+    assert a <= b
+    parsed = datetime.fromisoformat(a.replace("Z", "+00:00"))
+    assert abs((datetime.now(timezone.utc) - parsed).total_seconds()) < 5
+    print("test_utc_now_z_format OK")
+
+def test_load_manifest_cached_until_rewritten():
+    """load_manifest_if_present() reuses the parsed manifest until its mtime/size changes."""
+    import json as _json
+    import os as _os
+    from loan_service.adapters_disk import load_manifest_if_present
+    nas = _tmp_nas()
+    mp = nas / "tenants" / "t1" / "loans" / "L1" / "run-m" / "job_manifest.json"
+    assert load_manifest_if_present(lambda: nas, "t1", "L1", "run-m") is None
+    mp.parent.mkdir(parents=True)
+    mp.write_text(_json.dumps({"status": "FAIL"}))
+    first = load_manifest_if_present(lambda: nas, "t1", "L1", "run-m")
+    assert first == {"status": "FAIL"}
+    assert load_manifest_if_present(lambda: nas, "t1", "L1", "run-m") is first
+    mp.write_text(_json.dumps({"status": "SUCCESS"}))
+    st = mp.stat()
+    _os.utime(mp, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert load_manifest_if_present(lambda: nas, "t1", "L1", "run-m") == {"status": "SUCCESS"}
+    print("test_load_manifest_cached_until_rewritten OK")
+
+
+def test_finalize_uses_manifest_summary_from_stdout():
+    """_finalize_job() takes status/rp hash from the MANIFEST: stdout line without reading the file."""
+    from loan_service.adapters_disk import DiskJobStore, JobKeyIndexImpl, LoanLockImpl
+    from loan_service.service import JobService
+    nas = _tmp_nas()
+    (nas / "tenants" / "t1" / "loans" / "L1" / "_meta" / "jobs").mkdir(parents=True)
+    svc = JobService(
+        store=DiskJobStore(lambda: nas), key_index=JobKeyIndexImpl(),
+        loan_lock=LoanLockImpl(lambda: nas), runner=None, get_base_path=lambda: nas,
+    )
+    job_id = svc.enqueue_job("t1", "L1", {"run_id": "run-s", "skip_intake": True})["job_id"]
+    stdout = (
+        "run_id = run-s\n"
+        'MANIFEST:{"retrieval_pack_sha256": "abc", "run_id": "run-s", "status": "SUCCESS"}\n'
+        "PHASE:DONE 2026-01-01T00:00:00Z\n"
+    )
+    with patch("loan_service.service.load_manifest_if_present") as disk_read:
+        svc._finalize_job(job_id, 0, stdout, "")
+    disk_read.assert_not_called()
+    job = svc.get_job(job_id)
+    assert job["status"] == "SUCCESS"
+    assert job["result"]["rp_sha256"] == "abc"
+    assert job["result"]["manifest_path"].endswith("run-s/job_manifest.json")
+    print("test_finalize_uses_manifest_summary_from_stdout OK")
+
+
 if __name__ == "__main__":
     test_idempotency_same_job_id()
     test_restart_recovery_running_becomes_fail()
@@ -306,7 +464,14 @@ if __name__ == "__main__":
     test_disk_index_roundtrip()
     test_scan_all_raw_no_recovery()
     test_load_all_rebuilds_missing_index()
+    test_load_all_accepts_job_file_without_tenant_or_loan()
     test_enqueue_writes_index()
+    test_enqueue_replays_finished_run_with_single_save()
+    test_store_save_progress_coalesces_and_save_supersedes()
+    test_capped_text_matches_repeated_truncate()
     test_get_job_reads_live_disk_state()
     test_list_jobs_reads_live_disk_state()
+    test_utc_now_z_format()
+    test_load_manifest_cached_until_rewritten()
+    test_finalize_uses_manifest_summary_from_stdout()
     print("All hardening tests passed.")
@@ -0,0 +1,230 @@
+"""Tests for loan_api run endpoints: artifact/manifest downloads and synchronous query."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import loan_api as _api
+from loan_service import nas_io as _nas
+
+TENANT = "peak"
+LOAN = "16271681"
+RUN = "2026-03-06T120000Z"
+
+
+def _write_json(path: Path, obj: object) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(obj))
+
+
+@pytest.fixture
+def nas(tmp_path, monkeypatch):
+    base = tmp_path / "nas_analyze"
+    loan_dir = base / "tenants" / TENANT / "loans" / LOAN
+    _write_json(loan_dir / RUN / "job_manifest.json", {"status": "SUCCESS", "run_id": RUN})
+    _write_json(loan_dir / "retrieve" / RUN / "retrieval_pack.json", {"retrieved_chunks": []})
+    _write_json(loan_dir / RUN / "outputs" / "profiles" / "default" / "answer.json", {"answer": "ok"})
+    monkeypatch.setattr(_api, "NAS_ANALYZE", base)
+    return base
+
+
+@pytest.fixture
+def client():
+    return TestClient(_api.app)
+
+
+def _url(suffix: str) -> str:
+    return f"/tenants/{TENANT}/loans/{LOAN}/runs/{RUN}{suffix}"
+
+
+def test_downloads_stream_file_without_accel_prefix(nas, client, monkeypatch):
+    monkeypatch.setattr(_api, "_ACCEL_REDIRECT_PREFIX", "")
+    r = client.get(_url("/retrieval_pack"))
+    assert r.status_code == 200
+    assert "x-accel-redirect" not in r.headers
+    assert r.json() == {"retrieved_chunks": []}
+
+
+def test_downloads_use_accel_redirect_when_configured(nas, client, monkeypatch):
+    monkeypatch.setattr(_api, "_ACCEL_REDIRECT_PREFIX", "/_nas_analyze")
+    cases = {
+        "/retrieval_pack": f"/_nas_analyze/tenants/{TENANT}/loans/{LOAN}/retrieve/{RUN}/retrieval_pack.json",
+        "/job_manifest": f"/_nas_analyze/tenants/{TENANT}/loans/{LOAN}/{RUN}/job_manifest.json",
+        "/artifacts/default/answer.json": (
+            f"/_nas_analyze/tenants/{TENANT}/loans/{LOAN}/{RUN}/outputs/profiles/default/answer.json"
+        ),
+    }
+    for suffix, expected in cases.items():
+        r = client.get(_url(suffix))
+        assert r.status_code == 200, suffix
+        assert r.headers["x-accel-redirect"] == expected
+        assert r.headers["content-type"].startswith("application/json")
+        assert "inline; filename=" in r.headers["content-disposition"]
+        assert r.content == b""
+
+
+def test_accel_redirect_path_is_url_quoted(nas, monkeypatch):
+    monkeypatch.setattr(_api, "_ACCEL_REDIRECT_PREFIX", "/_nas_analyze")
+    p = nas / "tenants" / TENANT / "loans" / "Loan 1" / "x.json"
+    _write_json(p, {})
+    resp = _api._nas_analyze_file_response(p, "application/json", {})
+    assert resp.headers["x-accel-redirect"] == f"/_nas_analyze/tenants/{TENANT}/loans/Loan%201/x.json"
+
+
+def test_query_run_reports_bounded_stderr_tail(nas, client, monkeypatch, tmp_path):
+    """Failing Step13 surfaces only the last QUERY_STDERR_TAIL_BYTES of stderr."""
+    scripts = tmp_path / "fake_scripts"
+    scripts.mkdir()
+    (scripts / "step13_build_retrieval_pack.py").write_text(
+        "import sys\nsys.stderr.write('x' * 10000 + 'TAIL')\nsys.exit(3)\n"
+    )
+    monkeypatch.setattr(_api, "SCRIPTS_DIR", scripts)
+    monkeypatch.setattr(_api, "REPO_ROOT", tmp_path)
+    r = client.post(_url("/query"), json={"question": "q", "profile": "default"})
+    assert r.status_code == 500
+    detail = r.json()["detail"]
+    assert detail.startswith("Step13 failed (exit 3). stderr tail: ")
+    tail = detail.split("stderr tail: ", 1)[1]
+    assert tail.endswith("TAIL")
+    assert len(tail) == _nas.QUERY_STDERR_TAIL_BYTES
+
+
+def test_query_run_returns_answer_json(nas, client, monkeypatch, tmp_path):
+    scripts = tmp_path / "fake_scripts"
+    scripts.mkdir()
+    (scripts / "step13_build_retrieval_pack.py").write_text("print('ok')\n")
+    (scripts / "step12_analyze.py").write_text("import sys\nsys.stderr.write('progress')\n")
+    monkeypatch.setattr(_api, "SCRIPTS_DIR", scripts)
+    monkeypatch.setattr(_api, "REPO_ROOT", tmp_path)
+    r = client.post(_url("/query"), json={"question": "q", "profile": "default"})
+    assert r.status_code == 200
+    assert r.json() == {"answer": "ok"}
+
+
+def test_artifacts_index_scans_profiles_in_name_order(nas, client):
+    profiles = nas / "tenants" / TENANT / "loans" / LOAN / RUN / "outputs" / "profiles"
+    for name in ("uw_decision", "income_analysis", "uw_conditions"):
+        _write_json(profiles / name / "version.json", {})
+    r = client.get(_url("/artifacts"))
+    assert r.status_code == 200
+    idx = r.json()
+    assert [p["name"] for p in idx["profiles"]] == [
+        "default", "income_analysis", "uw_conditions", "uw_decision",
+    ]
+    default_files = {f["name"]: f for f in idx["profiles"][0]["files"]}
+    assert default_files["answer.json"]["exists"] is True
+    assert default_files["answer.json"]["size_bytes"] > 0
+    assert default_files["answer.md"]["exists"] is False
+    assert default_files["answer.md"]["mtime_utc"] is None
+    assert idx["job_manifest"]["status"] == "SUCCESS"
+    run_real = os.path.realpath(nas / "tenants" / TENANT / "loans" / LOAN / RUN)
+    assert idx["base_dir"] == run_real
+    assert idx["job_manifest"]["path"] == os.path.join(run_real, "job_manifest.json")
+    assert default_files["answer.json"]["path"] == os.path.join(
+        run_real, "outputs", "profiles", "default", "answer.json"
+    )
+    assert idx["retrieval_pack"]["path"] == os.path.realpath(
+        nas / "tenants" / TENANT / "loans" / LOAN / "retrieve" / RUN / "retrieval_pack.json"
+    )
+
+
+def test_list_runs_and_run_status(nas, client):
+    (nas / "tenants" / TENANT / "loans" / LOAN / "not-a-run").mkdir()
+    r = client.get(f"/tenants/{TENANT}/loans/{LOAN}/runs")
+    assert r.status_code == 200
+    assert r.json() == {"run_ids": [RUN]}
+    assert client.get(_url("")).json() == {"status": "SUCCESS", "run_id": RUN}
+    assert client.get(f"/tenants/{TENANT}/loans/missing/runs").status_code == 404
+
+
+def test_profile_artifact_rejects_unknown_or_missing(nas, client):
+    assert client.get(_url("/artifacts/default/secrets.txt")).status_code == 404
+    assert client.get(_url("/artifacts/default/answer.md")).status_code == 404
+    assert client.get(_url("/artifacts/nope/answer.json")).status_code == 404
+
+
+@pytest.mark.parametrize("name,expected", [
+    ("16271681", True), ("loan-a_1", True), ("-1", True), ("__x", True),
+    ("", False), (".hidden", False), ("___", False), ("a b", False), ("a.b", False),
+])
+def test_is_loan_dir(name, expected):
+    assert _api._is_loan_dir(name) is expected
+
+
+@pytest.mark.parametrize("name,expected", [
+    ("answer.json", True), ("uw_conditions", True), (".x", True),
+    ("", False), ("..", False), ("a..b", False), ("a/b", False), ("a\\b", False),
+])
+def test_safe_single_component(name, expected):
+    assert _api._safe_single_component(name) is expected
+
+
+def test_sha256_file_matches_hashlib_across_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(_api, "SHA256_READ_CHUNK", 4096)
+    p = tmp_path / "blob.bin"
+    data = bytes(range(256)) * 100 + b"tail"
+    p.write_bytes(data)
+    assert _api._sha256_file(str(p)) == hashlib.sha256(data).hexdigest()
+    (tmp_path / "empty").write_bytes(b"")
+    assert _api._sha256_file(str(tmp_path / "empty")) == hashlib.sha256(b"").hexdigest()
+
+
+def test_manifest_cache_shared_and_invalidated_on_change(nas, client, monkeypatch):
+    monkeypatch.setattr(_api, "_manifest_cache", _api.OrderedDict())
+    manifest = nas / "tenants" / TENANT / "loans" / LOAN / RUN / "job_manifest.json"
+    first = _api._load_manifest(str(manifest))
+    assert client.get(_url("")).json() == first
+    assert client.get(_url("/artifacts")).json()["job_manifest"]["status"] == "SUCCESS"
+    assert list(_api._manifest_cache) == [str(manifest)]
+    _write_json(manifest, {"status": "FAIL", "run_id": RUN, "error": "x"})
+    assert client.get(_url("")).json()["status"] == "FAIL"
+
+
+def test_manifest_cache_evicts_least_recent(tmp_path, monkeypatch):
+    monkeypatch.setattr(_api, "_manifest_cache", _api.OrderedDict())
+    monkeypatch.setattr(_api, "MANIFEST_CACHE_MAX", 2)
+    paths = []
+    for i in range(3):
+        p = tmp_path / f"m{i}.json"
+        _write_json(p, {"i": i})
+        paths.append(str(p))
+    _api._load_manifest(paths[0])
+    _api._load_manifest(paths[1])
+    _api._load_manifest(paths[0])
+    _api._load_manifest(paths[2])
+    assert list(_api._manifest_cache) == [paths[0], paths[2]]
+
+
+def test_root_and_health_static_bodies(client):
+    r = client.get("/health")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    assert r.json() == {"status": "ok"}
+    root = client.get("/").json()
+    assert root["health"] == "/health" and root["ui"] == "/ui"
+
+
+def test_retrieval_pack_streams_in_large_chunks(nas, client, monkeypatch):
+    monkeypatch.setattr(_api, "_ACCEL_REDIRECT_PREFIX", "")
+    assert _nas.NasFileResponse.chunk_size == _nas.NAS_FILE_CHUNK_BYTES
+    pack = nas / "tenants" / TENANT / "loans" / LOAN / "retrieve" / RUN / "retrieval_pack.json"
+    body = b'{"retrieved_chunks": ["' + b"x" * (3 * _nas.NAS_FILE_CHUNK_BYTES + 7) + b'"]}'
+    pack.write_bytes(body)
+    r = client.get(_url("/retrieval_pack"))
+    assert r.status_code == 200
+    assert r.content == body
+    assert r.headers["content-length"] == str(len(body))
+
+
+def test_list_loans_sorted_dirs_only(nas, client):
+    loans = nas / "tenants" / TENANT / "loans"
+    for name in ("20000001", ".hidden", "___"):
+        (loans / name).mkdir()
+    (loans / "10000001").write_text("not a dir")
+    assert client.get(f"/tenants/{TENANT}/loans").json() == {"loan_ids": [LOAN, "20000001"]}
+    assert client.get("/tenants/nobody/loans").status_code == 404
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Tests for run_loan_job._run in-process step dispatch."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import types
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import run_loan_job
+
+
+def _fake_step(main):
+    mod = types.ModuleType("fake_step")
+    mod.main = main
+    return mod
+
+
+def test_in_process_step_gets_argv_and_env_then_env_restored():
+    seen = {}
+
+    def main(argv):
+        seen["argv"] = argv
+        seen["run_llm"] = os.environ.get("RUN_LLM")
+
+    with patch.dict(sys.modules, {"fake_step": _fake_step(main)}), \
+            patch.dict(run_loan_job._IN_PROCESS_STEPS, {"fake_step.py": "fake_step"}), \
+            patch.object(run_loan_job.subprocess, "run") as sp_run:
+        os.environ.pop("RUN_LLM", None)
+        run_loan_job._run([sys.executable, "/x/fake_step.py", "--a", "1"], "fake", env={"RUN_LLM": "0"})
+    sp_run.assert_not_called()
+    assert seen == {"argv": ["--a", "1"], "run_llm": "0"}
+    assert "RUN_LLM" not in os.environ
+
+
+@pytest.mark.parametrize("main_body,code", [
+    (lambda argv: (_ for _ in ()).throw(RuntimeError("boom")), 1),
+    (lambda argv: (_ for _ in ()).throw(SystemExit(2)), 2),
+])
+def test_in_process_step_failure_raises_called_process_error(main_body, code):
+    cmd = [sys.executable, "/x/fake_step.py"]
+    with patch.dict(sys.modules, {"fake_step": _fake_step(main_body)}), \
+            patch.dict(run_loan_job._IN_PROCESS_STEPS, {"fake_step.py": "fake_step"}):
+        with pytest.raises(subprocess.CalledProcessError) as ei:
+            run_loan_job._run(cmd, "fake")
+    assert ei.value.returncode == code
+    assert ei.value.cmd == cmd
+
+
+def test_other_steps_still_use_subprocess():
+    cmd = [sys.executable, "/x/step11_process.py"]
+    with patch.object(run_loan_job.subprocess, "run") as sp_run:
+        run_loan_job._run(cmd, "Step11")
+    sp_run.assert_called_once_with(cmd, check=True, env=None)
+
+
+def test_general_and_income_step13_write_separate_packs(tmp_path):
+    """General Step13 writes retrieve/<run>/general/ for uw_conditions; income Step13 owns the live pack."""
+    rp = tmp_path / "tenants" / "t1" / "loans" / "L1" / "retrieve" / "R1" / "retrieval_pack.json"
+    calls = []
+
+    def fake_run(cmd, label, env=None):
+        calls.append(label)
+        if label == "Step13: general retrieval pack":
+            out_dir = Path(cmd[cmd.index("--out-dir") + 1])
+            out_dir.mkdir(parents=True, exist_ok=True)
+            (out_dir / "retrieval_pack.json").write_text('{"pack": "general"}')
+        elif label == "Step13: income-focused retrieval pack":
+            rp.parent.mkdir(parents=True, exist_ok=True)
+            rp.write_text('{"pack": "income"}')
+        elif label == "Step12: uw_conditions":
+            general = Path(cmd[cmd.index("--retrieval-pack") + 1])
+            assert general.read_text() == '{"pack": "general"}'
+
+    with patch.object(run_loan_job, "NAS_ANALYZE", tmp_path), \
+            patch.object(run_loan_job, "preflight_mount_contract"), \
+            patch.object(run_loan_job._embedder_service, "start") as embed_start, \
+            patch.object(run_loan_job, "_run", side_effect=fake_run):
+        rc = run_loan_job.main([
+            "--tenant-id", "t1", "--loan-id", "L1", "--run-id", "R1",
+            "--skip-intake", "--skip-process",
+        ])
+    assert rc == 0
+    embed_start.assert_called_once_with(run_loan_job.EMBED_MODEL_NAME, offline=False)
+    embed_start.return_value.stop.assert_called()
+    assert calls.index("Step13: general retrieval pack") < calls.index("Step12: uw_conditions")
+    assert calls.index("Step13: income-focused retrieval pack") < calls.index("Step12: income_analysis")
+    assert calls[-2:] == ["Step12: income_analysis", "Step12: uw_decision"]
+    assert rp.read_text() == '{"pack": "income"}'
+    manifest = json.loads((tmp_path / "tenants" / "t1" / "loans" / "L1" / "R1" / "job_manifest.json").read_text())
+    assert manifest["retrieval_pack_sha256"] == hashlib.sha256(b'{"pack": "income"}').hexdigest()
+
+
+def test_general_step13_owns_live_pack_without_income(tmp_path):
+    rp = tmp_path / "tenants" / "t1" / "loans" / "L1" / "retrieve" / "R1" / "retrieval_pack.json"
+    cmds = {}
+
+    def fake_run(cmd, label, env=None):
+        cmds[label] = cmd
+        if label == "Step13: general retrieval pack":
+            rp.parent.mkdir(parents=True, exist_ok=True)
+            rp.write_text('{"pack": "general"}')
+
+    with patch.object(run_loan_job, "NAS_ANALYZE", tmp_path), \
+            patch.object(run_loan_job, "preflight_mount_contract"), \
+            patch.object(run_loan_job, "_run", side_effect=fake_run):
+        rc = run_loan_job.main([
+            "--tenant-id", "t1", "--loan-id", "L1", "--run-id", "R1",
+            "--skip-intake", "--skip-process", "--no-run-income-analysis", "--no-run-uw-decision",
+        ])
+    assert rc == 0
+    assert "--out-dir" not in cmds["Step13: general retrieval pack"]
+    assert "--retrieval-pack" not in cmds["Step12: uw_conditions"]
+    assert set(cmds) == {"Step13: general retrieval pack", "Step12: uw_conditions"}
+
+
+def test_force_subprocess_bypasses_in_process_steps():
+    cmd = [sys.executable, "/x/step12_analyze.py", "--loan-id", "L1"]
+    with patch.object(run_loan_job, "_FORCE_SUBPROCESS", True), \
+            patch.object(run_loan_job, "_run_in_process") as in_proc, \
+            patch.object(run_loan_job.subprocess, "run") as sp_run:
+        run_loan_job._run(cmd, "Step12")
+    in_proc.assert_not_called()
+    sp_run.assert_called_once_with(cmd, check=True, env=None)
+
+
+def test_hash_stable_pack_is_hashed_twice_not_three_times(tmp_path):
+    rp = tmp_path / "tenants" / "t1" / "loans" / "L1" / "retrieve" / "R1" / "retrieval_pack.json"
+
+    def fake_run(cmd, label, env=None):
+        if label.startswith("Step13: general retrieval pack"):
+            rp.parent.mkdir(parents=True, exist_ok=True)
+            rp.write_text('{"pack": "general"}')
+
+    real_sha = run_loan_job.sha256_file
+    with patch.object(run_loan_job, "NAS_ANALYZE", tmp_path), \
+            patch.object(run_loan_job, "preflight_mount_contract"), \
+            patch.object(run_loan_job, "_run", side_effect=fake_run), \
+            patch.object(run_loan_job._embedder_service, "start", return_value=None), \
+            patch.object(run_loan_job, "sha256_file", side_effect=real_sha) as sha:
+        rc = run_loan_job.main([
+            "--tenant-id", "t1", "--loan-id", "L1", "--run-id", "R1",
+            "--skip-intake", "--skip-process", "--no-run-income-analysis", "--no-run-uw-decision",
+            "--expect-rp-hash-stable",
+        ])
+    assert rc == 0
+    assert sha.call_count == 2
+    manifest = json.loads((tmp_path / "tenants" / "t1" / "loans" / "L1" / "R1" / "job_manifest.json").read_text())
+    assert manifest["retrieval_pack_sha256"] == hashlib.sha256(b'{"pack": "general"}').hexdigest()
+
+
+def test_short_circuit_on_success_manifest_prints_summary(tmp_path, capsys):
+    run_dir = tmp_path / "tenants" / "t1" / "loans" / "L1" / "R1"
+    run_dir.mkdir(parents=True)
+    (run_dir / "job_manifest.json").write_text(json.dumps({"status": "SUCCESS", "retrieval_pack_sha256": "abc"}))
+    with patch.object(run_loan_job, "NAS_ANALYZE", tmp_path), \
+            patch.object(run_loan_job, "_run") as step_run:
+        rc = run_loan_job.main(["--tenant-id", "t1", "--loan-id", "L1", "--run-id", "R1", "--skip-intake"])
+    assert rc == 0
+    step_run.assert_not_called()
+    out = capsys.readouterr().out
+    assert 'MANIFEST:{"retrieval_pack_sha256": "abc", "run_id": "R1", "status": "SUCCESS"}' in out
+    assert run_loan_job._read_manifest(tmp_path / "missing.json") is None
+
+
+def test_single_step13_job_does_not_start_embedder(tmp_path):
+    with patch.object(run_loan_job, "NAS_ANALYZE", tmp_path), \
+            patch.object(run_loan_job, "preflight_mount_contract"), \
+            patch.object(run_loan_job._embedder_service, "start") as embed_start, \
+            patch.object(run_loan_job, "_run"):
+        rc = run_loan_job.main([
+            "--tenant-id", "t1", "--loan-id", "L1", "--run-id", "R1",
+            "--skip-intake", "--skip-process", "--no-run-income-analysis", "--no-run-uw-decision",
+        ])
+    assert rc == 0
+    embed_start.assert_not_called()
+
+
+def test_embedder_service_round_trip_falls_back_when_model_unavailable():
+    """A service whose model cannot load answers with an error, so Step13 loads locally."""
+    import _embedder_service
+
+    service = _embedder_service.start("no-such/model")
+    assert service is not None
+    try:
+        assert os.environ[_embedder_service.SOCK_ENV]
+        assert _embedder_service.embed_via_service(["query: x"], "no-such/model") is None
+    finally:
+        service.stop()
+    assert _embedder_service.SOCK_ENV not in os.environ
+    assert _embedder_service.embed_via_service(["query: x"], "no-such/model") is None
+
+
+def test_max_dropped_chunks_gate_reads_meta_sidecar(tmp_path):
+    rp = tmp_path / "tenants" / "t1" / "loans" / "L1" / "retrieve" / "R1" / "retrieval_pack.json"
+
+    def fake_run(cmd, label, env=None):
+        if label == "Step13: income-focused retrieval pack":
+            rp.parent.mkdir(parents=True, exist_ok=True)
+            rp.write_text('{"retrieval_pack_meta": {"dropped_chunk_ids_count": 0}}')
+            rp.with_name("retrieval_pack.meta.json").write_text('{"dropped_chunk_ids_count": 5}')
+
+    with patch.object(run_loan_job, "NAS_ANALYZE", tmp_path), \
+            patch.object(run_loan_job, "preflight_mount_contract"), \
+            patch.object(run_loan_job._embedder_service, "start", return_value=None), \
+            patch.object(run_loan_job, "_run", side_effect=fake_run):
+        rc = run_loan_job.main([
+            "--tenant-id", "t1", "--loan-id", "L1", "--run-id", "R1",
+            "--skip-intake", "--skip-process", "--max-dropped-chunks", "2",
+        ])
+    assert rc == 1
+    manifest = json.loads((tmp_path / "tenants" / "t1" / "loans" / "L1" / "R1" / "job_manifest.json").read_text())
+    assert "dropped_chunk_ids_count=5" in manifest["error"]
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Tests for step10_intake staging helpers."""
+from __future__ import annotations
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from step10_intake import COPY_CHUNK_BYTES, _copy_and_hash
+
+
+def test_copy_and_hash_matches_source(tmp_path):
+    data = os.urandom(2 * COPY_CHUNK_BYTES + 123)
+    src = tmp_path / "src.pdf"
+    src.write_bytes(data)
+    dst = tmp_path / "dst.pdf"
+    assert _copy_and_hash(src, dst) == (hashlib.sha256(data).hexdigest(), len(data))
+    assert dst.read_bytes() == data
+
+
+def test_copy_and_hash_truncates_existing_dst(tmp_path):
+    src = tmp_path / "src.txt"
+    src.write_bytes(b"short")
+    dst = tmp_path / "dst.txt"
+    dst.write_bytes(b"a much longer previous file")
+    assert _copy_and_hash(src, dst) == (hashlib.sha256(b"short").hexdigest(), 5)
+    assert dst.read_bytes() == b"short"
+
+
+def test_main_stages_all_files_in_sorted_order(tmp_path):
+    import json
+    from unittest.mock import patch
+    import step10_intake
+    source = tmp_path / "source" / "loan"
+    (source / "sub").mkdir(parents=True)
+    names = ["b.pdf", "A.pdf", "sub/c.pdf", "d.txt"]
+    for i, name in enumerate(names):
+        (source / name).write_bytes(f"doc-{i}".encode() * 1000)
+    ingest = tmp_path / "ingest"
+    with patch.object(step10_intake, "preflight_mount_contract"), \
+            patch.object(step10_intake, "validate_source_path", return_value=source), \
+            patch.object(step10_intake, "SOURCE_MOUNT", tmp_path / "source"), \
+            patch.object(step10_intake, "NAS_INGEST", ingest):
+        step10_intake.main(["--loan-id", "L1", "--source-path", str(source)])
+    manifest_path = ingest / "tenants" / step10_intake.DEFAULT_TENANT / "loans" / "L1" / "_meta" / "intake_manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    rels = [f["original_source_path"] for f in manifest["files"]]
+    assert rels == sorted(rels, key=str.lower) and len(rels) == 4
+    for f in manifest["files"]:
+        data = (tmp_path / "source" / f["original_source_path"]).read_bytes()
+        assert f["sha256"] == hashlib.sha256(data).hexdigest()
+        assert f["size_bytes"] == len(data)
+        assert (manifest_path.parent.parent / f["stored_relative_path"]).read_bytes() == data
+        assert f["stored_relative_path"].startswith("synology_stage/")
+
+
+def test_iter_files_matches_rglob(tmp_path):
+    from step10_intake import _iter_files
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "a" / "b" / "x.pdf").write_bytes(b"x")
+    (tmp_path / "top.pdf").write_bytes(b"t")
+    (tmp_path / "empty").mkdir()
+    (tmp_path / "link_to_a").symlink_to(tmp_path / "a", target_is_directory=True)
+    (tmp_path / "link_to_top.pdf").symlink_to(tmp_path / "top.pdf")
+    expected = sorted(str(p) for p in tmp_path.rglob("*") if p.is_file())
+    assert sorted(_iter_files(tmp_path)) == expected
+
+
+def test_rerun_hard_links_unchanged_files_and_copies_changed(tmp_path):
+    import json
+    from unittest.mock import patch
+    import step10_intake
+    source = tmp_path / "source" / "loan"
+    source.mkdir(parents=True)
+    (source / "same.pdf").write_bytes(b"unchanged" * 100)
+    (source / "edit.pdf").write_bytes(b"version-1" * 100)
+    ingest = tmp_path / "ingest"
+
+    def run(ts):
+        with patch.object(step10_intake, "preflight_mount_contract"), \
+                patch.object(step10_intake, "validate_source_path", return_value=source), \
+                patch.object(step10_intake, "SOURCE_MOUNT", tmp_path / "source"), \
+                patch.object(step10_intake, "NAS_INGEST", ingest), \
+                patch.object(step10_intake, "utc_timestamp_compact", return_value=ts), \
+                patch.object(step10_intake, "_copy_and_hash", wraps=step10_intake._copy_and_hash) as copy:
+            step10_intake.main(["--loan-id", "L1", "--source-path", str(source)])
+        loan_root = ingest / "tenants" / step10_intake.DEFAULT_TENANT / "loans" / "L1"
+        manifest = json.loads((loan_root / "_meta" / "intake_manifest.json").read_text())
+        return loan_root, {Path(f["original_source_path"]).name: f for f in manifest["files"]}, copy
+
+    run("20240101T000000Z")
+    (source / "edit.pdf").write_bytes(b"version-2" * 100)
+    loan_root, files, copy = run("20240102T000000Z")
+    assert [Path(c.args[0]).name for c in copy.call_args_list] == ["edit.pdf"]
+    same_new = loan_root / files["same.pdf"]["stored_relative_path"]
+    same_old = loan_root / "synology_stage" / "20240101T000000Z" / "same.pdf"
+    assert files["same.pdf"]["stored_relative_path"].startswith("synology_stage/20240102T000000Z/")
+    assert os.path.samefile(same_new, same_old)
+    assert files["same.pdf"]["sha256"] == hashlib.sha256(b"unchanged" * 100).hexdigest()
+    assert (loan_root / files["edit.pdf"]["stored_relative_path"]).read_bytes() == b"version-2" * 100
+
+
+def test_hash_staged_reads_existing_file_once(tmp_path):
+    from step10_intake import _hash_staged
+    dst = tmp_path / "staged.pdf"
+    assert _hash_staged(dst) is None
+    dst.write_bytes(b"staged" * 10)
+    assert _hash_staged(dst) == (hashlib.sha256(b"staged" * 10).hexdigest(), 60)
+
+
+def test_kernel_copy_falls_back_to_copyfile(tmp_path):
+    import errno
+    from unittest.mock import patch
+    from step10_intake import _kernel_copy
+    data = os.urandom(3 * COPY_CHUNK_BYTES + 7)
+    src = tmp_path / "src.pdf"
+    src.write_bytes(data)
+    _kernel_copy(src, tmp_path / "a.pdf")
+    assert (tmp_path / "a.pdf").read_bytes() == data
+    with patch("os.copy_file_range", side_effect=OSError(errno.EXDEV, "cross-device")):
+        _kernel_copy(src, tmp_path / "b.pdf")
+    assert (tmp_path / "b.pdf").read_bytes() == data
+
+
+def test_reuse_prior_copy_without_hard_links(tmp_path):
+    from unittest.mock import patch
+    from step10_intake import _reuse_prior_copy
+    data = b"prior" * 100
+    h = hashlib.sha256(data).hexdigest()
+    (tmp_path / "old").mkdir()
+    (tmp_path / "old" / "a.pdf").write_bytes(data)
+    src = tmp_path / "src.pdf"
+    src.write_bytes(data)
+    prior = {h: {"sha256": h, "stored_relative_path": "old/a.pdf", "size_bytes": len(data)}}
+    dst = tmp_path / "new.pdf"
+    with patch("os.link", side_effect=PermissionError(1, "no hard links")):
+        assert _reuse_prior_copy(str(src), dst, tmp_path, prior, frozenset({len(data)})) == (h, len(data))
+    assert dst.read_bytes() == data and not os.path.samefile(dst, tmp_path / "old" / "a.pdf")
+    assert _reuse_prior_copy(str(src), tmp_path / "x.pdf", tmp_path, prior, frozenset({1})) is None
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Tests for the Step12 on-disk LLM response cache."""
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import step12_analyze
+from step12_analyze import _cached_ollama_generate, _evict_llm_cache
+
+
+def test_identical_prompt_is_generated_once(tmp_path):
+    with patch.object(step12_analyze, "_ollama_model_digest", return_value="sha256:aaa"), \
+            patch.object(step12_analyze, "_ollama_generate", return_value='{"answer": "x"}') as gen:
+        first = _cached_ollama_generate(tmp_path, "http://ollama", "mistral", "prompt", 0.0, 650)
+        second = _cached_ollama_generate(tmp_path, "http://ollama", "mistral", "prompt", 0.0, 650)
+        _cached_ollama_generate(tmp_path, "http://ollama", "mistral", "prompt", 0.0, 1500)
+        _cached_ollama_generate(tmp_path, "http://other", "mistral", "prompt", 0.0, 650)
+    assert first == second == '{"answer": "x"}'
+    assert gen.call_count == 3
+
+
+def test_repulled_model_misses_cache(tmp_path):
+    with patch.object(step12_analyze, "_ollama_generate", return_value="r") as gen:
+        for digest in ("sha256:old", "sha256:new"):
+            with patch.object(step12_analyze, "_ollama_model_digest", return_value=digest):
+                _cached_ollama_generate(tmp_path, "http://ollama", "mistral", "prompt")
+    assert gen.call_count == 2
+
+
+def test_no_cache_dir_or_unknown_digest_always_generates(tmp_path):
+    with patch.object(step12_analyze, "_ollama_model_digest", return_value=None), \
+            patch.object(step12_analyze, "_ollama_generate", return_value="r") as gen:
+        _cached_ollama_generate(None, "http://ollama", "mistral", "prompt")
+        _cached_ollama_generate(tmp_path, "http://ollama", "mistral", "prompt")
+        _cached_ollama_generate(tmp_path, "http://ollama", "mistral", "prompt")
+    assert gen.call_count == 3
+    assert not any(tmp_path.iterdir())
+
+
+def test_cache_write_failure_still_returns_response(tmp_path):
+    with patch.object(step12_analyze, "_ollama_model_digest", return_value="sha256:aaa"), \
+            patch.object(step12_analyze, "_ollama_generate", return_value="r"), \
+            patch.object(step12_analyze, "atomic_write_json", side_effect=OSError(28, "No space left")):
+        assert _cached_ollama_generate(tmp_path, "http://ollama", "mistral", "prompt") == "r"
+
+
+def test_evict_removes_least_recently_used_first(tmp_path):
+    (tmp_path / "ab").mkdir()
+    for i, name in enumerate(["old", "mid", "new"]):
+        p = tmp_path / "ab" / f"{name}.json"
+        p.write_bytes(b"x" * 100)
+        os.utime(p, (1000 + i, 1000 + i))
+    _evict_llm_cache(tmp_path, 200)
+    assert sorted(p.stem for p in (tmp_path / "ab").iterdir()) == ["mid", "new"]
@@ -11,6 +11,7 @@ from step12_analyze import (
     _make_dedupe_key,
     _token_jaccard,
     _dedup_conditions,
+    _similar_condition_pairs,
 )
 
 # ---------------------------------------------------------------------------
@@ -148,6 +149,13 @@ def test_dedup_confidence_no_calibration():
     assert confidence == 0.75
 
 
+def test_similar_condition_pairs_matches_all_pairs_scan():
+    keys = ["bank statements", "tax returns", "", "bank statements", "", "pay stubs", "tax returns"]
+    expected = [(i, j) for i in range(len(keys)) for j in range(i + 1, len(keys))
+                if keys[i] == keys[j] or _token_jaccard(keys[i], keys[j]) >= 0.92]
+    assert sorted(_similar_condition_pairs(keys)) == expected
+
+
 if __name__ == "__main__":
     import traceback
     tests = [v for k, v in list(globals().items()) if k.startswith("test_")]